@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Closed-form affine chains over Z/m (m = 256 for bytes, 58 for Base58 indices)
+
+Chains of per-position additions, subtractions and multiplications such as
+Base58SymbolChain's (val + row) % 58 -> (val + row + col) % 58 -> (val * 2) % 58
+-> (val - row) % 58 collapse to  a[i]·x[i] + b[i] + Σ c[i][p]·p  (mod m)  per
+position i, where p are free additive parameters.  Composition is a couple of
+multiplications per position, and the known positions give a linear
+congruence system in the parameters that is solved directly, including
+non-invertible multipliers such as 2 mod 58.
+"""
+from math import gcd
+from itertools import product
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+KNOWN_POS = {7: 9, 22: 22, 25: 7}
+TRIANGLE = [
+    [0],
+    [1,2],
+    [3,4,5],
+    [6,7,8,9],
+    [10,11,12,13,14],
+    [15,16,17,18,19,20],
+    [21,22,23,24,25,26,27],
+    [28,29,30,31,32,33,34,35]
+]
+TRIANGLE_ROW = {pos: r for r, row in enumerate(TRIANGLE) for pos in row}
+
+
+def triangle_row(i):
+    return TRIANGLE_ROW.get(i, len(TRIANGLE))
+
+
+def factorize(m):
+    """Prime power factors of m as [(p, k)]"""
+    factors = []
+    p = 2
+    while p * p <= m:
+        if m % p == 0:
+            k = 0
+            while m % p == 0:
+                m //= p
+                k += 1
+            factors.append((p, k))
+        p += 1
+    if m > 1:
+        factors.append((m, 1))
+    return factors
+
+
+def solve_linear_congruence(a, r, m):
+    """All x in [0, m) with a·x ≡ r (mod m)"""
+    a %= m
+    r %= m
+    g = gcd(a, m)
+    if r % g:
+        return []
+    step = m // g
+    x0 = (r // g) * pow(a // g, -1, step) % step if step > 1 else 0
+    return [x0 + t * step for t in range(g)]
+
+
+def _valuation(c, p, k):
+    if c == 0:
+        return k
+    v = 0
+    while c % p == 0:
+        c //= p
+        v += 1
+    return v
+
+
+def _solve_prime_power(rows, n, p, k, limit):
+    """Solutions of Σ coeffs·x ≡ rhs (mod p^k) as a list of n-tuples"""
+    q = p ** k
+    rows = [([c % q for c in coeffs], rhs % q) for coeffs, rhs in rows]
+    pivots = {}  # column -> (coeffs, rhs, valuation)
+    remaining = rows
+    for col in range(n):
+        best = None
+        for idx, (coeffs, _) in enumerate(remaining):
+            v = _valuation(coeffs[col], p, k)
+            if v < k and (best is None or v < best[1]):
+                best = (idx, v)
+        if best is None:
+            continue
+        idx, v = best
+        coeffs, rhs = remaining.pop(idx)
+        unit_inv = pow(coeffs[col] // p ** v, -1, q)
+        reduced = []
+        for oc, orhs in remaining:
+            if oc[col]:
+                # Pivot has minimal valuation, so it divides this coefficient
+                factor = (oc[col] // p ** v) * unit_inv % q
+                oc = [(a - factor * b) % q for a, b in zip(oc, coeffs)]
+                orhs = (orhs - factor * rhs) % q
+            reduced.append((oc, orhs))
+        remaining = reduced
+        pivots[col] = (coeffs, rhs, v)
+    if any(rhs for _, rhs in remaining):
+        return []
+
+    solutions = []
+
+    def assign(col, values):
+        if len(solutions) >= limit:
+            return
+        if col < 0:
+            solutions.append(tuple(values))
+            return
+        if col not in pivots:
+            for x in range(q):
+                values[col] = x
+                assign(col - 1, values)
+            return
+        coeffs, rhs, v = pivots[col]
+        residual = (rhs - sum(coeffs[j] * values[j] for j in range(col + 1, n))) % q
+        for x in solve_linear_congruence(coeffs[col], residual, q):
+            values[col] = x
+            assign(col - 1, values)
+        values[col] = 0
+
+    assign(n - 1, [0] * n)
+    return solutions
+
+
+def solve_system(rows, n, m, limit=1 << 16):
+    """All solutions of a linear congruence system mod m (up to limit)
+
+    rows is a list of (coeffs, rhs) with len(coeffs) == n.
+    """
+    per_factor = []
+    for p, k in factorize(m):
+        sols = _solve_prime_power(rows, n, p, k, limit)
+        if not sols:
+            return []
+        per_factor.append((p ** k, sols))
+    results = []
+    for combo in product(*(sols for _, sols in per_factor)):
+        values = []
+        for j in range(n):
+            # Chinese remainder theorem across the prime power factors
+            x, mod = 0, 1
+            for (q, _), sol in zip(per_factor, combo):
+                t = (sol[j] - x) * pow(mod, -1, q) % q
+                x += mod * t
+                mod *= q
+            values.append(x % m)
+        results.append(tuple(values))
+        if len(results) >= limit:
+            break
+    return sorted(results)
+
+
+class AffineChain:
+    """Per-position  a·x + b + Σ coeffs[p]·p  (mod m)"""
+
+    def __init__(self, modulus, width=32):
+        self.m = modulus
+        self.width = width
+        self.a = [1] * width
+        self.b = [0] * width
+        self.coeffs = [{} for _ in range(width)]
+
+    def copy(self):
+        other = AffineChain(self.m, self.width)
+        other.a = list(self.a)
+        other.b = list(self.b)
+        other.coeffs = [dict(c) for c in self.coeffs]
+        return other
+
+    @property
+    def params(self):
+        names = set()
+        for c in self.coeffs:
+            names.update(name for name, v in c.items() if v)
+        return sorted(names)
+
+    def _operand(self, value):
+        """Per-position list from an int, a sequence or a function of the position"""
+        if callable(value):
+            return [value(i) for i in range(self.width)]
+        if isinstance(value, int):
+            return [value] * self.width
+        return list(value)
+
+    def add(self, value):
+        """Add a constant, per-position constants, or a named free parameter"""
+        out = self.copy()
+        if isinstance(value, str):
+            for c in out.coeffs:
+                c[value] = (c.get(value, 0) + 1) % self.m
+            return out
+        for i, v in enumerate(self._operand(value)):
+            out.b[i] = (out.b[i] + v) % self.m
+        return out
+
+    def sub(self, value):
+        if isinstance(value, str):
+            out = self.copy()
+            for c in out.coeffs:
+                c[value] = (c.get(value, 0) - 1) % self.m
+            return out
+        return self.add([-v for v in self._operand(value)])
+
+    def mul(self, value):
+        out = self.copy()
+        for i, k in enumerate(self._operand(value)):
+            out.a[i] = out.a[i] * k % self.m
+            out.b[i] = out.b[i] * k % self.m
+            out.coeffs[i] = {name: c * k % self.m for name, c in out.coeffs[i].items()}
+        return out
+
+    def then(self, other):
+        """Composition: apply self, then other"""
+        if other.m != self.m or other.width != self.width:
+            raise ValueError("Chains must share modulus and width")
+        out = AffineChain(self.m, self.width)
+        for i in range(self.width):
+            k = other.a[i]
+            out.a[i] = k * self.a[i] % self.m
+            out.b[i] = (k * self.b[i] + other.b[i]) % self.m
+            coeffs = {name: c * k % self.m for name, c in self.coeffs[i].items()}
+            for name, c in other.coeffs[i].items():
+                coeffs[name] = (coeffs.get(name, 0) + c) % self.m
+            out.coeffs[i] = coeffs
+        return out
+
+    def apply(self, data, params=None):
+        params = params or {}
+        return [(self.a[i] * x + self.b[i]
+                 + sum(c * params.get(name, 0) for name, c in self.coeffs[i].items())) % self.m
+                for i, x in enumerate(data[:self.width])]
+
+    def matches(self, data, known_pos=KNOWN_POS, params=None):
+        params = params or {}
+        for pos, target in known_pos.items():
+            val = (self.a[pos] * data[pos] + self.b[pos]
+                   + sum(c * params.get(name, 0) for name, c in self.coeffs[pos].items())) % self.m
+            if val != target % self.m:
+                return False
+        return True
+
+    def solve_params(self, data, known_pos=KNOWN_POS, limit=1 << 16):
+        """Every assignment of the free parameters that hits the known positions"""
+        names = self.params
+        rows = []
+        for pos, target in known_pos.items():
+            rhs = (target - self.a[pos] * data[pos] - self.b[pos]) % self.m
+            rows.append(([self.coeffs[pos].get(name, 0) for name in names], rhs))
+        return [dict(zip(names, sol)) for sol in solve_system(rows, len(names), self.m, limit)]
+
+    def solve_inputs(self, known_pos=KNOWN_POS, params=None):
+        """Input values x[pos] (mod m) that reach each known target"""
+        params = params or {}
+        result = {}
+        for pos, target in known_pos.items():
+            offset = self.b[pos] + sum(c * params.get(name, 0) for name, c in self.coeffs[pos].items())
+            result[pos] = solve_linear_congruence(self.a[pos], target - offset, self.m)
+        return result
+
+
+def base58_symbol_chain():
+    """Steps △❒●△ of Base58SymbolChain.apply_symbol_transformations"""
+    chain = AffineChain(58)
+    chain = chain.add(triangle_row)                       # (val + row) % 58
+    chain = chain.add(lambda i: i // 8 + i % 8)           # (val + row + col) % 58
+    chain = chain.mul(2)                                  # (val * 2) % 58
+    chain = chain.sub(triangle_row)                       # (val - row) % 58
+    return chain
+
+
+def main():
+    import time
+
+    tx_bytes = bytes.fromhex(TX_ID)
+
+    print("=== Affine Chain Algebra over Z/m ===")
+    chain = base58_symbol_chain()
+    direct = []
+    for i, val in enumerate(tx_bytes):
+        row = triangle_row(i)
+        v = (val + row) % 58
+        v = (v + i // 8 + i % 8) % 58
+        v = (v * 2) % 58
+        direct.append((v - row) % 58)
+    assert chain.apply(tx_bytes) == direct
+    print("Base58SymbolChain steps 1-4 collapse to per-position (a, b):")
+    for pos in sorted(KNOWN_POS):
+        print(f"  Position {pos}: {chain.a[pos]}·x + {chain.b[pos]} (mod 58)")
+
+    print("\nInputs (mod 58) reaching the known values:")
+    for pos, xs in sorted(chain.solve_inputs().items()):
+        print(f"  Position {pos}: x ∈ {xs}  (tx byte {tx_bytes[pos]} ≡ {tx_bytes[pos] % 58})")
+
+    with_param = chain.add('k').mul(2).add('j')
+    sols = with_param.solve_params(tx_bytes)
+    print(f"\nAppending +k, ×2, +j: {len(sols)} (k, j) solutions mod 58, e.g. {sols[:4]}")
+    for sol in sols[:4]:
+        assert with_param.matches(tx_bytes, params=sol)
+
+    # Additive part of DoubleTriangleSolver over bytes, with free offsets
+    diag = [tx_bytes[p] for p in [0, 2, 5, 9, 14, 20, 27]]
+    dt = AffineChain(256).add(lambda i: diag[i // 8] + i // 8).add('p')
+    dt = dt.sub(lambda i: diag[len(diag) - 1 - i // 8]).add(lambda i: i // 8).mul(3).add('q')
+    sols = dt.solve_params(tx_bytes, limit=10)
+    if sols:
+        print(f"\nDouble triangle (+diag+row+p, -rdiag+row, ×3, +q) mod 256: e.g. {sols[:3]}")
+    else:
+        print("\nDouble triangle (+diag+row+p, -rdiag+row, ×3, +q) mod 256: no (p, q) exists")
+
+    # Sweep: every 4-op template from a small op set, each with a trailing free +k
+    ops = {
+        '+row': lambda c: c.add(lambda i: i // 8),
+        '+col': lambda c: c.add(lambda i: i % 8),
+        '+tri': lambda c: c.add(triangle_row),
+        '-tri': lambda c: c.sub(triangle_row),
+        '*2': lambda c: c.mul(2),
+        '*3': lambda c: c.mul(3),
+    }
+    start = time.perf_counter()
+    templates = solved = 0
+    base = AffineChain(58)
+    for seq in product(ops, repeat=4):
+        c = base
+        for name in seq:
+            c = ops[name](c)
+        templates += 1
+        if c.add('k').solve_params(tx_bytes, limit=1):
+            solved += 1
+    elapsed = time.perf_counter() - start
+    print(f"\nSwept {templates} templates (+ free k) in {elapsed:.3f}s; {solved} admit a k mod 58")
+
+
+if __name__ == "__main__":
+    main()
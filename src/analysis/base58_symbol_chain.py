@@ -6,6 +6,7 @@ specific Base58 transformations guided by the red dot positions
 import base58
 import hashlib
 from itertools import combinations
+from near_miss import max_score, score, score_components
 
 class Base58SymbolChain:
     def __init__(self):
@@ -154,6 +155,8 @@ class Base58SymbolChain:
             print("Mismatches:")
             for pos, actual, expected in mismatches:
                 print(f"Position {pos}: Got {actual}, Expected {expected}")
+        print(f"Near-miss score: {score(result, self.known_pos)}/{max_score(self.known_pos)} "
+              f"{score_components(result, self.known_pos)}")
 
     def analyze_b58_chains(self):
         """Analyze possible chains of Base58 transformations"""
@@ -4,37 +4,30 @@ Analysis of binary patterns in the red dot triangle
 """
 import itertools
 
+from bit_tables import pack_bits
+
 def generate_binary_patterns(dots_per_row):
     """Generate all possible binary patterns for the triangle"""
     total_dots = sum(dots_per_row)
     patterns = []
     
-    for bits in itertools.product([0, 1], repeat=total_dots):
+    # Limit to first 100 patterns for analysis (stop generating there)
+    for bits in itertools.islice(itertools.product([0, 1], repeat=total_dots), 100):
         pattern = []
         start = 0
         for row_dots in dots_per_row:
             pattern.append(list(bits[start:start+row_dots]))
             start += row_dots
         patterns.append(pattern)
-    return patterns[:100]  # Limit to first 100 patterns for analysis
+    return patterns
 
 def analyze_binary_pattern(pattern):
     """Analyze a binary pattern for potential significance"""
-    # Convert pattern to bytes
+    # Convert pattern to bytes, MSB first, one table lookup per byte
     bits = []
     for row in pattern:
         bits.extend(row)
-    
-    # Convert bits to bytes
-    bytes_data = []
-    for i in range(0, len(bits), 8):
-        if i + 8 <= len(bits):
-            byte = 0
-            for bit_pos in range(8):
-                byte = (byte << 1) | bits[i + bit_pos]
-            bytes_data.append(byte)
-    
-    return bytes(bytes_data)
+    return pack_bits(bits)
 
 def check_known_positions(bytes_data):
     """Check if bytes data matches known positions"""
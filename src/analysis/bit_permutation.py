@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Permutations of the 256 key bits, compiled to per-source-byte OR-mask tables
+
+A permutation π sends key bit s to bit π[s].  Compiling it builds, for each
+of the 32 source bytes i, a 256-entry table whose entry v is the 256-bit
+integer with bits π[8i + j] set for every bit j set in v.  Since a
+permutation moves disjoint bits to disjoint places, applying it is
+
+    sum(T[256 * i + key[i]] for i in range(32))
+
+32 lookups and integer additions, all inside sum(map(...)), with no
+per-bit Python work.  Permutations compose and invert in O(256), so
+families (for example "dot d -> bit π(d)" layouts composed with a byte
+traversal) are built from a few base permutations without recompiling by
+hand.  Partial maps (fewer than 256 sources, such as the 36 dots) use the
+same tables; unmapped source bits are dropped.
+
+Bit p is bit (7 - p % 8) of byte p // 8: the key's bits in reading order,
+as bit_tables.BITS lists them.
+"""
+import random
+from operator import add
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+NBITS = 256
+
+
+def bit_weight(p, nbits=NBITS):
+    """Integer value of bit p (reading order) in an nbits-bit big-endian key"""
+    return 1 << (nbits - 1 - p)
+
+
+class BitMap:
+    """Injective map from source bits to destination bits, compiled on first use"""
+
+    def __init__(self, mapping, nbits=NBITS, name=''):
+        # mapping: list where mapping[s] is the destination of bit s (None: dropped)
+        self.mapping = list(mapping) + [None] * (nbits - len(mapping))
+        self.nbits = nbits
+        self.name = name
+        targets = [d for d in self.mapping if d is not None]
+        if len(set(targets)) != len(targets):
+            raise ValueError("Two source bits map to the same destination")
+        if any(not 0 <= d < nbits for d in targets):
+            raise ValueError("Destination bit out of range")
+        # Start of each source byte's block in the flat table
+        self.offsets = [256 * i for i in range(nbits // 8)]
+        self._table = None
+
+    @property
+    def is_permutation(self):
+        return None not in self.mapping
+
+    @property
+    def table(self):
+        """Flat OR-mask table, table[256 * i + v]"""
+        if self._table is None:
+            table = []
+            for i in range(self.nbits // 8):
+                weights = [0 if d is None else bit_weight(d, self.nbits)
+                           for d in self.mapping[8 * i:8 * i + 8]]
+                # entry v = entry without v's lowest set bit + that bit's weight
+                byte_table = [0] * 256
+                for v in range(1, 256):
+                    low = v & -v
+                    byte_table[v] = byte_table[v ^ low] + weights[7 - (low.bit_length() - 1)]
+                table.extend(byte_table)
+            self._table = table
+        return self._table
+
+    def apply_int(self, key):
+        """Permuted key as an integer"""
+        return sum(map(self.table.__getitem__, map(add, self.offsets, key)))
+
+    def __call__(self, key):
+        return self.apply_int(key).to_bytes(self.nbits // 8, 'big')
+
+    def apply_batch(self, keys):
+        getter = self.table.__getitem__
+        offsets = self.offsets
+        n = self.nbits // 8
+        return [sum(map(getter, map(add, offsets, key))).to_bytes(n, 'big') for key in keys]
+
+    def then(self, other):
+        """self followed by other"""
+        return BitMap([None if d is None else other.mapping[d] for d in self.mapping],
+                      self.nbits, f"{self.name}.{other.name}".strip('.'))
+
+    def inverse(self):
+        if not self.is_permutation:
+            raise ValueError("Only permutations can be inverted")
+        inv = [0] * self.nbits
+        for s, d in enumerate(self.mapping):
+            inv[d] = s
+        return BitMap(inv, self.nbits, f"{self.name}^-1")
+
+    def __eq__(self, other):
+        return isinstance(other, BitMap) and self.mapping == other.mapping
+
+    def __hash__(self):
+        return hash(tuple(self.mapping))
+
+    def __repr__(self):
+        return f"BitMap({self.name or '?'})"
+
+
+# Constructors
+
+def identity(nbits=NBITS):
+    return BitMap(range(nbits), nbits, 'id')
+
+
+def from_function(func, nbits=NBITS, name=''):
+    return BitMap([func(s) for s in range(nbits)], nbits, name)
+
+
+def byte_permutation(order, nbits=NBITS, name='bytes'):
+    """Output byte k is input byte order[k] (a traversal's gather)"""
+    dest = [0] * (nbits // 8)
+    for k, i in enumerate(order):
+        dest[i] = k
+    return BitMap([8 * dest[s // 8] + s % 8 for s in range(nbits)], nbits, name)
+
+
+def rotation(k, nbits=NBITS):
+    """Rotate the whole key left by k bits"""
+    return BitMap([(s - k) % nbits for s in range(nbits)], nbits, f"rotl{k}")
+
+
+def byte_bit_reversal(nbits=NBITS):
+    """Reverse the bits inside every byte"""
+    return BitMap([s - s % 8 + 7 - s % 8 for s in range(nbits)], nbits, 'bitrev')
+
+
+def random_permutation(rng, nbits=NBITS):
+    mapping = list(range(nbits))
+    rng.shuffle(mapping)
+    return BitMap(mapping, nbits, 'random')
+
+
+def naive_apply(bitmap, key):
+    """Bit-at-a-time reference implementation"""
+    out = 0
+    value = int.from_bytes(key, 'big')
+    for s, d in enumerate(bitmap.mapping):
+        if d is not None and value & bit_weight(s, bitmap.nbits):
+            out |= bit_weight(d, bitmap.nbits)
+    return out.to_bytes(bitmap.nbits // 8, 'big')
+
+
+def main():
+    import time
+
+    from triangle_traversal import TRAVERSALS
+
+    print("=== 256-bit Permutation Engine ===")
+    rng = random.Random(7)
+    key = bytes.fromhex(TX_ID)
+    keys = [rng.randbytes(32) for _ in range(200)]
+
+    perm = random_permutation(rng)
+    start = time.perf_counter()
+    perm.table
+    print(f"Compiled a random permutation in {(time.perf_counter() - start) * 1e3:.1f} ms "
+          f"({len(perm.table):,} table entries)")
+    assert all(perm(k) == naive_apply(perm, k) for k in keys)
+    assert all(perm.then(perm.inverse())(k) == k for k in keys)
+    other = rotation(13)
+    assert all(perm.then(other)(k) == other(perm(k)) for k in keys)
+    print("Matches the bit-at-a-time reference; compose and inverse agree")
+
+    spiral = TRAVERSALS['spiral']
+    as_bits = byte_permutation(spiral.indices, name='spiral')
+    assert as_bits(key) == spiral(key)
+    print(f"Spiral traversal as a bit permutation: {as_bits(key).hex()}")
+
+    # Dots as bits: the 36 dots of the triangle dropped onto key bits 100.. in reading order
+    dots = BitMap([100 + d for d in range(36)], name='dots@100')
+    pattern = (1 << 255) | (1 << 220)   # dot 0 and dot 35 set, in the first 36 source bits
+    print(f"Dots 0 and 35 placed at bits 100 and 135: {dots(pattern.to_bytes(32, 'big')).hex()}")
+
+    batch = keys * 50
+    start = time.perf_counter()
+    perm.apply_batch(batch)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for k in batch[:500]:
+        naive_apply(perm, k)
+    naive = (time.perf_counter() - start) / 500
+    print(f"\nBatch of {len(batch):,} keys: {len(batch) / elapsed:,.0f} keys/s "
+          f"({elapsed / len(batch) * 1e6:.2f} us/key, bit loop {naive * 1e6:.0f} us/key)")
+
+    # A family search: 64 rotations composed with the spiral, checked at the known bytes
+    family = [as_bits.then(rotation(k)) for k in range(64)]
+    start = time.perf_counter()
+    hits = [p.name for p in family if p(key)[7] == 9]
+    print(f"Family of {len(family)} composed permutations screened in "
+          f"{(time.perf_counter() - start) * 1e3:.1f} ms (incl. compilation), "
+          f"{len(hits)} with byte 7 == 9")
+
+
+if __name__ == "__main__":
+    main()
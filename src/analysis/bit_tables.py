@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Precomputed 256-entry bit tables and their batch forms over bytes
+
+Every per-bit operation the bit solvers use on a byte is one table lookup:
+rotate left/right by k, bit reversal, popcount, parity, the alternating
+(j + g) parity masks of the box transform, single-bit masks and the 8-bit
+MSB-first patterns themselves.  Tables are bytes objects so the batch
+versions run as bytes.translate over a whole key (or a whole batch of keys)
+at C speed, with no per-bit Python objects.
+
+Bit j of a pattern is counted MSB first, as in bin(v)[2:].zfill(8).
+"""
+from functools import lru_cache
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+
+
+def _rotl(v, k):
+    k %= 8
+    return ((v << k) | (v >> (8 - k))) & 0xFF
+
+
+# ROTL[k][v], ROTR[k][v] for k in 0..7
+ROTL = [bytes(_rotl(v, k) for v in range(256)) for k in range(8)]
+ROTR = [ROTL[-k % 8] for k in range(8)]
+BITREV = bytes(int(f"{v:08b}"[::-1], 2) for v in range(256))
+POPCOUNT = bytes(bin(v).count('1') for v in range(256))
+PARITY = bytes(c & 1 for c in POPCOUNT)
+# BIT_MASK[j]: bit j counted MSB first
+BIT_MASK = [0x80 >> j for j in range(8)]
+# ALTERNATING[g]: the bits j (MSB first) with j + g odd
+ALTERNATING = [sum(0x80 >> j for j in range(8) if (j + g) & 1) for g in range(8)]
+# BITS[v]: MSB-first tuple of v's bits; BITS_VALUE inverts it
+BITS = [tuple(v >> (7 - j) & 1 for j in range(8)) for v in range(256)]
+BITS_VALUE = {bits: v for v, bits in enumerate(BITS)}
+BIN8 = [f"{v:08b}" for v in range(256)]
+# Flat ROTL for per-position amounts: ROTL_FLAT[256 * k + v]
+ROTL_FLAT = b''.join(ROTL)
+
+
+def rotl(v, k):
+    return ROTL[k % 8][v]
+
+
+def rotr(v, k):
+    return ROTR[k % 8][v]
+
+
+def bits_of(v):
+    """MSB-first list of the 8 bits of a byte"""
+    return list(BITS[v])
+
+
+def from_bits(bits):
+    """Byte from 8 MSB-first bits (any sequence of 0/1 ints)"""
+    return BITS_VALUE[tuple(bits)]
+
+
+def bit_string(v, width=8):
+    return BIN8[v] if width == 8 else format(v, f'0{width}b')
+
+
+@lru_cache(maxsize=256)
+def xor_table(mask):
+    """Translate table flipping the bits of mask"""
+    return bytes(v ^ mask for v in range(256))
+
+
+# Batch versions over bytes
+
+def rotl_bytes(data, k):
+    return bytes(data).translate(ROTL[k % 8])
+
+
+def rotr_bytes(data, k):
+    return bytes(data).translate(ROTR[k % 8])
+
+
+def rotl_positions(data, amounts):
+    """Rotate byte i left by amounts[i] (per-position amounts)"""
+    return bytes(map(ROTL_FLAT.__getitem__, map(lambda v, k: ((k & 7) << 8) | v, data, amounts)))
+
+
+def bitrev_bytes(data):
+    return bytes(data).translate(BITREV)
+
+
+def xor_bytes(a, b):
+    """Bytewise XOR of equal-length strings as one big-integer XOR"""
+    n = len(a)
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(n, 'big')
+
+
+def xor_mask_bytes(data, mask):
+    """XOR every byte with the same mask"""
+    return bytes(data).translate(xor_table(mask & 0xFF))
+
+
+def popcount_bytes(data):
+    return sum(bytes(data).translate(POPCOUNT))
+
+
+def parity_bytes(data):
+    return bytes(data).translate(PARITY)
+
+
+def pack_bits(bits):
+    """MSB-first bit sequence to bytes; a trailing partial byte is dropped"""
+    bits = tuple(bits)
+    return bytes(BITS_VALUE[bits[i:i + 8]] for i in range(0, len(bits) - 7, 8))
+
+
+def unpack_bits(data):
+    """bytes to an MSB-first list of bits"""
+    out = []
+    for v in data:
+        out.extend(BITS[v])
+    return out
+
+
+def main():
+    import time
+
+    print("=== Bit Tables ===")
+    data = bytes.fromhex(TX_ID)
+    assert all(from_bits(bits_of(v)) == v for v in range(256))
+    assert all(rotr(rotl(v, k), k) == v for v in range(256) for k in range(8))
+    assert all(BITREV[BITREV[v]] == v for v in range(256))
+    assert pack_bits(unpack_bits(data)) == data
+    assert rotl_positions(data, range(32)) == bytes(rotl(v, i) for i, v in enumerate(data))
+    print(f"TX id popcount {popcount_bytes(data)}, rotl 3 {rotl_bytes(data, 3).hex()[:16]}..., "
+          f"bit-reversed {bitrev_bytes(data).hex()[:16]}...")
+
+    def via_bit_lists(v, k):
+        # The get_bit_pattern / bits_to_int round trip these tables replace
+        bits = [int(b) for b in bin(v)[2:].zfill(8)]
+        return int(''.join(str(b) for b in bits[k:] + bits[:k]), 2)
+
+    values = list(data) * 625
+    start = time.perf_counter()
+    for v in values:
+        via_bit_lists(v, 3)
+    strings = time.perf_counter() - start
+    start = time.perf_counter()
+    for v in values:
+        ROTL[3][v]
+    table = time.perf_counter() - start
+    batch = bytes(values)
+    start = time.perf_counter()
+    batch.translate(ROTL[3])
+    translate = time.perf_counter() - start
+    print(f"Rotate {len(values):,} bytes: bit lists {strings * 1e3:.1f} ms, table lookups "
+          f"{table * 1e3:.2f} ms, one translate {translate * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
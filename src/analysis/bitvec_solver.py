@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Small bit-vector constraint solver for the free constants of a chain template
+
+A template is a function (x, params, pos) -> byte describing what one chain
+does to the TX byte x at position pos, with params mapping names to the free
+8-bit constants (diagonal keys, offsets, rotation amounts...).  The solver
+runs the template on partially known values (every bit is 0, 1 or unknown),
+so each partial assignment of parameter bits tells which known-position bits
+are already decided.  Every intermediate value wraps to 8 bits, as each step
+of a byte chain does; complete assignments are checked the same way, so the
+pruning and the final check agree on what a template computes.  Conflicting branches are pruned, bits forced by a
+single consistent value are propagated, and the remaining bits are assigned
+least significant first, which suits add/sub/xor chains where low output
+bits only depend on low input bits.
+
+Example:
+    template = lambda x, p, pos: rotl((x ^ p['a']) + p['b'], 3)
+    BitVectorSolver(template, ['a', 'b']).solve()
+"""
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+KNOWN_POS = {7: 9, 22: 22, 25: 7}
+WIDTH = 8
+FULL = (1 << WIDTH) - 1
+
+
+class BitVec:
+    """8-bit value with per-bit knowledge: bit i is known when mask bit i is set"""
+    __slots__ = ('value', 'mask')
+
+    def __init__(self, value=0, mask=FULL):
+        self.mask = mask & FULL
+        self.value = value & self.mask
+
+    @staticmethod
+    def wrap(v):
+        return v if isinstance(v, BitVec) else BitVec(v)
+
+    @property
+    def known(self):
+        return self.mask == FULL
+
+    def __repr__(self):
+        bits = ''.join(('1' if (self.value >> i) & 1 else '0') if (self.mask >> i) & 1 else '?'
+                       for i in reversed(range(WIDTH)))
+        return f"BitVec({bits})"
+
+    def conflicts(self, target):
+        """True if a known bit disagrees with target"""
+        return bool((self.value ^ target) & self.mask)
+
+    # Bitwise operations
+    def __xor__(self, other):
+        other = BitVec.wrap(other)
+        return BitVec(self.value ^ other.value, self.mask & other.mask)
+
+    def __and__(self, other):
+        other = BitVec.wrap(other)
+        zeros = (self.mask & ~self.value) | (other.mask & ~other.value)
+        ones = self.value & other.value & self.mask & other.mask
+        return BitVec(ones, ones | zeros)
+
+    def __or__(self, other):
+        other = BitVec.wrap(other)
+        ones = (self.value & self.mask) | (other.value & other.mask)
+        zeros = self.mask & ~self.value & other.mask & ~other.value
+        return BitVec(ones, ones | zeros)
+
+    def __invert__(self):
+        return BitVec(~self.value, self.mask)
+
+    __rxor__ = __xor__
+    __rand__ = __and__
+    __ror__ = __or__
+
+    def __lshift__(self, k):
+        k = int(k)
+        return BitVec(self.value << k, (self.mask << k) | ((1 << k) - 1))
+
+    def __rshift__(self, k):
+        k = int(k)
+        return BitVec(self.value >> k, (self.mask >> k) | (FULL & ~(FULL >> k)))
+
+    # Arithmetic modulo 256
+    def _add(self, other, carry_in):
+        other = BitVec.wrap(other)
+        if self.mask == other.mask == FULL:
+            return BitVec(self.value + other.value + carry_in)
+        value = mask = 0
+        carry, carry_known = carry_in, True
+        for i in range(WIDTH):
+            a_known = (self.mask >> i) & 1
+            b_known = (other.mask >> i) & 1
+            a = (self.value >> i) & 1
+            b = (other.value >> i) & 1
+            if a_known and b_known and carry_known:
+                value |= (a ^ b ^ carry) << i
+                mask |= 1 << i
+                carry = (a & b) | (carry & (a ^ b))
+                continue
+            # Carry is decided if two of the three inputs are known and equal
+            ins = [(a, a_known), (b, b_known), (carry, carry_known)]
+            known_vals = [v for v, k in ins if k]
+            if known_vals.count(0) >= 2:
+                carry, carry_known = 0, True
+            elif known_vals.count(1) >= 2:
+                carry, carry_known = 1, True
+            else:
+                carry_known = False
+        return BitVec(value, mask)
+
+    def __add__(self, other):
+        return self._add(other, 0)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self._add(~BitVec.wrap(other), 1)
+
+    def __rsub__(self, other):
+        return BitVec.wrap(other)._add(~self, 1)
+
+    def __neg__(self):
+        return BitVec(0)._add(~self, 1)
+
+    def __mul__(self, other):
+        other = BitVec.wrap(other)
+        if self.known and other.known:
+            return BitVec(self.value * other.value)
+        if other.known and not self.known:
+            return other * self
+        result = BitVec(0)
+        for i in range(WIDTH):
+            if not (self.mask >> i) & 1:
+                # Unknown multiplier bit: the partial product is either 0 or other << i
+                shifted = other << i
+                zeros = shifted.mask & ~shifted.value
+                result = result + BitVec(0, zeros)
+            elif (self.value >> i) & 1:
+                result = result + (other << i)
+        return result
+
+    __rmul__ = __mul__
+
+    def __mod__(self, m):
+        m = int(m)
+        if m >= 1 << WIDTH:
+            return self
+        if m & (m - 1) == 0:
+            return self & (m - 1)
+        if self.known:
+            return BitVec(self.value % m)
+        bound = BitVec(m - 1)
+        # Unknown value modulo a non power of two: only the high zero bits are certain
+        return BitVec(0, FULL & ~((1 << bound.value.bit_length()) - 1))
+
+    def __floordiv__(self, d):
+        d = int(d)
+        if d & (d - 1) == 0:
+            return self >> (d.bit_length() - 1)
+        if self.known:
+            return BitVec(self.value // d)
+        return BitVec(0, FULL & ~((1 << (FULL // d).bit_length()) - 1))
+
+    def __int__(self):
+        if not self.known:
+            raise ValueError("BitVec is not fully known")
+        return self.value
+
+    __index__ = __int__
+
+
+def rotl(v, k):
+    """Rotate an 8-bit value (int or BitVec) left by k (int or BitVec)"""
+    if isinstance(k, BitVec):
+        if k.mask & 7 != 7:
+            # Unknown rotation amount: nothing is known about the result
+            return BitVec(0, 0)
+        k = k.value
+    k %= WIDTH
+    if isinstance(v, BitVec):
+        return BitVec((v.value << k) | (v.value >> (WIDTH - k)),
+                      (v.mask << k) | (v.mask >> (WIDTH - k)))
+    v &= FULL
+    return ((v << k) | (v >> (WIDTH - k))) & FULL
+
+
+def rotr(v, k):
+    if isinstance(k, BitVec):
+        return rotl(v, -k)
+    return rotl(v, -k % WIDTH)
+
+
+class BitVectorSolver:
+    """Finds every parameter assignment for which a template hits the known positions"""
+
+    def __init__(self, template, params, tx_bytes=None, known_pos=KNOWN_POS):
+        # params: list of 8-bit parameter names, or dict name -> bit width
+        # (e.g. 3 for a rotation amount)
+        if not isinstance(params, dict):
+            params = {name: WIDTH for name in params}
+        self.template = template
+        self.widths = dict(params)
+        self.params = list(params)
+        self.tx_bytes = tx_bytes if tx_bytes is not None else bytes.fromhex(TX_ID)
+        self.known_pos = dict(known_pos)
+        self.nodes = 0
+        self.evaluations = 0
+
+    def _conflict(self, state):
+        """Does any known position contradict the partial assignment?"""
+        params = {name: BitVec(v, m) for name, (v, m) in state.items()}
+        for pos, target in self.known_pos.items():
+            self.evaluations += 1
+            out = evaluate(self.template, self.tx_bytes[pos], params, pos)
+            if out.conflicts(target):
+                return True
+        return False
+
+    def _exact(self, state):
+        params = {name: BitVec(v) for name, (v, _) in state.items()}
+        return all(int(evaluate(self.template, self.tx_bytes[pos], params, pos)) == target
+                   for pos, target in self.known_pos.items())
+
+    def _propagate(self, state):
+        """Fix bits whose opposite value conflicts; None if the branch is dead"""
+        changed = True
+        while changed:
+            changed = False
+            for name in self.params:
+                value, mask = state[name]
+                for bit in range(self.widths[name]):
+                    if (mask >> bit) & 1:
+                        continue
+                    options = []
+                    for b in (0, 1):
+                        trial = dict(state)
+                        trial[name] = (value | (b << bit), mask | (1 << bit))
+                        if not self._conflict(trial):
+                            options.append(b)
+                    if not options:
+                        return None
+                    if len(options) == 1:
+                        value |= options[0] << bit
+                        mask |= 1 << bit
+                        state[name] = (value, mask)
+                        changed = True
+        return state
+
+    def _next_var(self, state):
+        for bit in range(WIDTH):
+            for name in self.params:
+                if bit < self.widths[name] and not (state[name][1] >> bit) & 1:
+                    return name, bit
+        return None
+
+    def solve(self, limit=None, propagate=True):
+        """All satisfying assignments as dicts name -> byte"""
+        self.nodes = self.evaluations = 0
+        solutions = []
+        # Bits above a parameter's width are known zeros from the start
+        stack = [{name: (0, FULL & ~((1 << w) - 1)) for name, w in self.widths.items()}]
+        while stack:
+            state = stack.pop()
+            self.nodes += 1
+            if self._conflict(state):
+                continue
+            if propagate:
+                state = self._propagate(state)
+                if state is None:
+                    continue
+            var = self._next_var(state)
+            if var is None:
+                if self._exact(state):
+                    solutions.append({name: v for name, (v, _) in state.items()})
+                    if limit and len(solutions) >= limit:
+                        break
+                continue
+            name, bit = var
+            value, mask = state[name]
+            for b in (1, 0):
+                child = dict(state)
+                child[name] = (value | (b << bit), mask | (1 << bit))
+                stack.append(child)
+        return sorted(solutions, key=lambda s: [s[n] for n in self.params])
+
+
+def evaluate(template, x, params, pos):
+    """Template output on BitVec inputs, so every intermediate wraps to 8 bits"""
+    return BitVec.wrap(template(BitVec(x), params, pos))
+
+
+def brute_force(template, params, tx_bytes=None, known_pos=KNOWN_POS):
+    """Reference enumeration over every assignment"""
+    from itertools import product
+    if not isinstance(params, dict):
+        params = {name: WIDTH for name in params}
+    tx_bytes = tx_bytes if tx_bytes is not None else bytes.fromhex(TX_ID)
+    found = []
+    for values in product(*(range(1 << w) for w in params.values())):
+        p = {name: BitVec(v) for name, v in zip(params, values)}
+        if all(int(evaluate(template, tx_bytes[pos], p, pos)) == target
+               for pos, target in known_pos.items()):
+            found.append(dict(zip(params, values)))
+    return found
+
+
+def main():
+    import time
+
+    # Diagonal bytes by row (i // 8), as in DiagonalBase58Solver
+    diag = [int(x, 16) for x in ['fc', '21', 'e9', '99', '66', '9c', 'b6']]
+
+    templates = {
+        '(x ^ a) + b': (lambda x, p, pos: (x ^ p['a']) + p['b'], ['a', 'b']),
+        '((x + k) ^ (row + col)) + diag[row] * m':
+            (lambda x, p, pos: ((x + p['k']) ^ (pos // 8 + pos % 8)) + diag[pos // 8] * p['m'], ['k', 'm']),
+        '(rotl(x, r) ^ a) + b - c * row':
+            (lambda x, p, pos: (rotl(x, p['r']) ^ p['a']) + p['b'] - p['c'] * (pos // 8),
+             {'r': 3, 'a': 8, 'b': 8, 'c': 8}),
+        'rotl(x ^ a, pos) + (b ^ row)':
+            (lambda x, p, pos: rotl(x ^ p['a'], pos % 8) + (p['b'] ^ (pos // 8)), ['a', 'b']),
+        # x * a wraps before the mod: a = 59 is not a solution here
+        '(x * a) % 58': (lambda x, p, pos: (x * p['a']) % 58, ['a']),
+    }
+
+    print("=== Bit-Vector Constraint Solver ===")
+    for name, (template, params) in templates.items():
+        solver = BitVectorSolver(template, params)
+        start = time.perf_counter()
+        solutions = solver.solve()
+        elapsed = time.perf_counter() - start
+        print(f"\nTemplate: {name}")
+        space = 1
+        for w in solver.widths.values():
+            space <<= w
+        print(f"Free parameters: {solver.params} (brute force: {space:,} assignments)")
+        print(f"Solutions: {len(solutions)} in {elapsed:.3f}s, "
+              f"{solver.nodes} nodes, {solver.evaluations} template evaluations")
+        for s in solutions[:8]:
+            print(f"  {s}")
+        if len(params) <= 2:
+            reference = brute_force(template, params)
+            agrees = sorted(map(str, reference)) == sorted(map(str, solutions))
+            print(f"Brute force agrees: {agrees}")
+            assert agrees
+
+
+if __name__ == "__main__":
+    main()
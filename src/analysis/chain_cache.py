@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of compiled chain tables, keyed by spec hash
+
+A compiled chain is stored once per (normalized spec, context, parameters)
+under the BLAKE2b hash of that key, in a directory named after the op
+library version: chain_dsl.OP_LIBRARY_VERSION plus a hash of the bytecode of
+the op and table-building functions, so editing an op invalidates every
+stored table without anyone remembering to bump a number.  Entries of other
+versions are deleted when the cache is opened.
+
+Each entry is one file:
+
+    header   b'DOTC', flags (u8), width (u16), fingerprint (u64)
+    tables   width x 256 bytes, as CompiledChain.flat
+    affine   optional: per-position (a, b) with lut[x] = a*x + b mod 256
+             and/or per-position 8 GF(2) columns + constant
+
+An entry is a few KiB, so a load reads the whole file into bytes and keeps
+no file or mapping open.  Every hit touches the file's mtime, and when the
+cache grows past max_bytes the least recently used entries are removed.
+"""
+import hashlib
+from importlib.util import MAGIC_NUMBER
+import os
+import re
+import struct
+
+import chain_dsl
+from chain_dedupe import fingerprint_tables
+from chain_dsl import DEFAULT_CONTEXT, CompiledChain, compile_chain, normalize
+
+# Constants
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'dot2btc', 'chains')
+MAGIC = b'DOTC'
+HEADER = struct.Struct('<4sBHQ')
+FLAG_AFFINE_MOD = 1
+FLAG_AFFINE_GF2 = 2
+MAX_BYTES = 256 << 20
+# Directory names library_version() produces; only these are ever purged
+VERSION_DIR = re.compile(r'v\d+-[0-9a-f]{12}')
+
+
+def _hash_code(h, code):
+    """Feed a code object's bytecode, names and constants (recursively) to h"""
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _hash_code(h, const)
+        elif isinstance(const, frozenset):
+            # Set iteration order depends on the hash seed
+            h.update(repr(sorted(const, key=repr)).encode())
+        else:
+            h.update(repr(const).encode())
+
+
+def library_version():
+    """OP_LIBRARY_VERSION plus a hash of the code that defines what ops compute
+
+    Hashes bytecode rather than source so it also works when only .pyc files
+    are deployed; line numbers and comments do not change the version.
+    """
+    h = hashlib.blake2b(MAGIC_NUMBER, digest_size=6)
+    funcs = [chain_dsl.rotl8, chain_dsl.apply_op, chain_dsl.operands, chain_dsl.step_tables]
+    funcs += [f for _, f in sorted(vars(chain_dsl.ChainContext).items())
+              if hasattr(f, '__code__')]
+    funcs += [p.fget for _, p in sorted(vars(chain_dsl.ChainContext).items())
+              if isinstance(p, property)]
+    for f in funcs:
+        _hash_code(h, f.__code__)
+    return f"v{chain_dsl.OP_LIBRARY_VERSION}-{h.hexdigest()}"
+
+
+def affine_mod256(luts):
+    """[(a, b)] with lut[x] == a*x + b mod 256 at every position, or None"""
+    coeffs = []
+    for lut in luts:
+        b = lut[0]
+        a = (lut[1] - b) & 0xFF
+        if bytes((a * x + b) & 0xFF for x in range(256)) != lut:
+            return None
+        coeffs.append((a, b))
+    return coeffs
+
+
+def affine_gf2(luts):
+    """[(columns, c)] with lut[x] == XOR of columns[j] for set bits j, XOR c; or None"""
+    coeffs = []
+    for lut in luts:
+        c = lut[0]
+        columns = [lut[1 << j] ^ c for j in range(8)]
+        # expected[x] = expected[x without its lowest bit] ^ column of that bit
+        expected = bytearray([c])
+        for j in range(8):
+            expected += bytes(y ^ columns[j] for y in expected)
+        if expected != lut:
+            return None
+        coeffs.append((columns, c))
+    return coeffs
+
+
+class ChainCache:
+    """Content-addressed, size-bounded store of compiled chains"""
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=MAX_BYTES, version=None):
+        self.version = version or library_version()
+        self.root = directory
+        self.directory = os.path.join(directory, self.version)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evicted = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._purge_other_versions()
+        self.size = sum(os.path.getsize(p) for p in self._entries())
+
+    def _purge_other_versions(self):
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name != self.version and VERSION_DIR.fullmatch(name) and os.path.isdir(path):
+                for dirpath, _, files in os.walk(path, topdown=False):
+                    for f in files:
+                        os.remove(os.path.join(dirpath, f))
+                    os.rmdir(dirpath)
+
+    def _entries(self):
+        for dirpath, _, files in os.walk(self.directory):
+            for f in files:
+                if f.endswith('.chain'):
+                    yield os.path.join(dirpath, f)
+
+    def key(self, spec, context=None, params=None):
+        context = context or DEFAULT_CONTEXT
+        text = repr((normalize(spec), context.key, tuple(sorted((params or {}).items()))))
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.chain')
+
+    def get(self, spec, context=None, params=None):
+        """CompiledChain from disk, compiling and storing it on a miss"""
+        path = self.path(self.key(spec, context, params))
+        try:
+            chain = self.load(path, normalize(spec))
+        except FileNotFoundError:
+            chain = None
+        if chain is not None:
+            self.hits += 1
+            os.utime(path)
+            return chain
+        self.misses += 1
+        chain = compile_chain(spec, context, params)
+        self.store(path, chain)
+        return chain
+
+    def load(self, path, spec):
+        """Read an entry; returns None (and drops the file) if it is corrupt"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            os.remove(path)
+            return None
+        magic, flags, width, fp = HEADER.unpack_from(data)
+        end = HEADER.size + width * 256
+        if magic != MAGIC or len(data) < end:
+            os.remove(path)
+            return None
+        chain = CompiledChain.from_flat(spec, data[HEADER.size:end], width)
+        chain.fingerprint = fp
+        chain.affine_mod = chain.affine_gf2 = None
+        if flags & FLAG_AFFINE_MOD:
+            raw = data[end:end + 2 * width]
+            chain.affine_mod = list(zip(raw[0::2], raw[1::2]))
+            end += 2 * width
+        if flags & FLAG_AFFINE_GF2:
+            raw = data[end:end + 9 * width]
+            chain.affine_gf2 = [(list(raw[9 * i:9 * i + 8]), raw[9 * i + 8]) for i in range(width)]
+        return chain
+
+    def store(self, path, chain):
+        """Write an entry, setting the chain's fingerprint and affine attributes as loads do"""
+        chain.fingerprint = fingerprint_tables(chain.luts)
+        chain.affine_mod = affine_mod256(chain.luts)
+        chain.affine_gf2 = affine_gf2(chain.luts)
+        flags = 0
+        tail = b''
+        if chain.affine_mod is not None:
+            flags |= FLAG_AFFINE_MOD
+            tail += bytes(v for pair in chain.affine_mod for v in pair)
+        if chain.affine_gf2 is not None:
+            flags |= FLAG_AFFINE_GF2
+            tail += b''.join(bytes(columns) + bytes([c]) for columns, c in chain.affine_gf2)
+        data = HEADER.pack(MAGIC, flags, chain.width, chain.fingerprint) + chain.flat + tail
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        try:
+            self.size -= os.path.getsize(path)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self, target=None):
+        """Remove least recently used entries until the cache is below target bytes"""
+        target = self.max_bytes * 3 // 4 if target is None else target
+        entries = []
+        for path in self._entries():
+            st = os.stat(path)
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        entries.sort()
+        size = sum(s for _, s, _ in entries)
+        for _, s, path in entries:
+            if size <= target:
+                break
+            os.remove(path)
+            size -= s
+            self.evicted += 1
+        self.size = size
+
+    def clear(self):
+        self.evict(0)
+
+
+def main():
+    import shutil
+    import tempfile
+    import time
+
+    from chain_dedupe import spec_family
+
+    specs = spec_family()
+    root = tempfile.mkdtemp(prefix='chain_cache_')
+    print("=== Compiled Chain Cache ===")
+    print(f"Cache {root}, op library {library_version()}, {len(specs)} specs")
+    try:
+        os.makedirs(os.path.join(root, 'codegen'))   # someone else's data under the same root
+        cache = ChainCache(root)
+        start = time.perf_counter()
+        cold = [cache.get(spec) for spec in specs]
+        print(f"Cold run:  {time.perf_counter() - start:.2f}s ({cache.misses} compiled and stored, "
+              f"{cache.size / 2**20:.1f} MiB)")
+        affine = sum(1 for spec in specs[:200] if cache.get(spec).affine_mod is not None)
+        print(f"  {affine} of the first 200 chains are affine mod 256")
+
+        # A new session: nothing compiled in memory
+        chain_dsl._compile_normalized.cache_clear()
+        chain_dsl.op_table.cache_clear()
+        cache = ChainCache(root)
+        start = time.perf_counter()
+        warm = [cache.get(spec) for spec in specs]
+        load = time.perf_counter() - start
+        print(f"Warm run:  {load:.2f}s ({cache.hits} hits, {cache.misses} misses, "
+              f"{chain_dsl.cache_info().misses} compilations)")
+        tx = DEFAULT_CONTEXT.tx_bytes
+        assert all(a(tx) == b(tx) and a.fingerprint == b.fingerprint for a, b in zip(cold, warm))
+        print("Loaded chains give the same outputs and fingerprints")
+        del cold, warm
+        size = cache.size
+        cache.store(cache.path(cache.key(specs[0])), compile_chain(specs[0]))
+        assert cache.size == size
+
+        small = ChainCache(root, max_bytes=2 << 20)
+        small.get("tri:xor(99) box:add(row)")
+        print(f"\nWith a 2 MiB bound: {small.evicted} least recently used entries evicted, "
+              f"{small.size / 2**20:.1f} MiB left")
+
+        bumped = ChainCache(root, version='v2-test')
+        print(f"Opening under another op library version removes the old entries and nothing "
+              f"else: {sorted(os.listdir(root))}, {bumped.size} bytes")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Source-generating backend for chain specs
+
+Instead of running a chain stage by stage, this emits Python source with one
+straight-line block per position: operands are evaluated at generation time,
+runs of add/xor/rotl steps are folded into a single constant, pinned
+positions become constants, and a separate screen() function computes only
+the known positions with an early exit.  The source is compiled once and the
+code object is cached on disk (marshal) keyed by a hash of the chain.
+"""
+import hashlib
+import importlib.util
+import marshal
+import os
+
+from chain_dsl import (DEFAULT_CONTEXT, KNOWN_POS, OP_LIBRARY_VERSION, apply_op, normalize,
+                       operands, parse_chain)
+
+CODEGEN_VERSION = 1
+CACHE_DIR = os.path.join(os.environ.get('CHAIN_CACHE_DIR', os.path.expanduser('~/.cache/dot2btc')),
+                         'codegen')
+
+
+def fold_position(steps, step_operands, pos):
+    """Reduce the ops applied at one position to ('const', c) or ('ops', [(op, k)])"""
+    ops = []
+    for step, values in zip(steps, step_operands):
+        op, k = step.op, values[pos]
+        if op == 'pin':
+            if k is not None:
+                ops = [('const', k)]
+            continue
+        if op == 'none':
+            continue
+        if op == 'not':
+            op, k = 'xor', 0xFF
+        elif op == 'sub':
+            op, k = 'add', -k
+        elif op == 'rotr':
+            op, k = 'rotl', -k
+        if op in ('add', 'xor', 'rotl'):
+            k = k % 8 if op == 'rotl' else k & 0xFF
+            if ops and ops[-1][0] == 'const':
+                ops[-1] = ('const', apply_op(op, ops[-1][1], k))
+                continue
+            if ops and ops[-1][0] == op:
+                prev = ops.pop()[1]
+                k = (prev ^ k) if op == 'xor' else (prev + k) % (8 if op == 'rotl' else 256)
+            if k:
+                ops.append((op, k))
+            continue
+        if ops and ops[-1][0] == 'const':
+            ops[-1] = ('const', apply_op(op, ops[-1][1], k))
+            continue
+        if op == 'mul':
+            k &= 0xFF
+            if k == 1:
+                continue
+            if k == 0:
+                ops = [('const', 0)]
+                continue
+        elif op == 'and':
+            k &= 0xFF
+            if k == 0xFF:
+                continue
+            if k == 0:
+                ops = [('const', 0)]
+                continue
+        elif op == 'or':
+            k &= 0xFF
+            if k == 0:
+                continue
+            if k == 0xFF:
+                ops = [('const', 0xFF)]
+                continue
+        elif op == 'mod' and k <= 0:
+            continue
+        ops.append((op, k))
+    if ops and ops[0][0] == 'const':
+        return ('const', ops[0][1])
+    return ('ops', ops)
+
+
+def _statement(op, k):
+    if op == 'add':
+        return f"v = (v + {k}) & 255"
+    if op == 'xor':
+        return f"v ^= {k}"
+    if op == 'rotl':
+        return f"v = ((v << {k}) | (v >> {8 - k})) & 255"
+    if op == 'mul':
+        return f"v = (v * {k}) & 255"
+    if op == 'and':
+        return f"v &= {k}"
+    if op == 'or':
+        return f"v |= {k}"
+    if op == 'mod':
+        return f"v %= {k}"
+    raise ValueError(f"Cannot generate code for {op}")
+
+
+def _position_block(name, folded, pos, indent='    '):
+    kind, value = folded
+    if kind == 'const':
+        return [f"{indent}{name} = {value}"]
+    ops = value
+    if not ops:
+        return [f"{indent}{name} = d[{pos}]"]
+    if len(ops) == 1 and ops[0][0] == 'xor':
+        return [f"{indent}{name} = d[{pos}] ^ {ops[0][1]}"]
+    lines = [f"{indent}v = d[{pos}]"]
+    lines += [indent + _statement(op, k) for op, k in ops]
+    lines.append(f"{indent}{name} = v")
+    return lines
+
+
+def generate_source(spec, context=None, params=None, known_pos=None):
+    """Python source defining run(d) and screen(d) for one chain"""
+    context = context or DEFAULT_CONTEXT
+    known_pos = context.known_pos if known_pos is None else known_pos
+    params = params or {}
+    steps = parse_chain(spec)
+    step_operands = [operands(step, context, params) for step in steps]
+    folded = [fold_position(steps, step_operands, pos) for pos in range(context.width)]
+
+    lines = [f"# Generated from: {normalize(spec)}", "def run(d):"]
+    for pos in range(context.width):
+        lines += _position_block(f"o{pos}", folded[pos], pos)
+    outputs = ', '.join(f"o{pos}" for pos in range(context.width))
+    lines.append(f"    return bytes(({outputs},))")
+    lines.append("")
+    lines.append("def screen(d):")
+    for pos, target in sorted(known_pos.items()):
+        kind, value = folded[pos]
+        if kind == 'const':
+            if value != target:
+                lines.append("    return False")
+                break
+            continue
+        lines += _position_block('v', folded[pos], pos)
+        lines.append(f"    if v != {target}:")
+        lines.append("        return False")
+    else:
+        lines.append("    return True")
+    return '\n'.join(lines) + '\n'
+
+
+def chain_hash(spec, context=None, params=None):
+    context = context or DEFAULT_CONTEXT
+    h = hashlib.sha256()
+    h.update(f"codegen-v{CODEGEN_VERSION}-ops-v{OP_LIBRARY_VERSION}\n".encode())
+    h.update(importlib.util.MAGIC_NUMBER)
+    h.update(f"\n{normalize(spec)}\n".encode())
+    h.update(repr((context.key, sorted((params or {}).items()))).encode())
+    return h.hexdigest()
+
+
+class GeneratedChain:
+    def __init__(self, spec, namespace, source=None):
+        self.spec = spec
+        self.run = namespace['run']
+        self.screen = namespace['screen']
+        self.source = source
+
+    def __call__(self, data):
+        return self.run(data)
+
+
+def load_chain(spec, context=None, params=None, cache_dir=CACHE_DIR):
+    """Generated chain for a spec, compiling it only if it is not cached on disk"""
+    key = chain_hash(spec, context, params)
+    path = os.path.join(cache_dir, key[:2], key + '.marshal') if cache_dir else None
+    code = source = None
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                code = marshal.load(f)
+        except (EOFError, ValueError, TypeError):
+            code = None
+    if code is None:
+        source = generate_source(spec, context, params)
+        code = compile(source, f"<chain {key[:12]}>", 'exec')
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                marshal.dump(code, f)
+            os.replace(tmp, path)
+    namespace = {}
+    exec(code, namespace)
+    return GeneratedChain(normalize(spec), namespace, source)
+
+
+def make_interpreter(spec, context=None, params=None):
+    """Reference stage-by-stage evaluator: one pass and one temporary per step"""
+    context = context or DEFAULT_CONTEXT
+    steps = [(step.op, operands(step, context, params or {})) for step in parse_chain(spec)]
+
+    def run(data):
+        for op, values in steps:
+            out = bytearray(len(data))
+            for i, x in enumerate(data):
+                k = values[i]
+                if op == 'pin':
+                    out[i] = x if k is None else k
+                else:
+                    out[i] = apply_op(op, x, k)
+            data = bytes(out)
+        return data
+
+    return run
+
+
+def main():
+    import tempfile
+    import time
+    from chain_dsl import DEMO_SPECS, compile_chain, free_params
+
+    tx_bytes = DEFAULT_CONTEXT.tx_bytes
+    cache_dir = tempfile.mkdtemp(prefix='chain_codegen_')
+
+    print("=== Chain Code Generator ===")
+    print(generate_source(DEMO_SPECS[0])[:600] + "...\n")
+
+    n = 5000
+    print(f"{'chain':<60}{'interp/s':>12}{'table/s':>12}{'codegen/s':>12}{'speedup':>9}")
+    for spec in DEMO_SPECS:
+        params = {name: 0x16 for name in free_params(spec)}
+        generated = load_chain(spec, params=params, cache_dir=cache_dir)
+        table = compile_chain(spec, params=params)
+        interpreter = make_interpreter(spec, params=params)
+        reference = interpreter(tx_bytes)
+        assert generated(tx_bytes) == reference == table(tx_bytes)
+        assert generated.screen(tx_bytes) == all(reference[p] == v for p, v in KNOWN_POS.items())
+
+        rates = []
+        for func in (interpreter, table, generated.run):
+            start = time.perf_counter()
+            for _ in range(n):
+                func(tx_bytes)
+            rates.append(n / (time.perf_counter() - start))
+        label = normalize(spec)
+        label = label if len(label) < 58 else label[:55] + '...'
+        print(f"{label:<60}{rates[0]:>12,.0f}{rates[1]:>12,.0f}{rates[2]:>12,.0f}{rates[2] / rates[0]:>8.1f}x")
+
+    start = time.perf_counter()
+    for spec in DEMO_SPECS:
+        load_chain(spec, params={name: 0x16 for name in free_params(spec)}, cache_dir=cache_dir)
+    print(f"\nReloaded {len(DEMO_SPECS)} chains from the code cache in "
+          f"{(time.perf_counter() - start) * 1e3:.2f} ms")
+
+    generated = load_chain(DEMO_SPECS[0], cache_dir=cache_dir)
+    start = time.perf_counter()
+    for _ in range(n * 10):
+        generated.screen(tx_bytes)
+    print(f"Known-position screen: {n * 10 / (time.perf_counter() - start):,.0f} checks/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Dedupe functionally identical chains before evaluating them
+
+Two chains are equivalent exactly when their compiled per-position tables
+(width positions x 256 input values) are equal, whatever ops produced them:
+XOR-then-XOR with swapped constants, rotations summing to 8, add/sub pairs
+that cancel.  Each chain is fingerprinted by a 64-bit BLAKE2b hash of its
+tables, and fingerprints already evaluated are kept in a compact
+open-addressing set (8 bytes per slot).
+"""
+import hashlib
+from array import array
+
+from chain_dsl import compile_chain
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+WIDTH = 32
+
+
+def fingerprint_tables(luts):
+    """64-bit fingerprint of per-position 256-byte tables"""
+    h = hashlib.blake2b(digest_size=8)
+    for lut in luts:
+        h.update(lut)
+    return int.from_bytes(h.digest(), 'little')
+
+
+def fingerprint(chain):
+    """Fingerprint of a CompiledChain"""
+    return fingerprint_tables(chain.luts)
+
+
+def function_tables(func, width=WIDTH):
+    """Per-position tables of func(pos, x) -> byte"""
+    return [bytes(func(pos, x) & 0xFF for x in range(256)) for pos in range(width)]
+
+
+def fingerprint_function(func, width=WIDTH):
+    return fingerprint_tables(function_tables(func, width))
+
+
+class FingerprintSet:
+    """Open-addressing set of 64-bit fingerprints in a flat array"""
+
+    def __init__(self, capacity=1 << 12):
+        size = 1
+        while size < 2 * capacity:
+            size <<= 1
+        self.slots = array('Q', bytes(8 * size))
+        self.mask = size - 1
+        self.count = 0
+
+    def _find(self, fp):
+        # Slot holding fp, or the empty slot where it would go
+        slots, mask = self.slots, self.mask
+        i = fp & mask
+        while True:
+            v = slots[i]
+            if v == 0 or v == fp:
+                return i
+            i = (i + 1) & mask
+
+    def add(self, fp):
+        """Insert fp; returns True if it was not already present"""
+        fp = fp or 1  # 0 marks an empty slot
+        i = self._find(fp)
+        if self.slots[i] == fp:
+            return False
+        self.slots[i] = fp
+        self.count += 1
+        if 2 * self.count > len(self.slots):
+            self._grow()
+        return True
+
+    def __contains__(self, fp):
+        fp = fp or 1
+        return self.slots[self._find(fp)] == fp
+
+    def _grow(self):
+        old = self.slots
+        self.slots = array('Q', bytes(16 * len(old)))
+        self.mask = len(self.slots) - 1
+        for fp in old:
+            if fp:
+                self.slots[self._find(fp)] = fp
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return self.slots.itemsize * len(self.slots)
+
+
+class ChainDeduper:
+    """Drops chains whose behaviour has already been seen"""
+
+    def __init__(self, capacity=1 << 12):
+        self.seen = FingerprintSet(capacity)
+        self.checked = 0
+        self.dropped = 0
+
+    def is_new(self, fp):
+        self.checked += 1
+        if self.seen.add(fp):
+            return True
+        self.dropped += 1
+        return False
+
+    def is_new_chain(self, chain):
+        return self.is_new(fingerprint(chain))
+
+    def filter_specs(self, specs, context=None, params=None):
+        """Yield (spec, compiled chain) for the first spec of each equivalence class"""
+        for spec in specs:
+            chain = compile_chain(spec, context, params)
+            if self.is_new_chain(chain):
+                yield spec, chain
+
+    def filter_functions(self, funcs, width=WIDTH):
+        """Yield (label, func) for each behaviourally distinct func(pos, x)"""
+        for label, func in funcs:
+            if self.is_new(fingerprint_function(func, width)):
+                yield label, func
+
+
+def double_triangle_family():
+    """The 4 x 4 transform combinations of DoubleTriangleSolver.test_combined_transforms"""
+    tx_bytes = bytes.fromhex(TX_ID)
+    diagonal = [tx_bytes[p] for p in [0, 2, 5, 9, 14, 20, 27]]
+    transforms = [
+        lambda x, d, r, c: (x + d + r) % 256,
+        lambda x, d, r, c: (x ^ d ^ r) % 256,
+        lambda x, d, r, c: ((x + d) ^ r) % 256,
+        lambda x, d, r, c: ((x ^ d) + r) % 256
+    ]
+    family = []
+    for i, t1 in enumerate(transforms):
+        for j, t2 in enumerate(transforms):
+            def chain(pos, x, t1=t1, t2=t2):
+                row, col = pos // 8, pos % 8
+                first = t1(x, diagonal[row], row, col)
+                return t2(first, diagonal[len(diagonal) - 1 - row], row, col)
+            family.append((f"double_triangle {i},{j}", chain))
+    return family
+
+
+def position22_family():
+    """Position22ChainSolver.generate_position22_transforms, applied twice in every order"""
+    transforms = {
+        'preserve': lambda x, p: x if p == 22 else x,
+        'xor_pos': lambda x, p: x ^ p,
+        'add_pos': lambda x, p: (x + p) % 256,
+        'sub_pos': lambda x, p: (x - p) % 256,
+        'xor_val22': lambda x, p: x ^ 22,
+        'add_val22': lambda x, p: (x + 22) % 256,
+        'sub_val22': lambda x, p: (x - 22) % 256
+    }
+    family = []
+    for a, ta in transforms.items():
+        for b, tb in transforms.items():
+            family.append((f"{a}->{b}", lambda pos, x, ta=ta, tb=tb: tb(ta(x, pos), pos)))
+    return family
+
+
+def spec_family():
+    """Two-step DSL chains over xor/add/sub/rotl with small constants"""
+    ops = ['xor', 'add', 'sub', 'rotl', 'rotr']
+    args = ['0', '1', '7', '8', '22', 'row', 'i % 8']
+    steps = [f"{op}({arg})" for op in ops for arg in args]
+    return [f"tri:{a} box:{b}" for a in steps for b in steps]
+
+
+def main():
+    import time
+
+    print("=== Chain Equivalence Dedupe ===")
+    for name, family in [('DoubleTriangleSolver 4x4', double_triangle_family()),
+                         ('Position22 transform pairs', position22_family())]:
+        dedupe = ChainDeduper()
+        unique = list(dedupe.filter_functions(family))
+        print(f"\n{name}: {len(family)} chains -> {len(unique)} distinct")
+
+    specs = spec_family()
+    dedupe = ChainDeduper()
+    start = time.perf_counter()
+    unique = list(dedupe.filter_specs(specs))
+    elapsed = time.perf_counter() - start
+    print(f"\nTwo-step DSL chains: {len(specs)} specs -> {len(unique)} distinct "
+          f"({dedupe.dropped} dropped) in {elapsed:.2f}s")
+    print(f"Fingerprint set: {len(dedupe.seen)} entries in {dedupe.seen.nbytes} bytes")
+    for spec in ["tri:xor(7) box:xor(22)", "tri:rotl(3) box:rotr(3)", "tri:add(row) box:sub(row)"]:
+        print(f"  {spec!r} duplicate: {fingerprint(compile_chain(spec)) in dedupe.seen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Compact text language for symbol transformation chains
+
+A chain is a whitespace separated list of steps  symbol:op(expr) , e.g.
+
+    tri:add(diag[row]) box:xor(row*col%8) circ:rotl(i%8) tri:xor(rdiag[row]) grid:add((i)%58) fin:none
+
+symbol is one of tri/box/circ/grid/fin (or △❒●⧉▣) and only labels the stage.
+op is applied to every byte x with the per-position operand expr:
+
+    add sub xor mul and or rotl rotr mod   x op expr (mod 256)
+    not none pin                           no operand; pin sets the known positions
+
+Operand expressions use integer arithmetic over the names
+    i, row (i // 8), col (i % 8), trow/tcol (red dot triangle row/column),
+    tx[...], diag[...], rdiag[...] (triangle diagonal of the TX id and its
+    reverse), b58[...] (alphabet index of each character of the Base58 string)
+and any other name is a free parameter that must be bound when compiling.
+
+Since operands never depend on x, a compiled chain is one 256-entry table per
+position.  Compiled chains are cached by their normalized spec text.
+"""
+import ast
+import sys
+from functools import lru_cache
+from operator import add as _add
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+# Bump when an op's semantics change; persisted compilations (chain_cache.py) are keyed on it
+OP_LIBRARY_VERSION = 1
+B58_STRING = "J2LM1xeN3WPiPYgasXB6zZZzcCzM6gNUh77BaiWNmPAJ"
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+KNOWN_POS = {7: 9, 22: 22, 25: 7}
+DIAGONAL = [0, 2, 5, 9, 14, 20, 27, 35]
+TRIANGLE = [
+    [0],
+    [1,2],
+    [3,4,5],
+    [6,7,8,9],
+    [10,11,12,13,14],
+    [15,16,17,18,19,20],
+    [21,22,23,24,25,26,27],
+    [28,29,30,31,32,33,34,35]
+]
+
+SYMBOL_ALIASES = {'△': 'tri', '❒': 'box', '●': 'circ', '⧉': 'grid', '▣': 'fin'}
+SYMBOLS = {'tri', 'box', 'circ', 'grid', 'fin'}
+UNARY_OPS = {'none', 'not', 'pin'}
+BINARY_OPS = {'add', 'sub', 'xor', 'mul', 'and', 'or', 'rotl', 'rotr', 'mod'}
+CONTEXT_NAMES = {'i', 'row', 'col', 'trow', 'tcol', 'tx', 'diag', 'rdiag', 'b58'}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Subscript,
+    ast.Load, ast.Add, ast.Sub, ast.Mult, ast.Mod, ast.FloorDiv, ast.BitXor,
+    ast.BitAnd, ast.BitOr, ast.LShift, ast.RShift, ast.USub, ast.UAdd, ast.Invert,
+)
+
+
+class ChainSyntaxError(ValueError):
+    """Raised for malformed chain specs"""
+
+
+def rotl8(v, k):
+    k %= 8
+    return ((v << k) | (v >> (8 - k))) & 0xFF
+
+
+def apply_op(op, x, k):
+    """Apply one op to a byte with operand k"""
+    if op == 'add':
+        return (x + k) & 0xFF
+    if op == 'sub':
+        return (x - k) & 0xFF
+    if op == 'xor':
+        return (x ^ k) & 0xFF
+    if op == 'mul':
+        return (x * k) & 0xFF
+    if op == 'and':
+        return x & k & 0xFF
+    if op == 'or':
+        return (x | k) & 0xFF
+    if op == 'rotl':
+        return rotl8(x, k)
+    if op == 'rotr':
+        return rotl8(x, -k)
+    if op == 'mod':
+        return x % k if k > 0 else x
+    if op == 'not':
+        return ~x & 0xFF
+    if op == 'none':
+        return x
+    raise ChainSyntaxError(f"Unknown op {op}")
+
+
+@lru_cache(maxsize=8192)
+def op_table(op, k):
+    """256-byte translate table of an op with a fixed operand"""
+    return bytes(apply_op(op, x, k) for x in range(256))
+
+
+@lru_cache(maxsize=None)
+def op_grid(op):
+    """op_table(op, k) for every canonical k, concatenated: grid[256 * k + x]"""
+    return b''.join(op_table(op, k) for k in range(256))
+
+
+IDENTITY = bytes(range(256))
+
+
+class Step:
+    __slots__ = ('symbol', 'op', 'arg', 'code', 'names')
+
+    def __init__(self, symbol, op, arg=None):
+        self.symbol = symbol
+        self.op = op
+        self.arg = arg
+        self.code = compile(ast.Expression(ast.parse(arg, mode='eval').body), '<chain>', 'eval') \
+            if arg is not None else None
+        self.names = _names(arg) if arg is not None else set()
+
+    def __str__(self):
+        if self.arg is None:
+            return f"{self.symbol}:{self.op}"
+        return f"{self.symbol}:{self.op}({self.arg})"
+
+
+def _names(expr):
+    return {node.id for node in ast.walk(ast.parse(expr, mode='eval')) if isinstance(node, ast.Name)}
+
+
+def _normalize_expr(text):
+    try:
+        tree = ast.parse(text, mode='eval')
+    except SyntaxError as e:
+        raise ChainSyntaxError(f"Bad operand expression {text!r}: {e.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ChainSyntaxError(f"Unsupported syntax {type(node).__name__} in {text!r}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, int):
+            raise ChainSyntaxError(f"Only integer constants are allowed in {text!r}")
+    return ast.unparse(tree)
+
+
+def _split_steps(spec):
+    """Split on whitespace outside parentheses"""
+    steps, depth, current = [], 0, []
+    for ch in spec:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth < 0:
+                raise ChainSyntaxError(f"Unbalanced ')' in {spec!r}")
+        if ch.isspace() and depth == 0:
+            if current:
+                steps.append(''.join(current))
+                current = []
+            continue
+        current.append(ch)
+    if depth:
+        raise ChainSyntaxError(f"Unbalanced '(' in {spec!r}")
+    if current:
+        steps.append(''.join(current))
+    return steps
+
+
+def parse_chain(spec):
+    """Parse spec text into a list of Steps"""
+    steps = []
+    for token in _split_steps(spec.split('#', 1)[0]):
+        if ':' not in token:
+            raise ChainSyntaxError(f"Step {token!r} must look like symbol:op(expr)")
+        symbol, rest = token.split(':', 1)
+        symbol = SYMBOL_ALIASES.get(symbol, symbol)
+        if symbol not in SYMBOLS:
+            raise ChainSyntaxError(f"Unknown symbol {symbol!r} in {token!r}")
+        if '(' in rest:
+            if not rest.endswith(')'):
+                raise ChainSyntaxError(f"Missing ')' in {token!r}")
+            op, arg = rest[:-1].split('(', 1)
+            arg = _normalize_expr(arg)
+        else:
+            op, arg = rest, None
+        if op in UNARY_OPS:
+            if arg is not None:
+                raise ChainSyntaxError(f"Op {op} takes no operand")
+        elif op in BINARY_OPS:
+            if arg is None:
+                raise ChainSyntaxError(f"Op {op} needs an operand")
+        else:
+            raise ChainSyntaxError(f"Unknown op {op!r} in {token!r}")
+        steps.append(Step(symbol, op, arg))
+    if not steps:
+        raise ChainSyntaxError("Empty chain spec")
+    return steps
+
+
+def normalize(spec):
+    """Canonical text of a chain spec (cache key)"""
+    return ' '.join(str(step) for step in parse_chain(spec))
+
+
+def free_params(spec):
+    """Names in a spec that are not context variables"""
+    names = set()
+    for step in parse_chain(spec):
+        names |= step.names
+    return sorted(names - CONTEXT_NAMES)
+
+
+class ChainContext:
+    """Puzzle material the operand expressions can refer to"""
+
+    def __init__(self, tx_bytes=None, b58_string=B58_STRING, known_pos=KNOWN_POS):
+        self.tx_bytes = bytes.fromhex(TX_ID) if tx_bytes is None else bytes(tx_bytes)
+        self.b58_string = b58_string
+        self.known_pos = dict(known_pos)
+        self.width = len(self.tx_bytes)
+        self.diag = [self.tx_bytes[p] for p in DIAGONAL if p < self.width]
+        self.b58 = [B58_ALPHABET.index(c) for c in b58_string]
+        self.triangle_pos = {pos: (r, c) for r, row in enumerate(TRIANGLE)
+                             for c, pos in enumerate(row)}
+
+    @property
+    def key(self):
+        return (self.tx_bytes, self.b58_string, tuple(sorted(self.known_pos.items())))
+
+    def env(self, i):
+        trow, tcol = self.triangle_pos.get(i, (len(TRIANGLE), 0))
+        return {'i': i, 'row': i // 8, 'col': i % 8, 'trow': trow, 'tcol': tcol,
+                'tx': self.tx_bytes, 'diag': self.diag, 'rdiag': self.diag[::-1], 'b58': self.b58}
+
+
+DEFAULT_CONTEXT = ChainContext()
+
+
+def operands(step, context, params):
+    """Per-position operand values of one step"""
+    if step.op == 'pin':
+        return [context.known_pos.get(i) for i in range(context.width)]
+    if step.code is None:
+        return [None] * context.width
+    values = []
+    for i in range(context.width):
+        env = context.env(i)
+        env.update(params)
+        try:
+            values.append(int(eval(step.code, {'__builtins__': {}}, env)))
+        except NameError as e:
+            raise ChainSyntaxError(f"Unbound name in {step}: {e}") from None
+        except (IndexError, ZeroDivisionError) as e:
+            raise ChainSyntaxError(f"Operand of {step} fails at position {i}: {e}") from None
+    return values
+
+
+def step_tables(step, context, params):
+    """Per-position 256-byte tables of a single step"""
+    tables = []
+    for k in operands(step, context, params):
+        if step.op == 'pin':
+            tables.append(IDENTITY if k is None else bytes([k]) * 256)
+        elif step.op == 'none':
+            tables.append(IDENTITY)
+        else:
+            tables.append(op_table(step.op, 0 if k is None else k))
+    return tables
+
+
+class CompiledChain:
+    """A chain fused into one lookup table per position"""
+
+    def __init__(self, spec, steps, step_luts, width):
+        self.spec = spec
+        self.steps = steps
+        self.step_luts = step_luts
+        self.width = width
+        luts = [IDENTITY] * width
+        for tables in step_luts:
+            luts = [lut.translate(t) for lut, t in zip(luts, tables)]
+        self.luts = luts
+        self.flat = b''.join(luts)
+        self.offsets = [i * 256 for i in range(width)]
+
+    @classmethod
+    def from_flat(cls, spec, flat, width):
+        """Chain over an existing width * 256 table (bytes or a shared memoryview)"""
+        chain = cls.__new__(cls)
+        chain.spec = spec
+        chain.steps = chain.step_luts = None
+        chain.width = width
+        chain.flat = flat
+        chain.luts = [flat[i * 256:(i + 1) * 256] for i in range(width)]
+        chain.offsets = [i * 256 for i in range(width)]
+        return chain
+
+    def __call__(self, data):
+        """Run the whole chain on `width` bytes"""
+        return bytes(map(self.flat.__getitem__, map(_add, self.offsets, data)))
+
+    def at(self, pos, x):
+        return self.luts[pos][x]
+
+    def stages(self, data):
+        """Output after every step (for StageTraceRecorder)"""
+        if self.step_luts is None:
+            raise ValueError(f"{self!r} holds only its fused table (from_flat); "
+                             f"compile the spec to trace its stages")
+        outputs = []
+        for tables in self.step_luts:
+            data = bytes(t[b] for t, b in zip(tables, data))
+            outputs.append(data)
+        return outputs
+
+    def matches(self, data, known_pos=KNOWN_POS):
+        luts = self.luts
+        return all(luts[pos][data[pos]] == val for pos, val in known_pos.items())
+
+    def __repr__(self):
+        return f"CompiledChain({self.spec!r})"
+
+
+@lru_cache(maxsize=4096)
+def _compile_normalized(normalized, context_key, params_key):
+    context = _CONTEXTS[context_key]
+    steps = parse_chain(normalized)
+    params = dict(params_key)
+    missing = set(free_params(normalized)) - set(params)
+    if missing:
+        raise ChainSyntaxError(f"Unbound parameters {sorted(missing)} in {normalized!r}")
+    step_luts = [step_tables(step, context, params) for step in steps]
+    return CompiledChain(normalized, steps, step_luts, context.width)
+
+
+_CONTEXTS = {}
+
+
+def compile_chain(spec, context=None, params=None):
+    """Parse, normalize and compile a spec, reusing cached compilations"""
+    context = context or DEFAULT_CONTEXT
+    _CONTEXTS.setdefault(context.key, context)
+    params_key = tuple(sorted((params or {}).items()))
+    return _compile_normalized(normalize(spec), context.key, params_key)
+
+
+def cache_info():
+    return _compile_normalized.cache_info()
+
+
+def load_specs(path):
+    """Chain specs from a file, one per line; blank lines and # comments ignored"""
+    specs = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                specs.append(line)
+    return specs
+
+
+def template(spec, context=None):
+    """(x, params, pos) -> value function of a spec, for bitvec_solver"""
+    from bitvec_solver import BitVec, rotl as generic_rotl
+    context = context or DEFAULT_CONTEXT
+    steps = parse_chain(spec)
+
+    def run(x, params, pos):
+        env = context.env(pos)
+        env.update(params)
+        for step in steps:
+            if step.op == 'pin':
+                if pos in context.known_pos:
+                    x = context.known_pos[pos]
+                continue
+            k = eval(step.code, {'__builtins__': {}}, env) if step.code is not None else None
+            if step.op == 'rotl':
+                x = generic_rotl(x, k)
+            elif step.op == 'rotr':
+                x = generic_rotl(x, -k)
+            elif step.op == 'not':
+                x = ~x & 0xFF
+            elif step.op != 'none':
+                if step.op == 'mod':
+                    if isinstance(k, BitVec) and not k.known:
+                        # Unknown modulus (e.g. a free parameter): nothing is known about x
+                        x = BitVec(0, 0)
+                    else:
+                        # Same rule as apply_op: a non-positive modulus leaves x unchanged
+                        x = x % int(k) if int(k) > 0 else x
+                else:
+                    x = {'add': lambda: x + k, 'sub': lambda: x - k, 'xor': lambda: x ^ k,
+                         'mul': lambda: x * k, 'and': lambda: x & k, 'or': lambda: x | k}[step.op]()
+                x = x & 0xFF
+        return x
+
+    return run
+
+
+DEMO_SPECS = [
+    "tri:add(diag[row]) box:xor(row*col%8) circ:rotl(i%8) tri:xor(rdiag[row]) grid:add((i)%58) fin:none",
+    "tri:xor(diag[row] ^ row) box:add(row + col) circ:rotl(3) tri:xor(rdiag[row] ^ (7 - row)) grid:none fin:none",
+    "△:add(trow) ❒:add(row + col) ●:mul(2) △:sub(trow) ⧉:mod(58) ▣:none",
+    "tri:xor(k) box:add(row + col) circ:rotl(i % 8) tri:sub(k) grid:none fin:pin",
+]
+
+
+def main():
+    import time
+    from near_miss import score
+
+    specs = load_specs(sys.argv[1]) if len(sys.argv) > 1 else DEMO_SPECS
+    tx_bytes = DEFAULT_CONTEXT.tx_bytes
+
+    print("=== Chain DSL ===")
+    for spec in specs:
+        params = {name: 0x16 for name in free_params(spec)}
+        chain = compile_chain(spec, params=params)
+        out = chain(tx_bytes)
+        hits = [pos for pos, val in KNOWN_POS.items() if out[pos] == val]
+        print(f"\n{chain.spec}")
+        if params:
+            print(f"  params: {params}")
+        print(f"  result: {out.hex()}")
+        print(f"  known positions: {[out[p] for p in sorted(KNOWN_POS)]} hits={hits} score={score(out)}")
+
+    spec = specs[0]
+    variants = [spec, spec.replace(' ', '  '), spec.replace('(i)', 'i')]
+    for v in variants:
+        compile_chain(v)
+    print(f"\nCache after equivalent spellings: {cache_info()}")
+
+    chain = compile_chain(spec)
+    n = 20000
+    start = time.perf_counter()
+    for _ in range(n):
+        chain(tx_bytes)
+    elapsed = time.perf_counter() - start
+    print(f"Fused chain: {n / elapsed:,.0f} evaluations/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Search over placements of the 36 triangle dots into the 256 key bits
+
+RedDotAnalyzer reads the dots as bits 0-35; here each dot d is placed at a
+key bit by a structured embedding:
+
+    linear       dot i of a triangle ordering at bit offset + stride*i,
+                 bits counted MSB or LSB first within each byte
+    row-aligned  triangle row r in byte start + step*r (or in the byte of
+                 its first dot), packed against the MSB or the LSB end
+
+Every dot is on or off, so a placement fixes a set S of key bits and the
+candidates are the base key with the bits of S set to each pattern (mode
+'set') or flipped by it (mode 'xor').  A known byte covered by S forces the
+dots inside it; a known bit outside S must already be right in the base, or
+the placement is rejected.  The remaining free dots are walked in Gray-code
+order, one XOR per candidate; sets with more than max_free free dots are
+kept aside as deferred rather than walked here.
+
+The candidate set depends only on S, not on which dot lands where, so the
+thousands of embeddings (every ordering x offset x stride x bit order)
+collapse to about 1,600 distinct bit sets that are constrained and walked
+once.  Distinct sets can still overlap: a key belongs to a placement
+exactly when it agrees with the placement's start key outside its free
+bits.  Each placement keeps the (mask, value) pairs of the earlier
+placements it can share keys with, and a key is only yielded by the first
+placement containing it, so the dedupe is exact and needs no per-key
+memory.
+
+Deferred sets are walked by gray_ec.GrayKeyWalk (one point addition per
+key, sharded over worker processes) through walk() and walk_deferred(),
+with the same exclusion of keys owned by earlier placements.
+"""
+from bit_permutation import NBITS, BitMap, bit_weight
+from gray_ec import GrayKeyWalk
+from key_verifier import KeyVerifier
+from secp256k1 import is_valid_key
+from triangle_traversal import TRAVERSALS
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+KNOWN_POS = {7: 9, 22: 22, 25: 7}
+TRIANGLE = [
+    [0],
+    [1,2],
+    [3,4,5],
+    [6,7,8,9],
+    [10,11,12,13,14],
+    [15,16,17,18,19,20],
+    [21,22,23,24,25,26,27],
+    [28,29,30,31,32,33,34,35]
+]
+DOTS = 36
+MAX_FREE = 20
+FULL = (1 << NBITS) - 1
+# Dot orderings visiting all 36 dots
+ORDERS = {name: t.order for name, t in TRAVERSALS.items() if sorted(t.order) == list(range(DOTS))}
+
+
+def lsb_first(q):
+    """Reading-order bit of the q-th bit counted LSB first within each byte"""
+    return 8 * (q // 8) + 7 - q % 8
+
+
+class DotEmbedding:
+    """One placement: dot d sits at key bit bits[d] (reading order)"""
+
+    def __init__(self, name, bits):
+        self.name = name
+        self.bits = tuple(bits)
+        self._bitmap = None
+
+    @property
+    def bitmap(self):
+        """BitMap taking a pattern (dot d at source bit d) to its key bits"""
+        if self._bitmap is None:
+            self._bitmap = BitMap(self.bits, name=self.name)
+        return self._bitmap
+
+    def mask(self, pattern):
+        """Key bits of a 36-bit pattern whose most significant bit is dot 0"""
+        return self.bitmap.apply_int((pattern << (NBITS - DOTS)).to_bytes(NBITS // 8, 'big'))
+
+    def dots_on(self, key):
+        value = int.from_bytes(key, 'big')
+        return [d for d, p in enumerate(self.bits) if value & bit_weight(p)]
+
+    def __repr__(self):
+        return f"DotEmbedding({self.name})"
+
+
+def linear_embeddings(orders=ORDERS, strides=range(1, 8), bit_orders=('msb', 'lsb')):
+    for name, order in orders.items():
+        for stride in strides:
+            for offset in range(NBITS - (DOTS - 1) * stride):
+                for bit_order in bit_orders:
+                    bits = [0] * DOTS
+                    for i, d in enumerate(order):
+                        q = offset + stride * i
+                        bits[d] = q if bit_order == 'msb' else lsb_first(q)
+                    yield DotEmbedding(f"{name}+{offset}x{stride}/{bit_order}", bits)
+
+
+def _row_embedding(name, row_bytes, align, reverse):
+    bits = [0] * DOTS
+    for r, row in enumerate(TRIANGLE):
+        first = 0 if align == 'msb' else 8 - len(row)
+        for c, d in enumerate(row[::-1] if reverse else row):
+            bits[d] = 8 * row_bytes[r] + first + c
+    return DotEmbedding(name, bits)
+
+
+def row_aligned_embeddings(steps=(1, 2, 3, 4), aligns=('msb', 'lsb')):
+    placements = {}
+    for step in steps:
+        for start in range(NBITS // 8 - (len(TRIANGLE) - 1) * step):
+            placements[f"rows@{start}x{step}"] = [start + step * r for r in range(len(TRIANGLE))]
+    # Each row in the byte indexed by its first dot (0, 1, 3, 6, ...)
+    placements['rows@edge'] = [row[0] for row in TRIANGLE]
+    for name, row_bytes in placements.items():
+        for align in aligns:
+            for reverse in (False, True):
+                yield _row_embedding(f"{name}/{align}{'/rev' if reverse else ''}",
+                                     row_bytes, align, reverse)
+
+
+def all_embeddings():
+    yield from linear_embeddings()
+    yield from row_aligned_embeddings()
+
+
+class Placement:
+    """Distinct bit set shared by one or more embeddings, after the known-byte constraint"""
+
+    def __init__(self, embeddings, start, free):
+        self.embeddings = embeddings
+        self.start = start      # key with the forced dots applied and the free dots off
+        self.free = free        # weights of the free dot bits
+        self.keep = FULL ^ sum(free)
+        self.fixed = start & self.keep
+        # (keep, fixed) of earlier placements that share keys with this one
+        self.earlier = []
+
+    @property
+    def size(self):
+        return 1 << len(self.free)
+
+    def contains(self, key):
+        return key & self.keep == self.fixed
+
+    def shadowed(self, key):
+        """True if an earlier placement already produced key"""
+        return any(key & keep == fixed for keep, fixed in self.earlier)
+
+    def keys(self, limit=None):
+        """Integer keys for every free-dot pattern, in Gray-code order"""
+        key = self.start
+        yield key
+        free = self.free
+        end = self.size if limit is None else min(self.size, limit)
+        for t in range(1, end):
+            key ^= free[(t & -t).bit_length() - 1]
+            yield key
+
+
+class DotPlacementSearch:
+    """Constrains every embedding against the known bytes and streams the survivors"""
+
+    def __init__(self, base=bytes.fromhex(TX_ID), known_pos=KNOWN_POS, mode='set',
+                 max_free=MAX_FREE):
+        if mode not in ('set', 'xor'):
+            raise ValueError(f"Unknown mode {mode!r}")
+        self.base = int.from_bytes(base, 'big')
+        self.known_pos = dict(known_pos)
+        self.mode = mode
+        self.max_free = max_free
+        self.embeddings = 0
+        self.rejected = 0
+        self.placements = []
+        self.deferred = []
+        self.yielded = 0
+        self.duplicates = 0
+
+    def constrain(self, bits):
+        """(start key, free weights) for a bit set, or None if no pattern fits the known bytes"""
+        base = self.base
+        inside = set(bits)
+        key = base & ~sum(map(bit_weight, bits)) if self.mode == 'set' else base
+        for pos, val in self.known_pos.items():
+            for j in range(8):
+                p = 8 * pos + j
+                want = val >> (7 - j) & 1
+                have = 1 if base & bit_weight(p) else 0
+                if p in inside:
+                    on = want if self.mode == 'set' else want ^ have
+                    if on:
+                        key ^= bit_weight(p)
+                elif have != want:
+                    return None
+        known = {8 * pos + j for pos in self.known_pos for j in range(8)}
+        free = [bit_weight(p) for p in sorted(inside - known)]
+        return key, free
+
+    def plan(self, embeddings=None):
+        """Group embeddings by bit set and constrain each set once"""
+        groups = {}
+        for embedding in all_embeddings() if embeddings is None else embeddings:
+            self.embeddings += 1
+            groups.setdefault(frozenset(embedding.bits), []).append(embedding)
+        for bits, members in groups.items():
+            constrained = self.constrain(sorted(bits))
+            if constrained is None:
+                self.rejected += 1
+                continue
+            placement = Placement(members, *constrained)
+            if len(placement.free) <= self.max_free:
+                self.placements.append(placement)
+            else:
+                # Too many free dots to walk here; gray_ec-style enumeration territory
+                self.deferred.append(placement)
+        self.placements.sort(key=lambda pl: len(pl.free))
+        self.deferred.sort(key=lambda pl: len(pl.free))
+        order = self.placements + self.deferred
+        for i, pl in enumerate(order):
+            # Two sets share keys iff their start keys agree where neither has a free bit
+            pl.earlier = [(q.keep, q.fixed) for q in order[:i]
+                          if not (pl.fixed ^ q.fixed) & pl.keep & q.keep]
+        return self.placements
+
+    def candidates(self, limit=None):
+        """Yield (placement, key) for valid keys not produced by an earlier placement"""
+        if not self.placements:
+            self.plan()
+        for placement in self.placements:
+            for value in placement.keys(limit):
+                if placement.shadowed(value):
+                    self.duplicates += 1
+                    continue
+                key = value.to_bytes(NBITS // 8, 'big')
+                if not is_valid_key(key):
+                    continue
+                self.yielded += 1
+                yield placement, key
+
+    def run(self, verifier=None, limit=None):
+        """Stream every surviving key into the verifier; returns hits"""
+        verifier = verifier or KeyVerifier()
+        hits = []
+        for placement, key in self.candidates(limit):
+            for match in verifier.verify(key):
+                hits.append((placement.embeddings[0].name, key, match))
+        return hits
+
+    def walk(self, placement, verifier=None, shard_bits=0, workers=None, free=None):
+        """Verify a placement with gray_ec.GrayKeyWalk; free limits the walk to some free dots"""
+        walk = GrayKeyWalk(placement.start, placement.free if free is None else free, verifier,
+                           shard_bits, exclude=placement.earlier)
+        if workers:
+            found, _ = walk.run(workers)
+        else:
+            found, _, _ = walk.walk_range(0, walk.shards)
+        self.yielded += walk.checked - walk.skipped
+        self.duplicates += walk.skipped
+        name = placement.embeddings[0].name
+        return [(name, key, (address, label, compressed))
+                for key, address, label, compressed in found]
+
+    def walk_deferred(self, verifier=None, shard_bits=8, workers=None):
+        """Walk every placement with more than max_free free dots; returns hits"""
+        verifier = verifier or KeyVerifier()
+        hits = []
+        for placement in self.deferred:
+            hits.extend(self.walk(placement, verifier, shard_bits, workers))
+        return hits
+
+    def summary(self):
+        walk = sum(pl.size for pl in self.placements)
+        deferred = sum(pl.size for pl in self.deferred)
+        return (f"{self.embeddings:,} embeddings -> "
+                f"{len(self.placements) + len(self.deferred) + self.rejected:,} distinct bit sets: "
+                f"{self.rejected:,} rejected by the known bytes, {len(self.placements):,} walkable "
+                f"({walk:,} keys), {len(self.deferred):,} with more than {self.max_free} free dots "
+                f"({deferred:.2e} keys)")
+
+
+def main():
+    import time
+
+    print("=== Dot Placement Search ===")
+    embeddings = list(all_embeddings())
+    print(f"{len(embeddings):,} embeddings over {len(ORDERS)} dot orderings")
+
+    # A pattern written through an embedding's BitMap equals the per-dot bit loop
+    emb = embeddings[1234]
+    pattern = 0b101100111000111100001111100000111111
+    expect = sum(bit_weight(emb.bits[d]) for d in range(DOTS) if pattern >> (DOTS - 1 - d) & 1)
+    assert emb.mask(pattern) == expect
+    assert emb.dots_on(expect.to_bytes(32, 'big')) == [d for d in range(DOTS)
+                                                      if pattern >> (DOTS - 1 - d) & 1]
+
+    tx_bytes = bytes.fromhex(TX_ID)
+    for label, base, mode in (("TX id bits outside the dots", tx_bytes, 'set'),
+                              ("TX id bits outside the dots", tx_bytes, 'xor'),
+                              ("zero bits outside the dots", bytes(32), 'set')):
+        search = DotPlacementSearch(base, mode=mode)
+        start = time.perf_counter()
+        search.plan(embeddings)
+        print(f"\nBase: {label}, mode {mode} (planned in {time.perf_counter() - start:.2f}s)")
+        print(f"  {search.summary()}")
+        for pl in search.placements[:3]:
+            names = ', '.join(e.name for e in pl.embeddings[:3])
+            print(f"  {len(pl.free):>2} free dots, {len(pl.embeddings)} embedding(s): {names}")
+
+    search = DotPlacementSearch(tx_bytes)
+    search.plan(embeddings)
+    start = time.perf_counter()
+    keys = list(search.candidates(limit=4096))
+    elapsed = time.perf_counter() - start
+    print(f"\nTX base, first 4096 patterns of each walkable set: {search.yielded:,} keys streamed, "
+          f"{search.duplicates:,} overlaps dropped in {elapsed:.2f}s")
+    assert all(key[p] == v for _, key in keys for p, v in KNOWN_POS.items())
+    distinct = {key for _, key in keys}
+    assert len(distinct) == len(keys)
+    # Exact dedupe: every dropped key is really produced by an earlier placement
+    dropped = [(i, v) for i, pl in enumerate(search.placements) for v in pl.keys(4096)
+               if pl.shadowed(v)]
+    assert all(any(q.contains(v) for q in search.placements[:i]) for i, v in dropped)
+    placement, key = keys[-1]
+    print(f"  last: {placement.embeddings[0].name} with dots {placement.embeddings[0].dots_on(key)} on")
+
+    search = DotPlacementSearch(tx_bytes)
+    start = time.perf_counter()
+    verifier = KeyVerifier()
+    hits = search.run(verifier, limit=16)
+    print(f"Verified {search.yielded} keys (16 patterns per set) in "
+          f"{time.perf_counter() - start:.2f}s: {hits or 'no match'}")
+
+    placement = search.deferred[0]
+    start = time.perf_counter()
+    hits = search.walk(placement, verifier, shard_bits=2, free=placement.free[:12])
+    print(f"\nDeferred set {placement.embeddings[0].name} ({len(placement.free)} free dots, "
+          f"{len(placement.earlier)} overlapping earlier sets): first 2^12 patterns walked with "
+          f"GrayKeyWalk in {time.perf_counter() - start:.2f}s: {hits or 'no match'}")
+    print(f"All {len(search.deferred):,} deferred sets: walk_deferred(), "
+          f"{sum(pl.size for pl in search.deferred):.2e} keys")
+
+if __name__ == "__main__":
+    main()
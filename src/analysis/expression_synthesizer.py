@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Bottom-up synthesis of byte formulas that map the TX id to the known values
+
+Expressions over the terminals tx[i], i, row, col, diag[row], b58[i] and a
+few small constants are grown by size (number of leaves) with the byte
+operations + - ^ × % and rotate-left.  An expression is identified by its signature, the three
+output bytes at positions 7/22/25 packed into one int; a new expression is
+kept only if no smaller one has the same signature (observational
+equivalence), so the bank never exceeds 2^24 entries however many programs
+are generated.  Every generated program whose signature equals the target
+is reported, and hits are expanded to all 32 positions for key checks.
+
+Usage: expression_synthesizer.py [max_size]
+"""
+import sys
+import time
+
+from chain_dsl import DEFAULT_CONTEXT, KNOWN_POS, apply_op, op_grid
+
+# Constants
+TERMINALS = ['tx', 'i', 'row', 'col', 'diag', 'b58', '1', '2', '3', '8']
+OPS = {
+    # name: (symbol, commutative)
+    'add': ('+', True),
+    'sub': ('-', False),
+    'xor': ('^', True),
+    'mul': ('*', True),
+    'mod': ('%', False),
+    'rotl': ('<<<', False),
+}
+
+
+def pack(values):
+    sig = 0
+    for shift, v in enumerate(values):
+        sig |= v << (8 * shift)
+    return sig
+
+
+def unpack(sig, n):
+    return [(sig >> (8 * k)) & 0xFF for k in range(n)]
+
+
+def terminal_values(name, positions, context=None):
+    """Byte value of a terminal at each position"""
+    context = context or DEFAULT_CONTEXT
+    values = []
+    for pos in positions:
+        env = context.env(pos)
+        if name == 'tx':
+            v = context.tx_bytes[pos]
+        elif name == 'diag':
+            v = env['diag'][env['row'] % len(env['diag'])]
+        elif name == 'b58':
+            v = env['b58'][pos % len(env['b58'])]
+        elif name in env:
+            v = env[name]
+        else:
+            v = int(name)
+        values.append(v & 0xFF)
+    return values
+
+
+class ExpressionSynthesizer:
+    """Enumerates expressions by size up to observational equivalence"""
+
+    def __init__(self, known_pos=KNOWN_POS, terminals=TERMINALS, ops=OPS, context=None,
+                 max_hits=10000):
+        self.context = context or DEFAULT_CONTEXT
+        self.positions = sorted(known_pos)
+        self.target = pack([known_pos[p] for p in self.positions])
+        # b58[i] has no value at all when the context has no Base58 string
+        self.terminals = [t for t in terminals if t != 'b58' or self.context.b58]
+        self.ops = dict(ops)
+        self.max_hits = max_hits
+        # signature -> definition: terminal name or (op, left signature, right signature)
+        self.defs = {}
+        self.sizes = {}
+        self.bank = {}  # size -> list of signatures
+        self.hits = []
+        self.hit_count = 0
+        self.generated = 0
+
+    def _add_terminals(self):
+        sigs = []
+        for name in self.terminals:
+            sig = pack(terminal_values(name, self.positions, self.context))
+            self.generated += 1
+            if sig == self.target:
+                self._record_hit(name)
+            if sig not in self.defs:
+                self.defs[sig] = name
+                self.sizes[sig] = 1
+                sigs.append(sig)
+        self.bank[1] = sigs
+
+    def _record_hit(self, definition):
+        self.hit_count += 1
+        if len(self.hits) < self.max_hits:
+            self.hits.append(definition)
+
+    def _grow(self, size):
+        """All expressions op(left, right) with size(left) + size(right) == size"""
+        n = len(self.positions)
+        shifts = [8 * k for k in range(n)]
+        defs, sizes, target = self.defs, self.sizes, self.target
+        new = []
+        for op, (_, commutative) in self.ops.items():
+            grid = op_grid(op)
+            for left_size in range(1, size):
+                right_size = size - left_size
+                if commutative and left_size > right_size:
+                    continue
+                lefts = self.bank.get(left_size, [])
+                rights = self.bank.get(right_size, [])
+                # Right operands as 256 * lane value, ready to index the op grid
+                right_offsets = [[((r >> s) & 0xFF) << 8 for s in shifts] for r in rights]
+                for li, left in enumerate(lefts):
+                    lanes = [(left >> s) & 0xFF for s in shifts]
+                    start = li if commutative and left_size == right_size else 0
+                    for ri in range(start, len(rights)):
+                        offsets = right_offsets[ri]
+                        sig = 0
+                        for s, k, x in zip(shifts, offsets, lanes):
+                            sig |= grid[k + x] << s
+                        if sig == target:
+                            self._record_hit((op, left, rights[ri]))
+                        if sig not in defs:
+                            defs[sig] = (op, left, rights[ri])
+                            sizes[sig] = size
+                            new.append(sig)
+                    self.generated += len(rights) - start
+        self.bank[size] = new
+
+    def run(self, max_size=4, max_bank=1 << 22, progress=None):
+        """Grow the bank up to max_size (or until it holds max_bank signatures)"""
+        if 1 not in self.bank:
+            self._add_terminals()
+        size = max(self.bank) + 1
+        while size <= max_size and len(self.defs) < max_bank:
+            self._grow(size)
+            if progress:
+                progress(size, self)
+            size += 1
+        return self.hits
+
+    def render(self, definition):
+        if isinstance(definition, str):
+            return 'diag[row]' if definition == 'diag' else definition
+        op, left, right = definition
+        return f"({self.render(self.defs[left])} {self.ops[op][0]} {self.render(self.defs[right])})"
+
+    def evaluate(self, definition, width=None):
+        """Full-width output of an expression (all positions, not just the known ones)"""
+        width = width or self.context.width
+        if isinstance(definition, str):
+            return bytes(terminal_values(definition, range(width), self.context))
+        op, left, right = definition
+        a = self.evaluate(self.defs[left], width)
+        b = self.evaluate(self.defs[right], width)
+        return bytes(apply_op(op, x, k) for x, k in zip(a, b))
+
+
+def main():
+    from key_verifier import KeyVerifier
+
+    max_size = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    print("=== Expression Synthesizer ===")
+    print(f"Targets {dict(KNOWN_POS)}, terminals {TERMINALS}, ops {[s for s, _ in OPS.values()]}")
+
+    def progress(size, synth):
+        print(f"  size {size}: {len(synth.bank[size]):,} new signatures, "
+              f"{synth.generated:,} programs generated, {synth.hit_count} hits")
+
+    verifier = KeyVerifier()
+    for title, terminals in [("All terminals", TERMINALS),
+                             ("Without tx[i]", [t for t in TERMINALS if t != 'tx'])]:
+        print(f"\n{title}:")
+        synth = ExpressionSynthesizer(terminals=terminals)
+        start = time.perf_counter()
+        synth.run(max_size, progress=progress)
+        elapsed = time.perf_counter() - start
+        print(f"{synth.generated:,} programs, {len(synth.defs):,} distinct signatures in {elapsed:.2f}s "
+              f"({synth.generated / elapsed:,.0f} programs/sec)")
+        # Hits that agree on all 32 positions are the same key; show the smallest of each
+        keys = {}
+        for definition in synth.hits:
+            key = synth.evaluate(definition)
+            assert [key[p] for p in sorted(KNOWN_POS)] == [KNOWN_POS[p] for p in sorted(KNOWN_POS)]
+            keys.setdefault(key, definition)
+        print(f"{synth.hit_count} programs hit all three targets, {len(keys)} distinct keys:")
+        for key, definition in list(keys.items())[:12]:
+            print(f"  {synth.render(definition):<44} key {key.hex()}")
+        matches = [m for key in keys for m in verifier.verify(key)]
+        print(f"Verifier on {len(keys)} distinct keys: {matches or 'no match'}")
+
+
+if __name__ == "__main__":
+    main()
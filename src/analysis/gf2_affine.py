@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+GF(2) affine-map compiler for XOR / rotate / permute-only chains
+
+Chains built from XOR with constants and bit rotations or permutations are
+affine over GF(2): out = M·in ⊕ c.  This module compiles such a chain into
+an explicit bit matrix (one packed int per column) plus an offset vector,
+composes chains by matrix multiplication and solves the known output bits
+for inputs or free parameters with Gaussian elimination.
+
+Bit convention: a byte string maps to the int int.from_bytes(data, 'little'),
+so bit 8*i + j is bit j (LSB = 0) of byte i.
+"""
+import random
+
+from bit_tables import ALTERNATING, ROTL
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+KNOWN_POS = {7: 9, 22: 22, 25: 7}
+DIAGONAL_VALUES = ['fc', '21', 'e9', '99', '66', '9c', 'b6']
+
+
+def bytes_to_vec(data):
+    return int.from_bytes(data, 'little')
+
+
+def vec_to_bytes(vec, width):
+    return vec.to_bytes(width, 'little')
+
+
+def known_bits(known_pos):
+    """Output bit constraints {bit index: value} for known byte positions"""
+    bits = {}
+    for pos, val in known_pos.items():
+        for j in range(8):
+            bits[8 * pos + j] = (val >> j) & 1
+    return bits
+
+
+class AffineMap:
+    """out = M·in ⊕ offset over GF(2); cols[i] is the image of input bit i"""
+
+    def __init__(self, n_in, n_out, cols, offset=0):
+        if len(cols) != n_in:
+            raise ValueError(f"Expected {n_in} columns, got {len(cols)}")
+        self.n_in = n_in
+        self.n_out = n_out
+        self.cols = list(cols)
+        self.offset = offset
+        self._tables = None
+
+    @classmethod
+    def identity(cls, n):
+        return cls(n, n, [1 << i for i in range(n)])
+
+    def linear(self, vec):
+        """M·vec without the offset"""
+        out = 0
+        cols = self.cols
+        i = 0
+        while vec:
+            if vec & 1:
+                out ^= cols[i]
+            vec >>= 1
+            i += 1
+        return out
+
+    def _byte_tables(self):
+        # One 256-entry table per input byte: XOR of the columns selected by that byte
+        if self._tables is None:
+            tables = []
+            for b in range(0, self.n_in, 8):
+                cols = self.cols[b:b + 8]
+                table = [0] * (1 << len(cols))
+                for v in range(1, len(table)):
+                    low = v & -v
+                    table[v] = table[v ^ low] ^ cols[low.bit_length() - 1]
+                tables.append(table)
+            self._tables = tables
+        return self._tables
+
+    def __call__(self, vec):
+        """Apply the map to an input vector"""
+        out = self.offset
+        for table, byte in zip(self._byte_tables(), vec.to_bytes((self.n_in + 7) // 8, 'little')):
+            out ^= table[byte]
+        return out
+
+    def apply_bytes(self, data):
+        return vec_to_bytes(self(bytes_to_vec(data)), (self.n_out + 7) // 8)
+
+    def then(self, other):
+        """Composition other∘self (apply self first)"""
+        if other.n_in != self.n_out:
+            raise ValueError(f"Cannot compose {self.n_out}-bit output with {other.n_in}-bit input")
+        return AffineMap(self.n_in, other.n_out,
+                         [other.linear(c) for c in self.cols],
+                         other(self.offset))
+
+    def rows(self):
+        """Row-major view: rows[j] has bit i set when output j depends on input i"""
+        rows = [0] * self.n_out
+        for i, col in enumerate(self.cols):
+            while col:
+                low = col & -col
+                rows[low.bit_length() - 1] |= 1 << i
+                col ^= low
+        return rows
+
+    def rank(self):
+        return len(_eliminate([(c, 0) for c in self.cols], self.n_out)[0])
+
+    def solve(self, constraints):
+        """All inputs whose output matches {bit: value}; None if inconsistent"""
+        rows = self.rows()
+        equations = [(rows[j], value ^ ((self.offset >> j) & 1))
+                     for j, value in constraints.items()]
+        return _solve(equations, self.n_in)
+
+
+class AffineSolution:
+    """Solution set particular ⊕ span(basis)"""
+
+    def __init__(self, particular, basis, n):
+        self.particular = particular
+        self.basis = basis
+        self.n = n
+
+    @property
+    def dimension(self):
+        return len(self.basis)
+
+    def __len__(self):
+        return 1 << self.dimension
+
+    def __iter__(self):
+        """All solutions in Gray-code order (one XOR per step)"""
+        vec = self.particular
+        yield vec
+        for step in range(1, 1 << self.dimension):
+            vec ^= self.basis[(step & -step).bit_length() - 1]
+            yield vec
+
+    def sample(self, rng=random):
+        vec = self.particular
+        for b in self.basis:
+            if rng.getrandbits(1):
+                vec ^= b
+        return vec
+
+
+def _eliminate(equations, n):
+    """Reduced row echelon form of (coeffs, rhs) pairs; returns (pivots, consistent)"""
+    pivots = {}  # pivot bit -> (coeffs, rhs)
+    for coeffs, rhs in equations:
+        for bit, (pc, pr) in pivots.items():
+            if (coeffs >> bit) & 1:
+                coeffs ^= pc
+                rhs ^= pr
+        if not coeffs:
+            if rhs:
+                return pivots, False
+            continue
+        bit = coeffs.bit_length() - 1
+        # Keep the system fully reduced so back-substitution is not needed
+        for pb, (pc, pr) in list(pivots.items()):
+            if (pc >> bit) & 1:
+                pivots[pb] = (pc ^ coeffs, pr ^ rhs)
+        pivots[bit] = (coeffs, rhs)
+    return pivots, True
+
+
+def _solve(equations, n):
+    pivots, consistent = _eliminate(equations, n)
+    if not consistent:
+        return None
+    particular = 0
+    for bit, (coeffs, rhs) in pivots.items():
+        if rhs:
+            particular |= 1 << bit
+    basis = []
+    for free in range(n):
+        if free in pivots:
+            continue
+        vec = 1 << free
+        for bit, (coeffs, rhs) in pivots.items():
+            if (coeffs >> free) & 1:
+                vec |= 1 << bit
+        basis.append(vec)
+    return AffineSolution(particular, basis, n)
+
+
+def compile_affine(func, n_in, n_out, checks=32, rng=None):
+    """Compile an int -> int function into an AffineMap, verifying affinity"""
+    offset = func(0)
+    cols = [func(1 << i) ^ offset for i in range(n_in)]
+    amap = AffineMap(n_in, n_out, cols, offset)
+    rng = rng or random.Random(0)
+    for _ in range(checks):
+        vec = rng.getrandbits(n_in)
+        if amap(vec) != func(vec):
+            raise ValueError("Chain is not affine over GF(2)")
+    return amap
+
+
+def compile_byte_chain(chain, width=32, checks=32):
+    """Compile a bytes -> bytes chain acting on `width`-byte inputs"""
+    return compile_affine(lambda v: bytes_to_vec(chain(vec_to_bytes(v, width))),
+                          8 * width, 8 * width, checks)
+
+
+def compile_param_chain(chain, n_params, tx_bytes, checks=32):
+    """Compile the map from n_params free parameter bytes to the chain output on tx_bytes"""
+    width = len(tx_bytes)
+    return compile_affine(lambda v: bytes_to_vec(chain(tx_bytes, vec_to_bytes(v, n_params))),
+                          8 * n_params, 8 * width, checks)
+
+
+# Affine stages of SymbolBitTransformer with the diagonal bytes as parameters
+
+def symbol_bit_chain(data, diag):
+    """△❒●△⧉ of SymbolBitTransformer (the data-dependent ▣ is not affine)"""
+    out = bytearray(len(data))
+    for i, v in enumerate(data):
+        row, col = i // 8, i % 8
+        v ^= diag[row] ^ (0xFF if (row + col) & 1 else 0)
+        v ^= ALTERNATING[(row * col) % 8]
+        v = ROTL[i % 8][v]
+        v ^= diag[-(row + 1)] ^ (0xFF if (row - col) & 1 else 0)
+        v ^= (row * 8 + col) % 256
+        out[i] = v
+    return bytes(out)
+
+
+def main():
+    import time
+
+    tx_bytes = bytes.fromhex(TX_ID)
+    diag = bytes(int(x, 16) for x in DIAGONAL_VALUES)
+    constraints = known_bits(KNOWN_POS)
+
+    print("=== GF(2) Affine Chain Compiler ===")
+    start = time.perf_counter()
+    chain = compile_byte_chain(lambda d: symbol_bit_chain(d, diag))
+    print(f"Compiled △❒●△⧉ (fixed diagonal) in {time.perf_counter() - start:.3f}s, rank {chain.rank()}")
+    assert chain.apply_bytes(tx_bytes) == symbol_bit_chain(tx_bytes, diag)
+
+    twice = chain.then(chain)
+    assert twice.apply_bytes(tx_bytes) == symbol_bit_chain(symbol_bit_chain(tx_bytes, diag), diag)
+    print("Composed chain∘chain matches sequential application")
+
+    start = time.perf_counter()
+    inputs = chain.solve(constraints)
+    elapsed = time.perf_counter() - start
+    print(f"\nInputs reaching the known positions: 2^{inputs.dimension} solutions ({elapsed * 1e3:.2f} ms)")
+    sample = vec_to_bytes(inputs.sample(random.Random(1)), 32)
+    out = chain.apply_bytes(sample)
+    print(f"Sample input {sample.hex()}")
+    print(f"Output at known positions: {[out[p] for p in sorted(KNOWN_POS)]}")
+
+    print("\nFree diagonal bytes (7 parameters, TX id fixed):")
+    params = compile_param_chain(symbol_bit_chain, len(diag), tx_bytes)
+    start = time.perf_counter()
+    solution = params.solve(constraints)
+    elapsed = time.perf_counter() - start
+    if solution is None:
+        print(f"Refuted in {elapsed * 1e3:.2f} ms")
+    else:
+        found = vec_to_bytes(solution.particular, len(diag))
+        print(f"2^{solution.dimension} diagonal keys satisfy all 24 known bits ({elapsed * 1e3:.2f} ms)")
+        print(f"Example diagonal: {[hex(b)[2:] for b in found]}")
+        out = symbol_bit_chain(tx_bytes, found)
+        print(f"Check: {[out[p] for p in sorted(KNOWN_POS)]}")
+
+    print("\nOne diagonal byte shared by every row:")
+    shared = compile_param_chain(lambda d, p: symbol_bit_chain(d, p * 7), 1, tx_bytes)
+    start = time.perf_counter()
+    solution = shared.solve(constraints)
+    elapsed = time.perf_counter() - start
+    if solution is None:
+        print(f"Family refuted in {elapsed * 1e3:.2f} ms")
+    else:
+        print(f"2^{solution.dimension} solutions: {[hex(v) for v in solution]}")
+
+
+if __name__ == "__main__":
+    main()
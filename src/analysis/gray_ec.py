@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Gray-code enumeration of "start key with any subset of k bits flipped"
+
+Walking the 2^k patterns in reflected Gray-code order changes one bit per
+step, so the private key moves by +2^j or -2^j and the public key by
+±(2^j * G).  Those 2k points are computed once; each candidate then costs
+one mixed Jacobian + affine addition instead of a full scalar
+multiplication.  Points are normalized to affine in batches with
+secp256k1.batch_to_affine (one field inversion per batch), serialized,
+hashed and looked up in the verifier's hash160 set, so every step is
+checked.
+
+The space is cut into 2^s shards by the s highest variable bits.  A shard
+costs one scalar multiplication for its first key and then walks the low
+k - s bits, so shards are independent units for WorkStealingScheduler or
+the work coordinator.
+
+Excluded keys are given as (mask, value) pairs.  Bits of a mask outside
+the walked bits are constant within a shard, so each shard first drops the
+pairs that cannot match there and groups the rest by their walked-bit mask;
+a shard one pair covers entirely is skipped without any point arithmetic.
+"""
+from key_verifier import KeyVerifier, hash160
+from secp256k1 import (N, base_mul, batch_to_affine, jacobian_add_affine, key_to_int,
+                       point_neg, serialize_pubkey, to_jacobian)
+from work_stealing import WorkStealingScheduler
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+BATCH = 256
+
+
+class GrayKeyWalk:
+    """Every key start ^ (subset of weights), one point addition per key"""
+
+    def __init__(self, start, weights, verifier=None, shard_bits=0, batch_size=BATCH,
+                 exclude=()):
+        self.start = key_to_int(start)
+        # (mask, value) pairs: keys with key & mask == value are walked but not checked
+        self.exclude = list(exclude)
+        # Highest weights select the shard, the rest are walked inside it
+        weights = sorted(set(weights), reverse=True)
+        if any(w & (w - 1) for w in weights):
+            raise ValueError("Weights must be single bits")
+        self.high = weights[:shard_bits]
+        self.low = weights[shard_bits:]
+        self.verifier = verifier or KeyVerifier()
+        self.batch_size = batch_size
+        self.steps = []
+        for w in self.low:
+            point = base_mul(w)
+            self.steps.append((point, point_neg(point)))
+        self.checked = 0
+        self.skipped = 0
+
+    @property
+    def shards(self):
+        return 1 << len(self.high)
+
+    @property
+    def total(self):
+        return self.shards << len(self.low)
+
+    def shard_start(self, shard):
+        key = self.start
+        for i, w in enumerate(self.high):
+            if shard >> i & 1:
+                key ^= w
+        return key
+
+    def batches(self, shard):
+        """Yield ([key], [affine point]) batches covering one shard in Gray-code order"""
+        key = self.shard_start(shard)
+        point = to_jacobian(base_mul(key))
+        keys, points = [key], [point]
+        low, steps, size = self.low, self.steps, self.batch_size
+        for t in range(1, 1 << len(low)):
+            j = (t & -t).bit_length() - 1
+            w = low[j]
+            key ^= w
+            point = jacobian_add_affine(point, steps[j][0] if key & w else steps[j][1])
+            keys.append(key)
+            points.append(point)
+            if len(points) == size:
+                yield keys, batch_to_affine(points)
+                keys, points = [], []
+        if points:
+            yield keys, batch_to_affine(points)
+
+    def shard_exclude(self, shard):
+        """[(walked-bit mask, {values})] of the pairs that can match in a shard
+
+        None if a pair matches every key of the shard.
+        """
+        walked = sum(self.low)
+        start = self.shard_start(shard)
+        groups = {}
+        for mask, value in self.exclude:
+            if (start ^ value) & mask & ~walked:
+                continue
+            mask &= walked
+            if not mask:
+                return None
+            groups.setdefault(mask, set()).add(value & mask)
+        return list(groups.items())
+
+    def walk(self, shard):
+        """Hits (key bytes, address, label, compressed) in one shard"""
+        match = self.verifier.match_hash160
+        encodings = self.verifier.encodings
+        exclude = self.shard_exclude(shard) if self.exclude else []
+        hits = []
+        if exclude is None:
+            size = 1 << len(self.low)
+            self.checked += size
+            self.skipped += size
+            return hits
+        for keys, points in self.batches(shard):
+            for key, point in zip(keys, points):
+                if point is None or not 0 < key < N:
+                    continue
+                if exclude and any(key & mask in values for mask, values in exclude):
+                    self.skipped += 1
+                    continue
+                for compressed in encodings:
+                    found = match(hash160(serialize_pubkey(point, compressed)))
+                    if found:
+                        hits.append((key.to_bytes(32, 'big'), found[0], found[1], compressed))
+            self.checked += len(keys)
+        return hits
+
+    def walk_range(self, lo, hi):
+        """(hits, checked, skipped) of shards lo..hi-1 (a WorkStealingScheduler chunk)"""
+        checked, skipped = self.checked, self.skipped
+        hits = [hit for shard in range(lo, hi) for hit in self.walk(shard)]
+        return hits, self.checked - checked, self.skipped - skipped
+
+    def run(self, workers=None):
+        """Walk every shard on worker processes; returns (hits, scheduler)"""
+        scheduler = WorkStealingScheduler(self.walk_range, self.shards, workers)
+        chunks = scheduler.run()
+        # The workers' counters live in their own processes: add up what each chunk reports
+        self.checked += sum(checked for _, checked, _ in chunks)
+        self.skipped += sum(skipped for _, _, skipped in chunks)
+        return [hit for hits, _, _ in chunks for hit in hits], scheduler
+
+
+def main():
+    import random
+    import time
+
+    from dot_placement import DotPlacementSearch
+    from key_verifier import pubkey_to_address
+    from secp256k1 import privkey_to_pubkey
+
+    print("=== Gray-Code Key Walk ===")
+    tx_bytes = bytes.fromhex(TX_ID)
+
+    # Variable bits: the first 14 free dots of a dot placement too large to walk exhaustively
+    search = DotPlacementSearch(tx_bytes)
+    search.plan()
+    placement = search.deferred[0]
+    weights = placement.free[:14]
+    print(f"Placement {placement.embeddings[0].name}: {len(placement.free)} free dots, "
+          f"walking {len(weights)} of them")
+
+    rng = random.Random(5)
+    planted = placement.start
+    for w in rng.sample(weights, 6):
+        planted ^= w
+    planted_addr = pubkey_to_address(privkey_to_pubkey(planted))
+    verifier = KeyVerifier({"1KfZGvwZxsv5memoCmEV75uqcNzYBHjkHZ": "0.2 BTC puzzle",
+                            planted_addr: "planted demo key"})
+
+    walk = GrayKeyWalk(placement.start, weights[:8], verifier, shard_bits=2)
+    for shard in range(walk.shards):
+        for keys, points in walk.batches(shard):
+            assert all(privkey_to_pubkey(k) == serialize_pubkey(p) for k, p in zip(keys, points))
+    print(f"All {walk.total} walked points equal a fresh scalar multiplication")
+
+    walk = GrayKeyWalk(placement.start, weights, verifier, shard_bits=4)
+    start = time.perf_counter()
+    hits, _, _ = walk.walk_range(0, walk.shards)
+    elapsed = time.perf_counter() - start
+    rate = walk.checked / elapsed
+    print(f"\nWalked 2^{len(weights)} = {walk.checked:,} keys in {walk.shards} shards in "
+          f"{elapsed:.2f}s ({rate:,.0f} keys/s, both encodings hashed)")
+    for key, address, label, compressed in hits:
+        print(f"  hit {key.hex()} -> {address} ({label}, compressed={compressed})")
+
+    start = time.perf_counter()
+    for i in range(100):
+        verifier.verify(planted + i)
+    full = 100 / (time.perf_counter() - start)
+    print(f"Full scalar multiplication per key: {full:,.0f} keys/s ({rate / full:.0f}x slower)")
+    days = (1 << 36) / rate / 86400
+    print(f"2^36 patterns: {days:,.0f} core-days here, {days * 24 / 64:,.1f} h on 64 cores "
+          f"(vs {(1 << 36) / full / 86400 / 64:,.0f} days on 64 cores with scalar multiplications)")
+
+    walk = GrayKeyWalk(placement.start, weights[:10], verifier, shard_bits=3)
+    hits, scheduler = walk.run(workers=2)
+    print(f"\n2^10 keys over 2 worker processes, {walk.shards} shards, {walk.checked:,} keys "
+          f"checked, {len(hits)} hit(s):")
+    scheduler.report()
+
+
+if __name__ == "__main__":
+    main()
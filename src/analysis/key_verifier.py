@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Verification of candidate private keys against target Bitcoin addresses
+
+Targets are stored as raw hash160 values so a candidate costs one scalar
+multiplication plus one serialization and hash160 per encoding, with no
+Base58 work in the loop.
+"""
+import hashlib
+import base58
+from secp256k1 import base_mul, is_valid_key, key_to_int, serialize_pubkey
+
+# Constants
+TARGET_ADDR = "1KfZGvwZxsv5memoCmEV75uqcNzYBHjkHZ"
+
+
+def hash160(data):
+    """Perform RIPEMD160(SHA256(data))"""
+    h = hashlib.new('ripemd160')
+    h.update(hashlib.sha256(data).digest())
+    return h.digest()
+
+
+def hash160_to_address(h160, version=0):
+    """P2PKH address for a hash160"""
+    return base58.b58encode_check(bytes([version]) + h160).decode()
+
+
+def pubkey_to_address(pubkey):
+    """Convert public key to Bitcoin address"""
+    return hash160_to_address(hash160(pubkey))
+
+
+def address_to_hash160(address, strict=True):
+    """Decode a P2PKH address to its hash160
+
+    With strict=False an address whose checksum does not verify still yields
+    its payload (with a warning), since puzzle addresses are often transcribed
+    by hand.
+    """
+    try:
+        raw = base58.b58decode_check(address)
+    except ValueError:
+        if strict:
+            raise
+        raw = base58.b58decode(address)[:-4]
+        print(f"Warning: checksum mismatch for {address}, using payload {raw[1:].hex()}")
+    if len(raw) != 21:
+        raise ValueError(f"Not a P2PKH address: {address}")
+    return raw[1:]
+
+
+class KeyVerifier:
+    """Checks private keys against a set of target addresses"""
+
+    def __init__(self, targets=(TARGET_ADDR,), encodings=(True, False)):
+        # targets may be an iterable of addresses or a dict address -> label
+        if not isinstance(targets, dict):
+            targets = {addr: addr for addr in targets}
+        self.targets = {address_to_hash160(addr, strict=False): (addr, label)
+                        for addr, label in targets.items()}
+        self.encodings = encodings
+        self.checked = 0
+
+    def match_hash160(self, h160):
+        """(address, label) for a target hash160, or None"""
+        return self.targets.get(h160)
+
+    def verify(self, key):
+        """List of (address, label, compressed) targets unlocked by key"""
+        hits = []
+        if not is_valid_key(key):
+            return hits
+        self.checked += 1
+        point = base_mul(key_to_int(key))
+        for compressed in self.encodings:
+            match = self.targets.get(hash160(serialize_pubkey(point, compressed)))
+            if match:
+                hits.append((match[0], match[1], compressed))
+        return hits
+
+
+def main():
+    verifier = KeyVerifier()
+    print("=== Key Verifier ===")
+    print(f"Target: {TARGET_ADDR} -> hash160 {address_to_hash160(TARGET_ADDR, strict=False).hex()}")
+
+    tx_bytes = bytes.fromhex("fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043")
+    print(f"TX id as key: {verifier.verify(tx_bytes) or 'no match'}")
+
+    # Self check against a known address (private key 1)
+    demo = KeyVerifier({"1BgGZ9tcN4rm9KBzDn7KprQz87SZ26SAMH": "key one"})
+    print(f"Key 1 check: {demo.verify(1)}")
+
+
+if __name__ == "__main__":
+    main()
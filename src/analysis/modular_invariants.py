@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Modular relations across the known positions, for every modulus at once
+
+For an expression E evaluated at each constrained position, E ≡ c (mod m)
+holds at all of them exactly when m divides g = gcd(E[i] - E[0]), and
+E ≡ target (mod m) exactly when m divides gcd(E[i] - target[i]).  One gcd
+per expression therefore answers every modulus 2..256 together.  Expressions
+are built from shared per-position atoms (val, pos, row, col, diag[row], ...)
+and their pairwise +, -, ^ combinations; expressions with identical values
+at the constrained positions are grouped, since they satisfy the same
+relations.
+
+Usage: modular_invariants.py [pos=value ...]   (defaults to the known positions)
+"""
+import sys
+from functools import lru_cache
+from itertools import combinations
+from math import gcd, log2
+
+from chain_dsl import DEFAULT_CONTEXT
+
+# Constants
+KNOWN_POS = {7: 9, 22: 22, 25: 7}
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+MAX_MODULUS = 256
+ATOMS = ['val', 'target', 'pos', 'row', 'col', 'trow', 'tcol', 'diag', 'rdiag', 'b58']
+OPS = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '^': lambda a, b: a ^ b,
+}
+
+
+@lru_cache(maxsize=None)
+def moduli_dividing(g, max_modulus=MAX_MODULUS):
+    """Every m in 2..max_modulus dividing g (all of them when g == 0)"""
+    return tuple(m for m in range(2, max_modulus + 1) if g % m == 0)
+
+
+def atom_values(constraints, context=None):
+    """Per-position values of every atom, in sorted position order (no b58 without a Base58 string)"""
+    context = context or DEFAULT_CONTEXT
+    positions = sorted(constraints)
+    values = {name: [] for name in ATOMS if name != 'b58' or context.b58}
+    for pos in positions:
+        env = context.env(pos)
+        row = env['row']
+        values['val'].append(context.tx_bytes[pos])
+        values['target'].append(constraints[pos])
+        values['pos'].append(pos)
+        values['row'].append(row)
+        values['col'].append(env['col'])
+        values['trow'].append(env['trow'])
+        values['tcol'].append(env['tcol'])
+        values['diag'].append(env['diag'][row % len(env['diag'])])
+        values['rdiag'].append(env['rdiag'][row % len(env['rdiag'])])
+        if 'b58' in values:
+            values['b58'].append(env['b58'][pos % len(env['b58'])])
+    return values
+
+
+def expression_family(atoms, ops=OPS):
+    """Atoms and their pairwise combinations: {name: per-position values}"""
+    family = dict(atoms)
+    for a, b in combinations(atoms, 2):
+        for symbol, op in ops.items():
+            family[f"{a} {symbol} {b}"] = [op(x, y) for x, y in zip(atoms[a], atoms[b])]
+            if symbol == '-':
+                family[f"{b} - {a}"] = [y - x for x, y in zip(atoms[a], atoms[b])]
+    return family
+
+
+class ModularRelation:
+    """exprs ≡ rhs (mod m) for every m in moduli; rhs is 'target' or a constant residue"""
+
+    def __init__(self, kind, exprs, g, moduli, values, n_positions):
+        self.kind = kind
+        self.exprs = exprs
+        self.moduli = moduli
+        self.values = values
+        # g == 0: the relation holds over the integers, not just modulo m
+        self.exact = g == 0
+        # -log2 of the chance that an unrelated expression satisfies it at the largest modulus
+        self.bits = (n_positions - 1 if kind == 'constant' else n_positions) * log2(max(moduli))
+
+    @property
+    def modulus(self):
+        return max(self.moduli)
+
+    def residue(self, m):
+        return self.values[0] % m
+
+    def describe(self, m=None):
+        m = m or self.modulus
+        names = self.exprs[0] + (f" (+{len(self.exprs) - 1} equivalent)" if len(self.exprs) > 1 else "")
+        if self.exact:
+            return f"{names} == {'target' if self.kind == 'target' else self.values[0]}"
+        if self.kind == 'target':
+            return f"{names} ≡ target (mod {m})"
+        return f"{names} ≡ {self.residue(m)} (mod {m})"
+
+
+class ModularInvariantScanner:
+    """Finds every modular relation that holds across a constraint set"""
+
+    def __init__(self, constraints=KNOWN_POS, context=None, max_modulus=MAX_MODULUS, ops=OPS):
+        if len(constraints) < 2:
+            raise ValueError("Need at least two constrained positions")
+        self.constraints = dict(constraints)
+        self.max_modulus = max_modulus
+        atoms = atom_values(self.constraints, context)
+        self.targets = atoms['target']
+        self.family = expression_family(atoms, ops)
+
+    def classes(self):
+        """Expressions grouped by their values at the constrained positions"""
+        groups = {}
+        for name, values in self.family.items():
+            groups.setdefault(tuple(values), []).append(name)
+        return groups
+
+    def scan(self):
+        n = len(self.constraints)
+        relations = []
+        seen = set()
+        for values, names in self.classes().items():
+            g = 0
+            for v in values[1:]:
+                g = gcd(g, v - values[0])
+            moduli = moduli_dividing(g, self.max_modulus)
+            # -E is constant wherever E is, so only one of a - b and b - a is reported
+            if moduli and tuple(-v for v in values) not in seen:
+                relations.append(ModularRelation('constant', names, g, moduli, values, n))
+            seen.add(values)
+            plain = [name for name in names if 'target' not in name]
+            if not plain:
+                continue
+            g = 0
+            for v, t in zip(values, self.targets):
+                g = gcd(g, v - t)
+            moduli = moduli_dividing(g, self.max_modulus)
+            if moduli:
+                relations.append(ModularRelation('target', plain, g, moduli, values, n))
+        relations.sort(key=lambda r: r.bits, reverse=True)
+        return relations
+
+
+def parse_constraints(args):
+    return {int(pos): int(val, 0) for pos, val in (arg.split('=') for arg in args)}
+
+
+def summarize(title, scanner, relations, elapsed):
+    print(f"\n{title}: {scanner.constraints}")
+    print(f"{len(scanner.family)} expressions in {len(scanner.classes())} classes, "
+          f"{len(relations)} relations in {elapsed * 1e3:.1f} ms")
+    exact = [r for r in relations if r.exact]
+    if exact:
+        print("Exact equalities (every modulus):")
+        for r in exact[:10]:
+            print(f"  {r.describe()}")
+    print("Strongest relations:")
+    for r in [r for r in relations if not r.exact][:12]:
+        print(f"  {r.describe():<60} {r.bits:5.1f} bits")
+    for m in (8, 58):
+        holding = [r for r in relations if m in r.moduli and not r.exact]
+        examples = '; '.join(r.describe(m) for r in holding[:3])
+        print(f"mod {m}: {len(holding)} relations" + (f", e.g. {examples}" if examples else ""))
+
+
+def main():
+    import time
+
+    print("=== Modular Invariant Scanner ===")
+    sets = []
+    if len(sys.argv) > 1:
+        sets.append(("User constraints", parse_constraints(sys.argv[1:])))
+    else:
+        sets.append(("Known positions", KNOWN_POS))
+        # Base58 alphabet index of each known value's character ('9', 'M', '7')
+        sets.append(("Base58 character indices", {7: B58_ALPHABET.index('9'),
+                                                  22: B58_ALPHABET.index('M'),
+                                                  25: B58_ALPHABET.index('7')}))
+    for title, constraints in sets:
+        start = time.perf_counter()
+        scanner = ModularInvariantScanner(constraints)
+        relations = scanner.scan()
+        summarize(title, scanner, relations, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
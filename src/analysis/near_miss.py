@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Graded near-miss scoring of chain outputs against the known positions
+
+Instead of a pass/fail check at positions 7/22/25 every candidate gets a
+score built from exact byte matches, per-byte Hamming distance and mod 8 /
+mod 58 agreement.  Each worker keeps a bounded top-K heap of its best
+candidates and the driver merges the heaps, so a search of any size ends
+with the K most promising chains in constant memory.
+"""
+import heapq
+from itertools import count
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+KNOWN_POS = {7: 9, 22: 22, 25: 7}
+
+# Weights of the score components; an exact byte outweighs any amount of
+# partial agreement on the other positions
+EXACT_WEIGHT = 100
+BIT_WEIGHT = 4
+MOD58_WEIGHT = 3
+MOD8_WEIGHT = 1
+
+
+def score_components(data, known_pos=KNOWN_POS):
+    """Per-criterion agreement of data with the known positions
+
+    A position past the end of data (a short decoder output) misses on
+    every criterion and counts as 8 differing bits.
+    """
+    exact = hamming = mod58 = mod8 = 0
+    for pos, target in known_pos.items():
+        if pos >= len(data):
+            hamming += 8
+            continue
+        val = data[pos]
+        exact += val == target
+        hamming += (val ^ target).bit_count()
+        mod58 += val % 58 == target % 58
+        mod8 += val % 8 == target % 8
+    return {'exact': exact, 'hamming': hamming, 'mod58': mod58, 'mod8': mod8}
+
+
+def score(data, known_pos=KNOWN_POS):
+    """Single integer score, higher is closer; all positions exact is the maximum"""
+    c = score_components(data, known_pos)
+    bits = 8 * len(known_pos) - c['hamming']
+    return (c['exact'] * EXACT_WEIGHT + bits * BIT_WEIGHT
+            + c['mod58'] * MOD58_WEIGHT + c['mod8'] * MOD8_WEIGHT)
+
+
+def max_score(known_pos=KNOWN_POS):
+    n = len(known_pos)
+    return n * (EXACT_WEIGHT + 8 * BIT_WEIGHT + MOD58_WEIGHT + MOD8_WEIGHT)
+
+
+class TopK:
+    """Bounded min-heap keeping the k highest scoring (score, label, data) entries"""
+
+    def __init__(self, k=1000):
+        self.k = k
+        self.heap = []
+        self.seen = 0
+        self._tiebreak = count()
+
+    def push(self, score, label, data=None):
+        """Offer one candidate, returns True if it entered the heap"""
+        self.seen += 1
+        entry = (score, -next(self._tiebreak), label, data)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+            return True
+        if score > self.heap[0][0]:
+            heapq.heapreplace(self.heap, entry)
+            return True
+        return False
+
+    def threshold(self):
+        """Lowest score still in the heap once it is full"""
+        return self.heap[0][0] if len(self.heap) >= self.k else None
+
+    def merge(self, other):
+        """Fold another heap into this one"""
+        self.seen += other.seen
+        for score, _, label, data in other.heap:
+            self.seen -= 1  # push() counts it again
+            self.push(score, label, data)
+        return self
+
+    @classmethod
+    def merged(cls, heaps, k=None):
+        heaps = list(heaps)
+        result = cls(k or max((h.k for h in heaps), default=1000))
+        for heap in heaps:
+            result.merge(heap)
+        return result
+
+    def results(self):
+        """Entries as (score, label, data), best first"""
+        return [(s, label, data) for s, _, label, data in sorted(self.heap, reverse=True)]
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __getstate__(self):
+        return {'k': self.k, 'seen': self.seen,
+                'entries': [(s, label, data) for s, _, label, data in self.heap]}
+
+    def __setstate__(self, state):
+        self.__init__(state['k'])
+        for s, label, data in state['entries']:
+            self.push(s, label, data)
+        self.seen = state['seen']
+
+
+def scan_xor_add_family(args):
+    """Worker: score x -> (x ^ a) + b for every a in a_range and all b"""
+    a_start, a_stop, k = args
+    tx_bytes = bytes.fromhex(TX_ID)
+    top = TopK(k)
+    for a in range(a_start, a_stop):
+        xored = bytes(v ^ a for v in tx_bytes)
+        for b in range(256):
+            data = bytes((v + b) % 256 for v in xored)
+            top.push(score(data), (a, b), data)
+    return top
+
+
+def main():
+    from multiprocessing import Pool
+    import os
+
+    workers = os.cpu_count() or 1
+    k = 10
+    shards = [(a, a + 32, k) for a in range(0, 256, 32)]
+
+    print("=== Near-Miss Scoring ===")
+    print(f"Max score: {max_score()}")
+    print(f"TX id as-is: {score(bytes.fromhex(TX_ID))} {score_components(bytes.fromhex(TX_ID))}")
+
+    with Pool(workers) as pool:
+        heaps = pool.map(scan_xor_add_family, shards)
+    top = TopK.merged(heaps, k)
+
+    print(f"\nScored {top.seen} chains of (x ^ a) + b across {len(shards)} shards")
+    print(f"Top {k}:")
+    for s, (a, b), data in top.results():
+        comps = score_components(data)
+        print(f"  score {s:3d}  a={a:3d} b={b:3d}  exact={comps['exact']} "
+              f"hamming={comps['hamming']:2d} mod58={comps['mod58']} mod8={comps['mod8']}")
+
+
+if __name__ == "__main__":
+    main()
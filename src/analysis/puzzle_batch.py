@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Batch mode: every solver against every puzzle in one process
+
+A puzzle is a JSON file (see puzzles/ at the repository root):
+
+    {
+      "name": "0.2 BTC puzzle",
+      "targets": ["1KfZGvwZxsv5memoCmEV75uqcNzYBHjkHZ"],
+      "tx_id": "fcee21d4...",
+      "b58_string": "J2LM1xeN...",
+      "known_positions": {"7": 9, "22": 22, "25": 7},
+      "symbols": "△❒●△⧉▣",
+      "chains": ["tri:add(diag[row]) ... fin:pin"]
+    }
+
+Only name, targets and tx_id are required.  Without a b58_string the b58
+terminal and chains reading b58[...] are skipped; without known_positions
+the row-order search (which only screens on them) is skipped.
+
+Each solver turns a puzzle into candidate keys.  Candidates from all puzzles
+are deduplicated and checked by one KeyVerifier holding the union of every
+puzzle's targets, so the EC and hash160 work (and its setup) is shared, and a
+key that happens to unlock another puzzle's address is still reported.
+
+Usage: puzzle_batch.py [--pipeline] [puzzle.json | directory ...]
+"""
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+from chain_dsl import ChainContext, compile_chain, parse_chain
+from expression_synthesizer import TERMINALS, ExpressionSynthesizer
+from key_verifier import KeyVerifier
+from row_order_search import RowOrderSearch
+from triangle_traversal import TRAVERSALS
+
+# Constants
+PUZZLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'puzzles')
+
+
+class Puzzle:
+    """One puzzle definition"""
+
+    def __init__(self, name, targets, tx_id, b58_string='', known_positions=None,
+                 symbols='', chains=(), path=None):
+        self.name = name
+        self.targets = list(targets)
+        self.tx_bytes = bytes.fromhex(tx_id)
+        self.b58_string = b58_string
+        self.known_pos = {int(pos): val for pos, val in (known_positions or {}).items()}
+        self.symbols = symbols
+        self.chains = list(chains)
+        self.path = path
+        self._context = None
+
+    @classmethod
+    def from_dict(cls, data, path=None):
+        missing = {'name', 'targets', 'tx_id'} - set(data)
+        if missing:
+            raise ValueError(f"Puzzle {path or data} is missing {sorted(missing)}")
+        return cls(data['name'], data['targets'], data['tx_id'], data.get('b58_string', ''),
+                   data.get('known_positions'), data.get('symbols', ''), data.get('chains', ()),
+                   path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f), path)
+
+    @property
+    def context(self):
+        """ChainContext for the DSL and the solvers built on it"""
+        if self._context is None:
+            self._context = ChainContext(self.tx_bytes, self.b58_string, self.known_pos)
+        return self._context
+
+    def __repr__(self):
+        return f"Puzzle({self.name!r})"
+
+
+def load_puzzles(paths):
+    """Puzzles from JSON files and directories of JSON files"""
+    puzzles = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith('.json'):
+                    puzzles.append(Puzzle.load(os.path.join(path, name)))
+        else:
+            puzzles.append(Puzzle.load(path))
+    return puzzles
+
+
+# Solvers: puzzle -> iterable of (label, 32-byte candidate)
+
+def solve_identity(puzzle):
+    yield 'tx', puzzle.tx_bytes
+
+
+def solve_traversals(puzzle):
+    for name, traversal in TRAVERSALS.items():
+        if traversal.full and traversal.width == len(puzzle.tx_bytes):
+            yield name, traversal(puzzle.tx_bytes)
+
+
+def solve_row_orders(puzzle, max_permutations=2000):
+    # Without known positions nothing is screened out, so every layout would reach EC
+    if not puzzle.known_pos:
+        return
+    search = RowOrderSearch(puzzle.tx_bytes, puzzle.known_pos)
+    for order, mask, candidate in search.layouts(max_permutations):
+        yield f"rows {''.join(map(str, order))}/{mask:02x}", candidate
+
+
+def uses_b58(spec):
+    return any('b58' in step.names for step in parse_chain(spec))
+
+
+def solve_chains(puzzle):
+    for spec in puzzle.chains:
+        if not puzzle.b58_string and uses_b58(spec):
+            continue
+        yield spec, compile_chain(spec, puzzle.context)(puzzle.tx_bytes)
+
+
+def solve_synthesis(puzzle, max_size=3):
+    if len(puzzle.known_pos) < 1:
+        return
+    terminals = [t for t in TERMINALS if t != 'b58' or puzzle.b58_string]
+    synth = ExpressionSynthesizer(puzzle.known_pos, terminals, context=puzzle.context)
+    for definition in synth.run(max_size):
+        yield synth.render(definition), synth.evaluate(definition)
+
+
+SOLVERS = {
+    'identity': solve_identity,
+    'traversals': solve_traversals,
+    'row_orders': solve_row_orders,
+    'chains': solve_chains,
+    'synthesis': solve_synthesis,
+}
+
+
+class BatchRunner:
+    """Runs solvers over puzzles and verifies all candidates against all targets"""
+
+    def __init__(self, puzzles, solvers=SOLVERS, verifier=None):
+        self.puzzles = list(puzzles)
+        self.solvers = dict(solvers)
+        targets = {}
+        for puzzle in self.puzzles:
+            for address in puzzle.targets:
+                targets[address] = puzzle.name
+        self.verifier = verifier or KeyVerifier(targets)
+        self.origins = defaultdict(list)  # key -> [(puzzle name, solver, label)]
+        self.counts = defaultdict(int)    # (puzzle name, solver) -> candidates produced
+        self.solver_time = defaultdict(float)
+
+    def candidates(self):
+        """Every distinct candidate key, recording where each one came from"""
+        for puzzle in self.puzzles:
+            for name, solver in self.solvers.items():
+                start = time.perf_counter()
+                for label, key in solver(puzzle):
+                    key = bytes(key)
+                    self.counts[puzzle.name, name] += 1
+                    first = key not in self.origins
+                    self.origins[key].append((puzzle.name, name, label))
+                    if first:
+                        self.solver_time[name] += time.perf_counter() - start
+                        yield key
+                        start = time.perf_counter()
+                self.solver_time[name] += time.perf_counter() - start
+
+    def run(self, pipeline=False):
+        """Returns [(key, address, target puzzle, compressed, origins)]"""
+        if pipeline:
+            from staged_pipeline import StagedPipeline
+            stages = StagedPipeline(known_pos={}, verifier=self.verifier)
+            raw = stages.run_sync(self.candidates())
+        else:
+            raw = []
+            for key in self.candidates():
+                for address, label, compressed in self.verifier.verify(key):
+                    raw.append((key, address, label, compressed))
+        return [(key, address, label, compressed, self.origins[key])
+                for key, address, label, compressed in raw]
+
+
+def main():
+    args = sys.argv[1:]
+    pipeline = '--pipeline' in args
+    paths = [a for a in args if a != '--pipeline'] or [PUZZLE_DIR]
+    puzzles = load_puzzles(paths)
+
+    print("=== Multi-Puzzle Batch Mode ===")
+    for puzzle in puzzles:
+        print(f"  {puzzle.name}: {len(puzzle.targets)} target(s), known {puzzle.known_pos}, "
+              f"{len(puzzle.chains)} chain spec(s)")
+
+    runner = BatchRunner(puzzles)
+    print(f"Shared verifier: {len(runner.verifier.targets)} target hash160s")
+    start = time.perf_counter()
+    hits = runner.run(pipeline)
+    elapsed = time.perf_counter() - start
+
+    produced = sum(runner.counts.values())
+    print(f"\n{produced} candidates from {len(puzzles)} puzzles x {len(runner.solvers)} solvers, "
+          f"{len(runner.origins)} distinct keys checked in {elapsed:.2f}s")
+    print(f"{'puzzle':<20}" + ''.join(f"{name:>12}" for name in runner.solvers))
+    for puzzle in puzzles:
+        print(f"{puzzle.name[:19]:<20}"
+              + ''.join(f"{runner.counts[puzzle.name, name]:>12}" for name in runner.solvers))
+    print(f"{'solver time (s)':<20}"
+          + ''.join(f"{runner.solver_time[name]:>12.2f}" for name in runner.solvers))
+
+    print("\nHits:")
+    for key, address, label, compressed, origins in hits:
+        print(f"  {key.hex()} -> {address} ({label}, compressed={compressed})")
+        for puzzle_name, solver, source in origins[:3]:
+            print(f"      from {puzzle_name} / {solver}: {source}")
+    if not hits:
+        print("  none")
+
+
+if __name__ == "__main__":
+    main()
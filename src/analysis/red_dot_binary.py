@@ -5,6 +5,8 @@ Each dot might represent a bit in the final key
 """
 import binascii
 
+from bit_tables import POPCOUNT, bit_string
+
 class RedDotAnalyzer:
     def __init__(self):
         self.dots_per_row = [1, 2, 3, 4, 5, 6, 7, 8]  # Number of dots in each row
@@ -43,7 +45,7 @@ class RedDotAnalyzer:
                     bit_pos = next(i for i, p in enumerate(row) if p[0] == pos)
                     print(f"Position {pos} -> Value {val} at bit {bit_pos}")
                     # Show binary representation
-                    binary = format(val, '08b')
+                    binary = bit_string(val)
                     print(f"Binary: {binary}")
 
     def analyze_dot_groups(self):
@@ -74,7 +76,7 @@ class RedDotAnalyzer:
                     bits_needed = val.bit_length()
                     print(f"Bits needed: {bits_needed}")
                     # Show binary representation
-                    binary = format(val, f'0{bits}b')
+                    binary = bit_string(val, bits)
                     print(f"Binary pattern: {binary}")
 
     def analyze_bit_positions(self):
@@ -93,9 +95,9 @@ class RedDotAnalyzer:
                     print(f"Found in row {row_idx + 1}, column {col}")
                     
                     # Analyze binary properties
-                    print(f"Binary value: {format(val, '08b')}")
-                    print(f"Set bits: {bin(val).count('1')}")
-                    print(f"Position binary: {format(pos, '08b')}")
+                    print(f"Binary value: {bit_string(val)}")
+                    print(f"Set bits: {POPCOUNT[val]}")
+                    print(f"Position binary: {bit_string(pos)}")
                     print(f"Row binary: {format(row_idx, '03b')}")
                     print(f"Column binary: {format(col, '03b')}")
                     
@@ -103,9 +105,9 @@ class RedDotAnalyzer:
                     xor_with_pos = val ^ pos
                     xor_with_row = val ^ row_idx
                     xor_with_col = val ^ col
-                    print(f"XOR with position: {format(xor_with_pos, '08b')}")
-                    print(f"XOR with row: {format(xor_with_row, '08b')}")
-                    print(f"XOR with column: {format(xor_with_col, '08b')}")
+                    print(f"XOR with position: {bit_string(xor_with_pos)}")
+                    print(f"XOR with row: {bit_string(xor_with_row)}")
+                    print(f"XOR with column: {bit_string(xor_with_col)}")
                     break
                 total += dots
 
@@ -136,7 +138,7 @@ class RedDotAnalyzer:
                     rel_pos = pos - row_start
                     print(f"Position {pos} (relative: {rel_pos}) -> Value {val}")
                     # Show how this value might map to available bits
-                    binary = format(val, f'0{dots}b')
+                    binary = bit_string(val, dots)
                     print(f"Value as binary: {binary}")
 
 def main():
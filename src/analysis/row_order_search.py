@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Search over triangle row orders and row reversals
+
+A layout concatenates the 8 triangle rows in some order, each optionally
+reversed, and reads the data bytes at those dots (8!·2^8 layouts, of which
+8!·2^7 = 5,160,960 are distinct since the apex row is a single dot).
+Permutations are walked with Heap's algorithm and reversal masks
+with a binary Gray code, so consecutive layouts differ by one row swap or
+one row flip.  The 32-byte candidate is updated in place: a flip reverses
+one slice, a swap re-gathers only the span between the two swapped rows.
+Layouts that hit the known positions are streamed to the key verifier.
+"""
+from math import factorial
+
+from key_verifier import KeyVerifier
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+KNOWN_POS = {7: 9, 22: 22, 25: 7}
+TRIANGLE = [
+    [0],
+    [1,2],
+    [3,4,5],
+    [6,7,8,9],
+    [10,11,12,13,14],
+    [15,16,17,18,19,20],
+    [21,22,23,24,25,26,27],
+    [28,29,30,31,32,33,34,35]
+]
+ROWS = len(TRIANGLE)
+
+
+def heap_swaps(n):
+    """Index pairs swapped by Heap's algorithm; n! - 1 swaps visit every permutation"""
+    c = [0] * n
+    i = 1
+    while i < n:
+        if c[i] < i:
+            j = 0 if i % 2 == 0 else c[i]
+            yield j, i
+            c[i] += 1
+            i = 1
+        else:
+            c[i] = 0
+            i += 1
+
+
+def gray_flips(items):
+    """Item toggled at each step of the reflected Gray code over len(items) bits"""
+    return [items[(t & -t).bit_length() - 1] for t in range(1, 1 << len(items))]
+
+
+def layout_indices(order, mask, width=32):
+    """Data positions read by a layout (rows in `order`, bit r of mask reverses row r)"""
+    indices = []
+    for r in order:
+        row = [p for p in TRIANGLE[r] if p < width]
+        indices.extend(reversed(row) if (mask >> r) & 1 else row)
+    return indices
+
+
+def gather_layout(data, order, mask):
+    """Candidate for one layout, built from scratch"""
+    return bytes(data[p] for p in layout_indices(order, mask, len(data)))
+
+
+class RowOrderSearch:
+    """Incremental walk over every row order x reversal mask"""
+
+    def __init__(self, data, known_pos=KNOWN_POS):
+        self.data = bytes(data)
+        self.known_pos = dict(known_pos)
+        width = len(self.data)
+        self.forward = [bytes(self.data[p] for p in row if p < width) for row in TRIANGLE]
+        self.lengths = [len(seg) for seg in self.forward]
+        # Reversing a single-dot row changes nothing, so only longer rows get a Gray bit
+        self.flippable = [r for r in range(ROWS) if self.lengths[r] > 1]
+        self.visited = 0
+        self.passed = 0
+
+    @property
+    def total(self):
+        return factorial(ROWS) << len(self.flippable)
+
+    def _segment(self, r, mask):
+        seg = self.forward[r]
+        return seg[::-1] if (mask >> r) & 1 else seg
+
+    def layouts(self, max_permutations=None):
+        """Yield (order, mask, candidate) for every layout passing the known-position screen"""
+        order = list(range(ROWS))
+        mask = 0
+        lengths = self.lengths
+        starts = [0] * ROWS
+        for k in range(1, ROWS):
+            starts[k] = starts[k - 1] + lengths[order[k - 1]]
+        slot = {r: k for k, r in enumerate(order)}
+        buf = bytearray(b''.join(self._segment(r, mask) for r in order))
+        checks = sorted(self.known_pos.items())
+        p0, v0 = checks[0] if checks else (0, None)
+        rest = checks[1:]
+        flips = gray_flips(self.flippable)
+
+        def screen():
+            return v0 is None or (buf[p0] == v0 and all(buf[p] == v for p, v in rest))
+
+        swaps = heap_swaps(ROWS)
+        permutations = 0
+        while True:
+            # Every mask for this order: the current one, then one flip per Gray step
+            self.visited += 1
+            if screen():
+                self.passed += 1
+                yield tuple(order), mask, bytes(buf)
+            for r in flips:
+                mask ^= 1 << r
+                s = starts[slot[r]]
+                e = s + lengths[r]
+                buf[s:e] = buf[s:e][::-1]
+                self.visited += 1
+                if screen():
+                    self.passed += 1
+                    yield tuple(order), mask, bytes(buf)
+            permutations += 1
+            if max_permutations is not None and permutations >= max_permutations:
+                return
+            swap = next(swaps, None)
+            if swap is None:
+                return
+            j, i = swap
+            order[j], order[i] = order[i], order[j]
+            slot[order[j]] = j
+            slot[order[i]] = i
+            # Rows between the swapped slots shift only if the two lengths differ
+            pos = starts[j]
+            end = starts[i] + lengths[order[j]]
+            for k in range(j, i + 1):
+                starts[k] = pos
+                pos += lengths[order[k]]
+            buf[starts[j]:end] = b''.join(self._segment(order[k], mask) for k in range(j, i + 1))
+
+    def run(self, verifier=None, max_permutations=None):
+        """Stream screened layouts into the verifier; returns (hits, screened)"""
+        verifier = verifier or KeyVerifier()
+        hits = []
+        screened = []
+        for order, mask, candidate in self.layouts(max_permutations):
+            screened.append((order, mask, candidate))
+            for match in verifier.verify(candidate):
+                hits.append((order, mask, candidate, match))
+        return hits, screened
+
+
+def main():
+    import time
+
+    tx_bytes = bytes.fromhex(TX_ID)
+    search = RowOrderSearch(tx_bytes)
+
+    print("=== Row Order / Reversal Search ===")
+    print(f"Layout space: {ROWS}! x 2^{len(search.flippable)} = {search.total:,} distinct layouts")
+
+    # Incremental buffer against fresh gathers over the first few thousand layouts
+    check = RowOrderSearch(tx_bytes, known_pos={})
+    for order, mask, candidate in check.layouts(max_permutations=20):
+        assert candidate == gather_layout(tx_bytes, order, mask)
+    print(f"Incremental updates match fresh gathers over {check.visited:,} layouts")
+
+    walk = RowOrderSearch(tx_bytes)
+    start = time.perf_counter()
+    screened = list(walk.layouts(max_permutations=4000))
+    elapsed = time.perf_counter() - start
+    rate = walk.visited / elapsed
+    print(f"\nWalked {walk.visited:,} layouts in {elapsed:.2f}s ({rate:,.0f} layouts/sec), "
+          f"full space in ~{walk.total / rate:.0f}s")
+    print(f"{walk.passed} layouts passed the known-position screen, e.g.:")
+    for order, mask, candidate in screened[:5]:
+        print(f"  order {''.join(map(str, order))} reversed {mask:08b}: {candidate.hex()}")
+
+    start = time.perf_counter()
+    hits, screened = search.run(max_permutations=100)
+    elapsed = time.perf_counter() - start
+    print(f"\nVerified {len(screened)} screened layouts from the first 100 row orders "
+          f"in {elapsed:.2f}s: {hits or 'no match'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Minimal secp256k1 arithmetic for turning candidate private keys into public keys
+
+Points are affine (x, y) tuples with None as the point at infinity.  Internal
+arithmetic uses Jacobian coordinates (X, Y, Z) so a scalar multiplication
+needs a single modular inversion at the end.
+"""
+
+# Curve parameters
+P = 2**256 - 2**32 - 977
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+GX = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+GY = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+G = (GX, GY)
+
+JACOBIAN_INFINITY = (0, 1, 0)
+
+# Affine multiples 2^j * G, filled on first use
+_G_DOUBLES = []
+
+
+def inverse(a):
+    """Modular inverse in the field"""
+    return pow(a, -1, P)
+
+
+def batch_inverse(values):
+    """Inverses of many field elements with one inversion (Montgomery's trick); 0 maps to 0"""
+    prefix = []
+    acc = 1
+    for v in values:
+        prefix.append(acc)
+        if v:
+            acc = acc * v % P
+    inv = inverse(acc)
+    out = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        v = values[i]
+        if v:
+            out[i] = inv * prefix[i] % P
+            inv = inv * v % P
+    return out
+
+
+def to_jacobian(point):
+    if point is None:
+        return JACOBIAN_INFINITY
+    return (point[0], point[1], 1)
+
+
+def to_affine(point):
+    """Convert a Jacobian point back to affine coordinates"""
+    x, y, z = point
+    if z == 0:
+        return None
+    z_inv = inverse(z)
+    z_inv2 = z_inv * z_inv % P
+    return (x * z_inv2 % P, y * z_inv2 * z_inv % P)
+
+
+def batch_to_affine(points):
+    """to_affine for a list of Jacobian points, sharing one field inversion"""
+    out = []
+    for (x, y, z), z_inv in zip(points, batch_inverse([z for _, _, z in points])):
+        if z == 0:
+            out.append(None)
+            continue
+        z_inv2 = z_inv * z_inv % P
+        out.append((x * z_inv2 % P, y * z_inv2 * z_inv % P))
+    return out
+
+
+def jacobian_double(point):
+    x, y, z = point
+    if z == 0 or y == 0:
+        return JACOBIAN_INFINITY
+    ysq = y * y % P
+    s = 4 * x * ysq % P
+    m = 3 * x * x % P
+    nx = (m * m - 2 * s) % P
+    ny = (m * (s - nx) - 8 * ysq * ysq) % P
+    nz = 2 * y * z % P
+    return (nx, ny, nz)
+
+
+def jacobian_add_affine(point, other):
+    """Add an affine point to a Jacobian point (mixed addition)"""
+    if other is None:
+        return point
+    x1, y1, z1 = point
+    if z1 == 0:
+        return (other[0], other[1], 1)
+    x2, y2 = other
+    z1z1 = z1 * z1 % P
+    u2 = x2 * z1z1 % P
+    s2 = y2 * z1 * z1z1 % P
+    h = (u2 - x1) % P
+    r = (s2 - y1) % P
+    if h == 0:
+        if r == 0:
+            return jacobian_double(point)
+        return JACOBIAN_INFINITY
+    hh = h * h % P
+    hhh = h * hh % P
+    v = x1 * hh % P
+    nx = (r * r - hhh - 2 * v) % P
+    ny = (r * (v - nx) - y1 * hhh) % P
+    nz = z1 * h % P
+    return (nx, ny, nz)
+
+
+def jacobian_add(point, other):
+    """Add two Jacobian points"""
+    x1, y1, z1 = point
+    x2, y2, z2 = other
+    if z1 == 0:
+        return other
+    if z2 == 0:
+        return point
+    z1z1 = z1 * z1 % P
+    z2z2 = z2 * z2 % P
+    u1 = x1 * z2z2 % P
+    u2 = x2 * z1z1 % P
+    s1 = y1 * z2 * z2z2 % P
+    s2 = y2 * z1 * z1z1 % P
+    h = (u2 - u1) % P
+    r = (s2 - s1) % P
+    if h == 0:
+        if r == 0:
+            return jacobian_double(point)
+        return JACOBIAN_INFINITY
+    hh = h * h % P
+    hhh = h * hh % P
+    v = u1 * hh % P
+    nx = (r * r - hhh - 2 * v) % P
+    ny = (r * (v - nx) - s1 * hhh) % P
+    nz = z1 * z2 * h % P
+    return (nx, ny, nz)
+
+
+def point_add(a, b):
+    """Add two affine points"""
+    return to_affine(jacobian_add_affine(to_jacobian(a), b))
+
+
+def point_neg(point):
+    if point is None:
+        return None
+    return (point[0], (-point[1]) % P)
+
+
+def point_mul(k, point):
+    """Scalar multiplication of an arbitrary affine point"""
+    k %= N
+    result = JACOBIAN_INFINITY
+    for bit in bin(k)[2:]:
+        result = jacobian_double(result)
+        if bit == '1':
+            result = jacobian_add_affine(result, point)
+    return to_affine(result)
+
+
+def g_doubles():
+    """Affine points 2^j * G for j in 0..255"""
+    if not _G_DOUBLES:
+        point = to_jacobian(G)
+        for _ in range(256):
+            _G_DOUBLES.append(to_affine(point))
+            point = jacobian_double(point)
+    return _G_DOUBLES
+
+
+def load_g_doubles(points):
+    """Install a table of 2^j * G computed elsewhere (e.g. read from shared memory)"""
+    _G_DOUBLES[:] = points
+
+
+def base_mul(k):
+    """k * G using the precomputed doubling table (no doublings at runtime)"""
+    k %= N
+    table = g_doubles()
+    result = JACOBIAN_INFINITY
+    j = 0
+    while k:
+        if k & 1:
+            result = jacobian_add_affine(result, table[j])
+        k >>= 1
+        j += 1
+    return to_affine(result)
+
+
+def serialize_pubkey(point, compressed=True):
+    """SEC1 encoding of an affine public key"""
+    x, y = point
+    if compressed:
+        return bytes([2 + (y & 1)]) + x.to_bytes(32, 'big')
+    return b'\x04' + x.to_bytes(32, 'big') + y.to_bytes(32, 'big')
+
+
+def key_to_int(key):
+    """Private key as an integer, accepting ints or 32-byte strings"""
+    if isinstance(key, int):
+        return key
+    if len(key) != 32:
+        raise ValueError(f"Private key must be 32 bytes, got {len(key)}")
+    return int.from_bytes(key, 'big')
+
+
+def is_valid_key(key):
+    k = key_to_int(key)
+    return 0 < k < N
+
+
+def privkey_to_pubkey(key, compressed=True):
+    """Serialized public key for a private key"""
+    k = key_to_int(key)
+    if not 0 < k < N:
+        raise ValueError("Private key out of range")
+    return serialize_pubkey(base_mul(k), compressed)
+
+
+def main():
+    import time
+
+    print("=== secp256k1 Self Check ===")
+    print(f"1*G compressed: {privkey_to_pubkey(1).hex()}")
+    assert privkey_to_pubkey(1) == bytes.fromhex(
+        "0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798")
+    assert base_mul(12345) == point_mul(12345, G)
+    assert point_add(base_mul(5), base_mul(7)) == base_mul(12)
+    multiples = [jacobian_double(to_jacobian(base_mul(k))) for k in range(1, 9)]
+    assert batch_to_affine(multiples + [JACOBIAN_INFINITY]) == \
+        [base_mul(2 * k) for k in range(1, 9)] + [None]
+
+    key = bytes.fromhex("fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043")
+    start = time.perf_counter()
+    count = 200
+    for i in range(count):
+        privkey_to_pubkey(key_to_int(key) + i)
+    elapsed = time.perf_counter() - start
+    print(f"{count} public keys in {elapsed:.3f}s ({count / elapsed:.0f} keys/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Fixed-memory approximate seen-set for dropping duplicate candidates before EC
+
+Different chains, traversals and interpretations often produce the same
+32-byte key (any chain whose ⧉/▣ steps overwrite positions with the known
+values, for instance), and each repeat would otherwise cost a full scalar
+multiplication.  A Bloom filter remembers every key in a fixed bit array.
+A repeat of a key that was added is always caught; the error goes the
+other way: a key that was never added is reported as seen, and dropped, at
+the false-positive rate fixed at construction.  That is the costly
+direction for an exhaustive search, since a dropped key is never verified,
+so use an exact set instead where completeness matters.
+
+Bits are addressed by double hashing, i-th probe = h1 + i*h2 mod m, with h1
+and h2 taken from one 16-byte blake2b digest.  The array lives either in a
+bytearray or in a multiprocessing.shared_memory block, so one filter can be
+shared by every worker process.  Within a process add() holds a lock, so
+threads sharing a filter keep exact counters.  Concurrent adds from several
+processes may occasionally lose a bit set in the same byte; that only lets
+a duplicate through to verification, never drops a new key.
+"""
+import hashlib
+import math
+import os
+import threading
+from multiprocessing import shared_memory
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+
+
+def bloom_size(capacity, fp_rate, max_bytes=None):
+    """(bits, probes) for capacity items at fp_rate, bits capped at 8 * max_bytes"""
+    bits = math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+    if max_bytes is not None:
+        bits = min(bits, 8 * max_bytes)
+    bits = max(64, bits)
+    probes = max(1, round(bits / capacity * math.log(2)))
+    return bits, probes
+
+
+def expected_fp_rate(bits, probes, items):
+    return (1 - math.exp(-probes * items / bits)) ** probes
+
+
+class BloomFilter:
+    """Bloom filter over bytes keys, optionally backed by shared memory"""
+
+    def __init__(self, capacity=1_000_000, fp_rate=1e-4, max_bytes=None, shared=False,
+                 _attach=None):
+        if _attach is not None:
+            name, self.bits, self.probes = _attach
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = None
+        else:
+            self.bits, self.probes = bloom_size(capacity, fp_rate, max_bytes)
+            self._shm = None
+            # Only the creating process unlinks, also when the object is inherited by fork
+            self._owner = os.getpid() if shared else None
+            if shared:
+                self._shm = shared_memory.SharedMemory(create=True, size=(self.bits + 7) // 8)
+        if self._shm is not None:
+            self.array = self._shm.buf
+        else:
+            self.array = bytearray((self.bits + 7) // 8)
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self.added = 0
+        self.dropped = 0
+
+    @property
+    def nbytes(self):
+        return (self.bits + 7) // 8
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        m = self.bits
+        return [(h1 + i * h2) % m for i in range(self.probes)]
+
+    def __contains__(self, key):
+        array = self.array
+        return all(array[p >> 3] >> (p & 7) & 1 for p in self._positions(key))
+
+    def add(self, key):
+        """Insert key; True if it was (probably) not present before"""
+        positions = self._positions(key)
+        array = self.array
+        new = False
+        with self._lock:
+            for p in positions:
+                byte, bit = p >> 3, 1 << (p & 7)
+                if not array[byte] & bit:
+                    array[byte] |= bit
+                    new = True
+            if new:
+                self.added += 1
+            else:
+                self.dropped += 1
+        return new
+
+    def filter(self, keys):
+        """Keys of an iterable not seen before (by this or any sharing process)"""
+        return [key for key in keys if self.add(key)]
+
+    def fill_ratio(self):
+        return sum(bin(b).count('1') for b in self.array) / self.bits
+
+    def spec(self):
+        """Picklable handle for attaching in another process"""
+        if self._shm is None:
+            raise ValueError("Filter is not in shared memory")
+        return self._shm.name, self.bits, self.probes
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(_attach=spec)
+
+    def __getstate__(self):
+        return {'spec': self.spec(), 'capacity': self.capacity}
+
+    def __setstate__(self, state):
+        self.__init__(state['capacity'], _attach=state['spec'])
+
+    def close(self):
+        """Detach; the creating process also frees the shared block"""
+        if self._shm is not None:
+            self.array = None
+            self._shm.close()
+            if self._owner == os.getpid():
+                self._shm.unlink()
+            self._shm = None
+
+
+def _shared_worker(bloom, keys, results):
+    results.put(len(bloom.filter(keys)))
+    bloom.close()
+
+
+def main():
+    import multiprocessing as mp
+    import time
+
+    from secp256k1 import privkey_to_pubkey
+
+    print("=== Seen-Set Filter ===")
+    seed = bytes.fromhex(TX_ID)
+    distinct = [hashlib.sha256(seed + i.to_bytes(4, 'big')).digest() for i in range(50_000)]
+    # Every distinct key repeated four times, as when chain families converge
+    stream = [distinct[i % len(distinct)] for i in range(4 * len(distinct))]
+
+    bloom = BloomFilter(capacity=len(distinct), fp_rate=1e-4)
+    print(f"{bloom.bits:,} bits ({bloom.nbytes / 1024:.0f} KiB), {bloom.probes} probes for "
+          f"{len(distinct):,} keys at 1e-4")
+    start = time.perf_counter()
+    kept = bloom.filter(stream)
+    elapsed = time.perf_counter() - start
+    print(f"{len(stream):,} candidates -> {len(kept):,} kept, {bloom.dropped:,} dropped in "
+          f"{elapsed:.2f}s ({elapsed / len(stream) * 1e6:.2f} us each, fill {bloom.fill_ratio():.2f})")
+    lost = len(distinct) - len(set(kept))
+    print(f"New keys wrongly dropped (false positives): {lost} "
+          f"(expected ~{expected_fp_rate(bloom.bits, bloom.probes, len(distinct)) * len(distinct):.1f})")
+
+    start = time.perf_counter()
+    for key in distinct[:20]:
+        privkey_to_pubkey(key)
+    ec = (time.perf_counter() - start) / 20
+    print(f"One scalar multiplication: {ec * 1e6:.0f} us, so each drop saves ~{ec / (elapsed / len(stream)):.0f}x "
+          f"its filter cost")
+
+    capped = BloomFilter(capacity=len(distinct), fp_rate=1e-4, max_bytes=64 * 1024)
+    print(f"\nWith a 64 KiB cap: {capped.probes} probes, expected fp rate "
+          f"{expected_fp_rate(capped.bits, capped.probes, len(distinct)):.1e}")
+
+    print("\nShared across 2 processes fed overlapping slices [0, 30000) and [20000, 50000):")
+    shared = BloomFilter(capacity=len(distinct), fp_rate=1e-4, shared=True)
+    results = mp.Queue()
+    procs = [mp.Process(target=_shared_worker,
+                        args=(shared, distinct[w * 20_000:w * 20_000 + 30_000], results))
+             for w in range(2)]
+    for p in procs:
+        p.start()
+    counts = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    print(f"  kept per process {counts}, total {sum(counts):,} of 60,000 candidates "
+          f"({len(distinct):,} distinct)")
+    shared.close()
+
+
+if __name__ == "__main__":
+    main()
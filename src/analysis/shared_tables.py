@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Read-only lookup tables shared by every worker process
+
+The parent builds each large immutable table once (compiled chain LUTs, the
+2^j * G table, traversal index arrays, alphabet and triangle maps) and
+publishes them all into one multiprocessing.shared_memory block.  Workers
+receive a small picklable manifest (block name plus offset, size and
+element format of every table) and attach with zero-copy memoryviews, so
+worker memory stays flat as the worker count grows and a worker is ready
+as soon as it has mapped the block.
+
+    registry = TableRegistry()
+    publish_chains(registry, specs)
+    manifest = registry.publish()          # parent; pass manifest to workers
+    tables = attach(manifest)              # worker
+    chain = tables.chain(spec)             # CompiledChain over the shared LUT
+"""
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+from chain_dsl import DEFAULT_CONTEXT, TRIANGLE, CompiledChain, compile_chain
+from secp256k1 import g_doubles
+from triangle_traversal import TRAVERSALS, Traversal
+
+# Constants
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+ALIGN = 8
+
+
+class TableRegistry:
+    """Parent side: collects tables, then copies them into one shared block"""
+
+    def __init__(self):
+        self._tables = {}  # name -> (bytes, format)
+        self._shm = None
+        self.manifest = None
+
+    def add(self, name, data, fmt='B'):
+        if self._shm is not None:
+            raise ValueError("Registry already published")
+        self._tables[name] = (bytes(memoryview(data).cast('B')), fmt)
+
+    def publish(self):
+        """Create the shared block; returns the picklable manifest"""
+        layout, offset = {}, 0
+        for name, (data, fmt) in self._tables.items():
+            layout[name] = (offset, len(data), fmt)
+            offset += -(-len(data) // ALIGN) * ALIGN
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, (data, _) in self._tables.items():
+            start = layout[name][0]
+            self._shm.buf[start:start + len(data)] = data
+        self._tables.clear()
+        self.manifest = {'block': self._shm.name, 'size': offset, 'tables': layout}
+        return self.manifest
+
+    def close(self):
+        """Free the block (workers that are still attached keep their mapping)"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SharedTables:
+    """Worker side: named memoryviews into the shared block"""
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+        # Before 3.13 attaching registers the block with the resource tracker too; workers
+        # started by multiprocessing share the parent's tracker, so only the parent unlinks
+        self._shm = shared_memory.SharedMemory(name=manifest['block'])
+        self._views = {}
+
+    def __contains__(self, name):
+        return name in self.manifest['tables']
+
+    def __getitem__(self, name):
+        view = self._views.get(name)
+        if view is None:
+            offset, size, fmt = self.manifest['tables'][name]
+            view = self._shm.buf[offset:offset + size].cast(fmt)
+            self._views[name] = view
+        return view
+
+    def names(self, prefix=''):
+        return [name for name in self.manifest['tables'] if name.startswith(prefix)]
+
+    def chain(self, spec, width=None):
+        return CompiledChain.from_flat(spec, self['chain:' + spec], width or DEFAULT_CONTEXT.width)
+
+    def traversal(self, name, width=None):
+        return Traversal(name, self['traversal:' + name], width or DEFAULT_CONTEXT.width)
+
+    def g_doubles(self):
+        """The 2^j * G table as affine points"""
+        raw = self['g_doubles']
+        return [(int.from_bytes(raw[64 * j:64 * j + 32], 'big'),
+                 int.from_bytes(raw[64 * j + 32:64 * j + 64], 'big')) for j in range(len(raw) // 64)]
+
+    def close(self):
+        """Unmap the block; chains and views obtained from it must be gone"""
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._shm.close()
+
+
+_attached = {}
+
+
+def attach(manifest):
+    """SharedTables for a manifest, attaching once per process"""
+    tables = _attached.get(manifest['block'])
+    if tables is None:
+        tables = _attached[manifest['block']] = SharedTables(manifest)
+    return tables
+
+
+def detach(manifest):
+    tables = _attached.pop(manifest['block'], None)
+    if tables is not None:
+        tables.close()
+
+
+# Standard tables
+
+def publish_chains(registry, specs, context=None):
+    for spec in specs:
+        registry.add('chain:' + spec, compile_chain(spec, context).flat)
+
+
+def publish_ec(registry):
+    registry.add('g_doubles', b''.join(x.to_bytes(32, 'big') + y.to_bytes(32, 'big')
+                                       for x, y in g_doubles()))
+
+
+def publish_traversals(registry, traversals=TRAVERSALS):
+    for name, traversal in traversals.items():
+        registry.add('traversal:' + name, bytes(traversal.indices))
+
+
+def publish_maps(registry):
+    b58_index = bytearray(b'\xff' * 256)
+    for i, c in enumerate(B58_ALPHABET):
+        b58_index[ord(c)] = i
+    registry.add('b58_index', b58_index)
+    registry.add('triangle_pos', bytes(v for r, row in enumerate(TRIANGLE)
+                                       for c, pos in enumerate(row) for v in (pos, r, c)))
+
+
+def standard_registry(specs=()):
+    registry = TableRegistry()
+    publish_chains(registry, specs)
+    publish_ec(registry)
+    publish_traversals(registry)
+    publish_maps(registry)
+    return registry
+
+
+def _memory_kib():
+    """(private resident, shared-memory resident) KiB of this process"""
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'RssShmem'):
+                fields[key] = int(value.split()[0])
+    return fields.get('VmRSS', 0) - fields.get('RssShmem', 0), fields.get('RssShmem', 0)
+
+
+def _worker_shared(manifest, specs, started, results):
+    base = _memory_kib()[0]
+    tables = attach(manifest)
+    ready = time.time() - started
+    tx = DEFAULT_CONTEXT.tx_bytes
+    checksum = sum(tables.chain(spec)(tx)[7] for spec in specs)
+    private, shared = _memory_kib()
+    results.put((ready, private - base, shared, checksum))
+    detach(manifest)
+
+
+def _worker_rebuild(specs, started, results):
+    base = _memory_kib()[0]
+    chains = [compile_chain(spec) for spec in specs]
+    ready = time.time() - started
+    checksum = sum(chain(DEFAULT_CONTEXT.tx_bytes)[7] for chain in chains)
+    private, shared = _memory_kib()
+    results.put((ready, private - base, shared, checksum))
+
+
+def main():
+    from chain_dedupe import spec_family
+
+    specs = spec_family()
+    workers = 3
+    ctx = mp.get_context('spawn')
+
+    print("=== Shared-Memory Tables ===")
+    start = time.perf_counter()
+    registry = standard_registry(specs)
+    manifest = registry.publish()
+    print(f"Published {len(manifest['tables'])} tables ({manifest['size'] / 2**20:.1f} MiB) "
+          f"in {time.perf_counter() - start:.2f}s; manifest for {len(specs)} chains")
+
+    tables = attach(manifest)
+    tx = DEFAULT_CONTEXT.tx_bytes
+    assert all(tables.chain(spec)(tx) == compile_chain(spec)(tx) for spec in specs[:50])
+    assert tables.g_doubles() == g_doubles()
+    assert all(tables.traversal(name)(tx) == t(tx) for name, t in TRAVERSALS.items())
+    detach(manifest)
+    print("Shared chains, traversals and 2^j*G table agree with locally built ones")
+
+    print(f"\n{workers} spawned workers each needing all {len(specs)} chains:")
+    print(f"{'mode':<10}{'ready s':>10}{'private KiB':>13}{'shared KiB':>12}")
+    for mode in ('rebuild', 'shared'):
+        results = ctx.Queue()
+        started = time.time()
+        if mode == 'shared':
+            procs = [ctx.Process(target=_worker_shared, args=(manifest, specs, started, results))
+                     for _ in range(workers)]
+        else:
+            procs = [ctx.Process(target=_worker_rebuild, args=(specs, started, results))
+                     for _ in range(workers)]
+        for p in procs:
+            p.start()
+        rows = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        assert len({row[3] for row in rows}) == 1
+        for ready, private, shared, _ in rows:
+            print(f"{mode:<10}{ready:>10.2f}{private:>13}{shared:>12}")
+    print("(ready includes interpreter start-up; private is memory added after import,"
+          " shared pages are mapped once for all workers)")
+    registry.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Columnar recorder for the intermediate outputs of the six-step symbol
+pipeline △❒●△⧉▣
+
+Every recorded chain contributes one fixed-width row of bytes per stage.
+Rows are appended to one flat uint8 file per stage, so a trace of N chains
+is six files of N * width bytes with no per-chain Python objects.  Reading
+a trace back maps those files and answers queries such as "all chains whose
+stage-3 byte 22 equals 0x16" by scanning a single strided column.
+"""
+import json
+import mmap
+import os
+
+SYMBOLS = "△❒●△⧉▣"
+STAGE_NAMES = ['first_triangle', 'box', 'circle', 'second_triangle', 'grid', 'final']
+TRACE_VERSION = 1
+HEADER_FILE = 'trace.json'
+LABELS_FILE = 'labels.txt'
+
+
+def stage_file(stage):
+    """File name of the column store for a 1-based stage number"""
+    return f"stage{stage}.u8"
+
+
+class StageTraceRecorder:
+    """Append-only writer for a stage trace directory"""
+
+    def __init__(self, path, width=32, flush_rows=4096):
+        self.path = path
+        self.width = width
+        self.flush_rows = flush_rows
+        self.count = 0
+        self.buffers = [bytearray() for _ in SYMBOLS]
+        self.labels = []
+        os.makedirs(path, exist_ok=True)
+        self.files = [open(os.path.join(path, stage_file(s)), 'wb')
+                      for s in range(1, len(SYMBOLS) + 1)]
+        self.label_file = open(os.path.join(path, LABELS_FILE), 'w')
+
+    def record(self, stages, label=None):
+        """Record the six stage outputs of one chain, returns its index"""
+        if len(stages) != len(SYMBOLS):
+            raise ValueError(f"Expected {len(SYMBOLS)} stage outputs, got {len(stages)}")
+        for buf, data in zip(self.buffers, stages):
+            if len(data) != self.width:
+                raise ValueError(f"Stage output has {len(data)} bytes, expected {self.width}")
+            buf += data
+        self.labels.append('' if label is None else str(label).replace('\n', ' '))
+        index = self.count
+        self.count += 1
+        if len(self.labels) >= self.flush_rows:
+            self.flush()
+        return index
+
+    def trace(self, data, stage_funcs, label=None):
+        """Run data through the six stage functions and record every output"""
+        outputs = []
+        for func in stage_funcs:
+            data = func(data)
+            outputs.append(bytes(data))
+        self.record(outputs, label)
+        return data
+
+    def flush(self):
+        """Write buffered rows to the column files"""
+        for f, buf in zip(self.files, self.buffers):
+            f.write(buf)
+            f.flush()
+            del buf[:]
+        if self.labels:
+            self.label_file.write('\n'.join(self.labels) + '\n')
+            self.label_file.flush()
+            self.labels = []
+        self.write_header()
+
+    def write_header(self):
+        header = {
+            'version': TRACE_VERSION,
+            'width': self.width,
+            'count': self.count,
+            'symbols': SYMBOLS,
+            'stages': STAGE_NAMES,
+        }
+        tmp = os.path.join(self.path, HEADER_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(header, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(self.path, HEADER_FILE))
+
+    def close(self):
+        self.flush()
+        for f in self.files:
+            f.close()
+        self.label_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StageTrace:
+    """Read-only, memory-mapped view of a recorded stage trace"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, HEADER_FILE)) as f:
+            header = json.load(f)
+        if header['version'] != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace version {header['version']}")
+        self.width = header['width']
+        self.count = header['count']
+        self.columns = []
+        self._files = []
+        for s in range(1, len(SYMBOLS) + 1):
+            f = open(os.path.join(path, stage_file(s)), 'rb')
+            self._files.append(f)
+            size = self.count * self.width
+            self.columns.append(mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) if size else b'')
+        self._labels = None
+
+    def close(self):
+        for col in self.columns:
+            if isinstance(col, mmap.mmap):
+                col.close()
+        for f in self._files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _check(self, stage, pos):
+        if not 1 <= stage <= len(SYMBOLS):
+            raise ValueError(f"Stage must be 1..{len(SYMBOLS)}, got {stage}")
+        if not 0 <= pos < self.width:
+            raise ValueError(f"Position must be 0..{self.width - 1}, got {pos}")
+
+    def column(self, stage, pos):
+        """Byte `pos` of stage `stage` for every chain, as one bytes object"""
+        self._check(stage, pos)
+        return self.columns[stage - 1][pos::self.width]
+
+    def stage_output(self, chain, stage):
+        """Full stage output of one chain"""
+        start = chain * self.width
+        return bytes(self.columns[stage - 1][start:start + self.width])
+
+    def chain(self, chain):
+        """All six stage outputs of one chain"""
+        return [self.stage_output(chain, s) for s in range(1, len(SYMBOLS) + 1)]
+
+    def label(self, chain):
+        if self._labels is None:
+            with open(os.path.join(self.path, LABELS_FILE)) as f:
+                self._labels = f.read().split('\n')
+        return self._labels[chain]
+
+    def find(self, stage, pos, value):
+        """Indices of all chains whose stage output has `value` at `pos`"""
+        col = self.column(stage, pos)
+        needle = bytes([value])
+        hits = []
+        i = col.find(needle)
+        while i != -1:
+            hits.append(i)
+            i = col.find(needle, i + 1)
+        return hits
+
+    def query(self, *conditions):
+        """Chains matching every (stage, pos, value) condition"""
+        if not conditions:
+            return list(range(self.count))
+        # Start from the most selective column to keep the candidate set small
+        results = sorted((self.find(*cond) for cond in conditions), key=len)
+        selected = results[0]
+        for hits in results[1:]:
+            hit_set = set(hits)
+            selected = [i for i in selected if i in hit_set]
+        return selected
+
+    def value_counts(self, stage, pos):
+        """Histogram of byte values at one stage position"""
+        col = self.column(stage, pos)
+        counts = {v: col.count(bytes([v])) for v in range(256)}
+        return {v: n for v, n in counts.items() if n}
+
+
+def main():
+    import random
+    import tempfile
+
+    tx_bytes = bytes.fromhex("fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043")
+    known_pos = {7: 9, 22: 22, 25: 7}
+
+    def make_stages(key):
+        """Simple keyed XOR/rotate chain standing in for a solver's stages"""
+        return [
+            lambda d: bytes(v ^ key for v in d),
+            lambda d: bytes((v + (i // 8) + (i % 8)) % 256 for i, v in enumerate(d)),
+            lambda d: bytes(((v << (i % 8)) | (v >> (8 - i % 8))) & 0xFF for i, v in enumerate(d)),
+            lambda d: bytes(v ^ (7 - i // 8) for i, v in enumerate(d)),
+            lambda d: bytes(v ^ ((i * 8) % 256) for i, v in enumerate(d)),
+            lambda d: bytes(d),
+        ]
+
+    print("=== Stage Trace Recorder ===")
+    path = tempfile.mkdtemp(prefix='stage_trace_')
+    rng = random.Random(1)
+    with StageTraceRecorder(path) as recorder:
+        for key in range(256):
+            recorder.trace(tx_bytes, make_stages(key), label=f"xor_key={key}")
+        for _ in range(10000):
+            data = bytes(rng.randrange(256) for _ in range(32))
+            recorder.record([data] * 6, label='random')
+    print(f"Recorded {recorder.count} chains to {path}")
+
+    with StageTrace(path) as trace:
+        hits = trace.find(3, 22, 0x16)
+        print(f"\nChains with stage-3 byte 22 == 0x16: {len(hits)}")
+        for chain in hits[:5]:
+            print(f"  #{chain} {trace.label(chain)}")
+
+        print("\nKnown position hits at final stage:")
+        for pos, val in known_pos.items():
+            print(f"  Position {pos} == {val}: {len(trace.find(6, pos, val))} chains")
+        combined = trace.query(*[(6, pos, val) for pos, val in known_pos.items()])
+        print(f"  All known positions: {len(combined)} chains")
+
+
+if __name__ == "__main__":
+    main()
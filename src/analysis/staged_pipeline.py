@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Asyncio-orchestrated candidate pipeline:
+
+    generate -> transform -> screen -> EC -> hash -> match
+
+Each stage runs its batches in its own executor (process pool for transforms
+and EC, thread pools for generation, screening and hashlib) and stages are
+connected by bounded queues of batches.  A full queue blocks the stage feeding
+it, so a fast generator can never run ahead of the EC stage by more than
+queue_size batches.  Queue depths are sampled while running to show which
+stage is the bottleneck.  An optional search_metrics.SearchMetrics receives
+the per-stage counts and queue depths for live export, and an optional
+seen_filter.BloomFilter drops repeated keys after screening so duplicates
+never reach the EC stage.
+"""
+import asyncio
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+from key_verifier import KeyVerifier, hash160
+from secp256k1 import base_mul, is_valid_key, key_to_int, serialize_pubkey
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+KNOWN_POS = {7: 9, 22: 22, 25: 7}
+
+STAGES = ['generate', 'transform', 'screen', 'ec', 'hash', 'match']
+_DONE = None
+
+
+def identity(value):
+    return value
+
+
+def next_batch(iterator, size):
+    return list(islice(iterator, size))
+
+
+def transform_batch(func, batch):
+    """Apply a (picklable) transform to every item of a batch"""
+    return [func(item) for item in batch]
+
+
+def screen_batch(known_pos, batch):
+    """Keep 32-byte candidates that match the known positions and are valid keys"""
+    checks = list(known_pos.items())
+    return [key for key in batch
+            if len(key) == 32
+            and all(key[pos] == val for pos, val in checks)
+            and is_valid_key(key)]
+
+
+def screen_unseen_batch(known_pos, seen, batch):
+    """screen_batch, then drop keys already in the seen-set (seen_filter.BloomFilter)"""
+    return seen.filter(screen_batch(known_pos, batch))
+
+
+def ec_batch(encodings, batch):
+    """Derive the public keys of every candidate in a batch, one scalar multiplication per key"""
+    result = []
+    for key in batch:
+        point = base_mul(key_to_int(key))
+        result.append((key, [serialize_pubkey(point, compressed) for compressed in encodings]))
+    return result
+
+
+def hash_batch(batch):
+    return [(key, [hash160(pub) for pub in pubkeys]) for key, pubkeys in batch]
+
+
+class StagedPipeline:
+    """Bounded-queue pipeline from raw inputs to target matches"""
+
+    def __init__(self, transform=identity, known_pos=KNOWN_POS, verifier=None,
+                 batch_size=64, queue_size=4, processes=None, threads=2, metrics=None,
+                 seen=None):
+        self.transform = transform
+        self.known_pos = known_pos
+        self.verifier = verifier or KeyVerifier()
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.processes = processes or os.cpu_count() or 1
+        self.threads = threads
+        self.metrics = metrics
+        self.seen = seen
+        self.queues = {}
+        self.counts = defaultdict(int)
+        self.busy = defaultdict(float)
+        self.depth_samples = defaultdict(list)
+        self.hits = []
+
+    def queue_depths(self):
+        """Current number of batches waiting in front of each stage"""
+        return {name: q.qsize() for name, q in self.queues.items()}
+
+    async def _stage(self, name, executor, func, args, inbox, outbox, workers):
+        """Run `workers` concurrent consumers of inbox, feeding outbox"""
+        loop = asyncio.get_running_loop()
+        remaining = [workers]
+
+        async def consume():
+            while True:
+                batch = await inbox.get()
+                if batch is _DONE:
+                    # Let sibling consumers see the end marker too
+                    await inbox.put(_DONE)
+                    break
+                start = time.perf_counter()
+                result = await loop.run_in_executor(executor, func, *args, batch)
+                self.busy[name] += time.perf_counter() - start
+                self.counts[name] += len(result)
+                if self.metrics:
+                    self._publish(name, batch, result)
+                if result:
+                    await outbox.put(result)
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                await outbox.put(_DONE)
+
+        await asyncio.gather(*(consume() for _ in range(workers)))
+
+    async def _generate(self, executor, candidates, outbox):
+        loop = asyncio.get_running_loop()
+        iterator = iter(candidates)
+        while True:
+            start = time.perf_counter()
+            batch = await loop.run_in_executor(executor, next_batch, iterator, self.batch_size)
+            self.busy['generate'] += time.perf_counter() - start
+            if not batch:
+                break
+            self.counts['generate'] += len(batch)
+            if self.metrics:
+                self.metrics.stage('generate', len(batch))
+            await outbox.put(batch)
+        await outbox.put(_DONE)
+
+    async def _match(self, inbox):
+        while True:
+            batch = await inbox.get()
+            if batch is _DONE:
+                break
+            if self.metrics:
+                self.metrics.stage('match', len(batch))
+            for key, hashes in batch:
+                self.counts['match'] += 1
+                for compressed, h160 in zip(self.verifier.encodings, hashes):
+                    match = self.verifier.match_hash160(h160)
+                    if match:
+                        self.hits.append((bytes(key), match[0], match[1], compressed))
+
+    def _publish(self, name, batch, result):
+        self.metrics.stage(name, len(result))
+        if name == 'screen':
+            self.metrics.add('screen_checked', len(batch))
+            self.metrics.add('screen_passed', len(result))
+        elif name == 'ec':
+            self.metrics.add('ec_keys', len(result))
+
+    async def _monitor(self, interval):
+        while True:
+            depths = self.queue_depths()
+            for name, depth in depths.items():
+                self.depth_samples[name].append(depth)
+            if self.metrics:
+                self.metrics.set_queue_depths(depths)
+            await asyncio.sleep(interval)
+
+    def _screen(self):
+        if self.seen is None:
+            return screen_batch, (self.known_pos,)
+        return screen_unseen_batch, (self.known_pos, self.seen)
+
+    async def run(self, candidates, monitor_interval=0.05):
+        """Push every candidate through the pipeline, returns the hits"""
+        self.queues = {name: asyncio.Queue(self.queue_size) for name in STAGES[1:]}
+        q = self.queues
+        with ProcessPoolExecutor(self.processes) as transform_pool, \
+                ProcessPoolExecutor(self.processes) as ec_pool, \
+                ThreadPoolExecutor(1) as generate_pool, \
+                ThreadPoolExecutor(self.threads) as screen_pool, \
+                ThreadPoolExecutor(self.threads) as hash_pool:
+            monitor = asyncio.create_task(self._monitor(monitor_interval))
+            await asyncio.gather(
+                self._generate(generate_pool, candidates, q['transform']),
+                self._stage('transform', transform_pool, transform_batch, (self.transform,),
+                            q['transform'], q['screen'], self.processes),
+                self._stage('screen', screen_pool, *self._screen(),
+                            q['screen'], q['ec'], self.threads),
+                self._stage('ec', ec_pool, ec_batch, (self.verifier.encodings,),
+                            q['ec'], q['hash'], self.processes),
+                self._stage('hash', hash_pool, hash_batch, (),
+                            q['hash'], q['match'], self.threads),
+                self._match(q['match']),
+            )
+            monitor.cancel()
+        return self.hits
+
+    def run_sync(self, candidates):
+        return asyncio.run(self.run(candidates))
+
+    def report(self, elapsed):
+        """Print per-stage throughput, busy time and mean queue depth"""
+        print(f"{'stage':<10}{'items':>10}{'items/s':>12}{'busy s':>10}{'mean queue':>12}")
+        for name in STAGES:
+            samples = self.depth_samples.get(name, [])
+            depth = f"{sum(samples) / len(samples):.2f}" if samples else '-'
+            rate = self.counts[name] / elapsed if elapsed else 0
+            print(f"{name:<10}{self.counts[name]:>10}{rate:>12.0f}{self.busy[name]:>10.2f}{depth:>12}")
+
+
+def demo_transform(k):
+    """Fold a counter into the TX id and force the known positions"""
+    key = bytearray(bytes.fromhex(TX_ID))
+    key[0:4] = (int.from_bytes(key[0:4], 'big') ^ k).to_bytes(4, 'big')
+    for pos, val in KNOWN_POS.items():
+        key[pos] = val
+    return bytes(key)
+
+
+def main():
+    count = 2000
+    planted = demo_transform(1234)
+    from key_verifier import pubkey_to_address
+    from secp256k1 import privkey_to_pubkey
+    planted_addr = pubkey_to_address(privkey_to_pubkey(planted))
+    verifier = KeyVerifier({"1KfZGvwZxsv5memoCmEV75uqcNzYBHjkHZ": "0.2 BTC puzzle",
+                            planted_addr: "planted demo key"})
+
+    print("=== Staged Pipeline ===")
+    pipeline = StagedPipeline(demo_transform, verifier=verifier)
+    start = time.perf_counter()
+    hits = pipeline.run_sync(range(count))
+    elapsed = time.perf_counter() - start
+    print(f"Processed {count} candidates in {elapsed:.2f}s with {pipeline.processes} processes\n")
+    pipeline.report(elapsed)
+    print("\nHits:")
+    for key, address, label, compressed in hits:
+        print(f"  {key.hex()} -> {address} ({label}, compressed={compressed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 Analysis focusing on how the symbol sequence △❒●△⧉▣ might represent bit manipulations
 Key insight: Each symbol might represent a specific bit transformation pattern
 """
+from bit_tables import BIN8, BITS
 
 class SymbolBitAnalyzer:
     def __init__(self):
@@ -31,14 +32,14 @@ class SymbolBitAnalyzer:
             if pos < len(tx_bytes):
                 tx_val = tx_bytes[pos]
                 print(f"\nPosition {pos}:")
-                print(f"TX value:     {bin(tx_val)[2:].zfill(8)}")
-                print(f"Known value:  {bin(val)[2:].zfill(8)}")
-                print(f"Position bin: {bin(pos)[2:].zfill(8)}")
-                print(f"XOR:          {bin(tx_val ^ val)[2:].zfill(8)}")
+                print(f"TX value:     {BIN8[tx_val]}")
+                print(f"Known value:  {BIN8[val]}")
+                print(f"Position bin: {BIN8[pos]}")
+                print(f"XOR:          {BIN8[tx_val ^ val]}")
                 
                 # Analyze bit transitions
-                tx_bits = [int(b) for b in bin(tx_val)[2:].zfill(8)]
-                val_bits = [int(b) for b in bin(val)[2:].zfill(8)]
+                tx_bits = BITS[tx_val]
+                val_bits = BITS[val]
                 transitions = []
                 for i, (t, v) in enumerate(zip(tx_bits, val_bits)):
                     if t != v:
@@ -97,7 +98,7 @@ class SymbolBitAnalyzer:
                 if pos < len(tx_bytes):
                     val = tx_bytes[pos]
                     row_values.append(val)
-                    print(f"Position {pos}: {bin(val)[2:].zfill(8)}")
+                    print(f"Position {pos}: {BIN8[val]}")
             
             if row_values:
                 # Analyze bit patterns in row
@@ -117,9 +118,9 @@ class SymbolBitAnalyzer:
                     xor = val1 ^ val2
                     if xor:
                         print(f"\nBit changes {i}->{i+1}:")
-                        print(f"From: {bin(val1)[2:].zfill(8)}")
-                        print(f"To:   {bin(val2)[2:].zfill(8)}")
-                        print(f"XOR:  {bin(xor)[2:].zfill(8)}")
+                        print(f"From: {BIN8[val1]}")
+                        print(f"To:   {BIN8[val2]}")
+                        print(f"XOR:  {BIN8[xor]}")
 
     def analyze_diagonal_bit_patterns(self):
         """Analyze bit patterns along diagonals"""
@@ -136,7 +137,7 @@ class SymbolBitAnalyzer:
         
         print("Main diagonal bit patterns:")
         for pos, val in diagonal:
-            print(f"Position {pos}: {bin(val)[2:].zfill(8)}")
+            print(f"Position {pos}: {BIN8[val]}")
         
         # Analyze bit transitions along diagonal
         if len(diagonal) > 1:
@@ -146,9 +147,9 @@ class SymbolBitAnalyzer:
                 pos2, val2 = diagonal[i+1]
                 xor = val1 ^ val2
                 print(f"\nTransition {pos1}->{pos2}:")
-                print(f"From: {bin(val1)[2:].zfill(8)}")
-                print(f"To:   {bin(val2)[2:].zfill(8)}")
-                print(f"XOR:  {bin(xor)[2:].zfill(8)}")
+                print(f"From: {BIN8[val1]}")
+                print(f"To:   {BIN8[val2]}")
+                print(f"XOR:  {BIN8[xor]}")
 
     def analyze_known_value_bits(self):
         """Detailed analysis of bit patterns in known values"""
@@ -164,11 +165,11 @@ class SymbolBitAnalyzer:
             pos2, val2 = sorted_pos[i+1]
             
             print(f"\nFrom position {pos1}({val1}) to {pos2}({val2}):")
-            print(f"Value 1:    {bin(val1)[2:].zfill(8)}")
-            print(f"Value 2:    {bin(val2)[2:].zfill(8)}")
-            print(f"XOR:        {bin(val1 ^ val2)[2:].zfill(8)}")
-            print(f"AND:        {bin(val1 & val2)[2:].zfill(8)}")
-            print(f"OR:         {bin(val1 | val2)[2:].zfill(8)}")
+            print(f"Value 1:    {BIN8[val1]}")
+            print(f"Value 2:    {BIN8[val2]}")
+            print(f"XOR:        {BIN8[val1 ^ val2]}")
+            print(f"AND:        {BIN8[val1 & val2]}")
+            print(f"OR:         {BIN8[val1 | val2]}")
             
             # Analyze bit changes
             changes = []
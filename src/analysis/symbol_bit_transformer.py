@@ -7,6 +7,8 @@ import base58
 import hashlib
 from itertools import combinations
 
+from bit_tables import ALTERNATING, ROTL, bits_of, from_bits
+
 class SymbolBitTransformer:
     def __init__(self):
         self.tx_id = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
@@ -25,10 +27,14 @@ class SymbolBitTransformer:
 
     def get_bit_pattern(self, value, nbits=8):
         """Get binary pattern of a value"""
+        if nbits == 8:
+            return bits_of(value)
         return [int(b) for b in bin(value)[2:].zfill(nbits)]
 
     def bits_to_int(self, bits):
         """Convert bit pattern back to integer"""
+        if len(bits) == 8:
+            return from_bits(bits)
         return int(''.join(str(b) for b in bits), 2)
 
     def first_triangle_transform(self, data):
@@ -39,27 +45,19 @@ class SymbolBitTransformer:
         for i, val in enumerate(data):
             row = i // 8
             col = i % 8
-            val_bits = self.get_bit_pattern(val)
             
             # Get diagonal value for this row
             if row < len(self.diagonal_values):
                 diag_val = int(self.diagonal_values[row], 16)
-                diag_bits = self.get_bit_pattern(diag_val)
-                
-                # Transform bits based on position
-                new_bits = []
-                for j, (v_bit, d_bit) in enumerate(zip(val_bits, diag_bits)):
-                    # Position-based bit manipulation
-                    new_bit = v_bit ^ d_bit ^ ((row + col) & 1)
-                    new_bits.append(new_bit)
                 
-                result[i] = self.bits_to_int(new_bits)
+                # Every bit flips with the diagonal bit and the position parity
+                result[i] = val ^ diag_val ^ (0xFF if (row + col) & 1 else 0)
                 
                 if i in self.known_pos:
                     print(f"\nPosition {i} transform:")
-                    print(f"Original bits: {val_bits}")
-                    print(f"Diagonal bits: {diag_bits}")
-                    print(f"Result bits:   {new_bits}")
+                    print(f"Original bits: {bits_of(val)}")
+                    print(f"Diagonal bits: {bits_of(diag_val)}")
+                    print(f"Result bits:   {bits_of(result[i])}")
                     print(f"Value: {hex(result[i])[2:]}")
         
         return bytes(result)
@@ -72,23 +70,16 @@ class SymbolBitTransformer:
         for i, val in enumerate(data):
             row = i // 8
             col = i % 8
-            val_bits = self.get_bit_pattern(val)
-            
-            # Transform bits based on grid position
-            new_bits = []
-            for j, bit in enumerate(val_bits):
-                # Grid-based bit manipulation
-                grid_factor = (row * col) % 8
-                new_bit = bit ^ ((j + grid_factor) & 1)
-                new_bits.append(new_bit)
             
-            result[i] = self.bits_to_int(new_bits)
+            # Bit j flips when j + grid factor is odd
+            grid_factor = (row * col) % 8
+            result[i] = val ^ ALTERNATING[grid_factor]
             
             if i in self.known_pos:
                 print(f"\nPosition {i} transform:")
-                print(f"Original bits: {val_bits}")
+                print(f"Original bits: {bits_of(val)}")
                 print(f"Grid factor: {grid_factor}")
-                print(f"Result bits:   {new_bits}")
+                print(f"Result bits:   {bits_of(result[i])}")
                 print(f"Value: {hex(result[i])[2:]}")
         
         return bytes(result)
@@ -99,20 +90,16 @@ class SymbolBitTransformer:
         result = bytearray(len(data))
         
         for i, val in enumerate(data):
-            val_bits = self.get_bit_pattern(val)
-            
             # Determine rotation amount based on position
             rotation = i % 8
             # Rotate bits
-            new_bits = val_bits[rotation:] + val_bits[:rotation]
-            
-            result[i] = self.bits_to_int(new_bits)
+            result[i] = ROTL[rotation][val]
             
             if i in self.known_pos:
                 print(f"\nPosition {i} transform:")
-                print(f"Original bits: {val_bits}")
+                print(f"Original bits: {bits_of(val)}")
                 print(f"Rotation: {rotation}")
-                print(f"Result bits:   {new_bits}")
+                print(f"Result bits:   {bits_of(result[i])}")
                 print(f"Value: {hex(result[i])[2:]}")
         
         return bytes(result)
@@ -125,27 +112,19 @@ class SymbolBitTransformer:
         for i, val in enumerate(data):
             row = i // 8
             col = i % 8
-            val_bits = self.get_bit_pattern(val)
             
             # Get reverse diagonal value
             if row < len(self.diagonal_values):
                 diag_val = int(self.diagonal_values[-(row+1)], 16)
-                diag_bits = self.get_bit_pattern(diag_val)
                 
-                # Transform bits using reverse diagonal
-                new_bits = []
-                for j, (v_bit, d_bit) in enumerate(zip(val_bits, diag_bits)):
-                    # Inverse of first triangle transform
-                    new_bit = v_bit ^ d_bit ^ ((row - col) & 1)
-                    new_bits.append(new_bit)
-                
-                result[i] = self.bits_to_int(new_bits)
+                # Inverse of first triangle transform, with the reverse diagonal
+                result[i] = val ^ diag_val ^ (0xFF if (row - col) & 1 else 0)
                 
                 if i in self.known_pos:
                     print(f"\nPosition {i} transform:")
-                    print(f"Original bits: {val_bits}")
-                    print(f"Diagonal bits: {diag_bits}")
-                    print(f"Result bits:   {new_bits}")
+                    print(f"Original bits: {bits_of(val)}")
+                    print(f"Diagonal bits: {bits_of(diag_val)}")
+                    print(f"Result bits:   {bits_of(result[i])}")
                     print(f"Value: {hex(result[i])[2:]}")
         
         return bytes(result)
@@ -156,26 +135,19 @@ class SymbolBitTransformer:
         result = bytearray(len(data))
         
         for i, val in enumerate(data):
-            val_bits = self.get_bit_pattern(val)
-            
             # Create position-specific bit mask
             row = i // 8
             col = i % 8
-            mask_bits = self.get_bit_pattern((row * 8 + col) % 256)
+            mask = (row * 8 + col) % 256
             
             # Apply mask
-            new_bits = []
-            for j, (v_bit, m_bit) in enumerate(zip(val_bits, mask_bits)):
-                new_bit = v_bit ^ m_bit
-                new_bits.append(new_bit)
-            
-            result[i] = self.bits_to_int(new_bits)
+            result[i] = val ^ mask
             
             if i in self.known_pos:
                 print(f"\nPosition {i} transform:")
-                print(f"Original bits: {val_bits}")
-                print(f"Mask bits:     {mask_bits}")
-                print(f"Result bits:   {new_bits}")
+                print(f"Original bits: {bits_of(val)}")
+                print(f"Mask bits:     {bits_of(mask)}")
+                print(f"Result bits:   {bits_of(result[i])}")
                 print(f"Value: {hex(result[i])[2:]}")
         
         return bytes(result)
@@ -189,48 +161,47 @@ class SymbolBitTransformer:
         known_patterns = {}
         for pos, val in self.known_pos.items():
             if pos < len(data):
-                orig_bits = self.get_bit_pattern(data[pos])
-                target_bits = self.get_bit_pattern(val)
-                diff_pattern = [t ^ o for t, o in zip(target_bits, orig_bits)]
-                known_patterns[pos] = diff_pattern
+                known_patterns[pos] = val ^ data[pos]
         
         # Apply patterns to all positions
         for i, val in enumerate(data):
-            val_bits = self.get_bit_pattern(val)
-            
             # Find nearest known position
             nearest_pos = min(known_patterns.keys(), key=lambda x: abs(x - i))
             pattern = known_patterns[nearest_pos]
             
             # Apply pattern
-            new_bits = []
-            for j, (v_bit, p_bit) in enumerate(zip(val_bits, pattern)):
-                new_bit = v_bit ^ p_bit
-                new_bits.append(new_bit)
-            
-            result[i] = self.bits_to_int(new_bits)
+            result[i] = val ^ pattern
             
             if i in self.known_pos:
                 print(f"\nPosition {i} transform:")
-                print(f"Original bits: {val_bits}")
-                print(f"Pattern bits:  {pattern}")
-                print(f"Result bits:   {new_bits}")
+                print(f"Original bits: {bits_of(val)}")
+                print(f"Pattern bits:  {bits_of(pattern)}")
+                print(f"Result bits:   {bits_of(result[i])}")
                 print(f"Value: {hex(result[i])[2:]}")
         
         return bytes(result)
 
-    def apply_full_transformation(self):
+    def apply_full_transformation(self, recorder=None):
         """Apply complete transformation sequence"""
         print("Starting full transformation sequence...")
         data = bytes.fromhex(self.tx_id)
         
         # Apply transformations in sequence
+        stages = []
         data = self.first_triangle_transform(data)
+        stages.append(data)
         data = self.box_transform(data)
+        stages.append(data)
         data = self.circle_transform(data)
+        stages.append(data)
         data = self.second_triangle_transform(data)
+        stages.append(data)
         data = self.grid_transform(data)
+        stages.append(data)
         data = self.final_transform(data)
+        stages.append(data)
+        if recorder is not None:
+            recorder.record(stages)
         
         # Verify results
         print("\n=== Final Verification ===")
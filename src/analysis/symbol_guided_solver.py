@@ -6,6 +6,7 @@ between red dot positions and Base58 alphabet positions
 import base58
 import hashlib
 from itertools import permutations
+from near_miss import max_score, score, score_components
 
 # Constants
 TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
@@ -182,18 +183,27 @@ class SymbolGuidedSolver:
         
         return bytes(result)
 
-    def solve(self):
+    def solve(self, recorder=None):
         """Apply full transformation sequence"""
         print("Starting symbol-guided solution...")
         data = self.tx_bytes
         
         # Apply transformations in sequence
+        stages = []
         data = self.first_triangle_transform(data)
+        stages.append(data)
         data = self.box_transform(data)
+        stages.append(data)
         data = self.circle_transform(data)
+        stages.append(data)
         data = self.second_triangle_transform(data)
+        stages.append(data)
         data = self.grid_transform(data)
+        stages.append(data)
         data = self.final_transform(data)
+        stages.append(data)
+        if recorder is not None:
+            recorder.record(stages)
         
         # Verify known positions
         print("\n=== Final Verification ===")
@@ -212,6 +222,7 @@ class SymbolGuidedSolver:
             print("Mismatches:")
             for pos, actual, expected in mismatches:
                 print(f"Position {pos}: Got {actual}, Expected {expected}")
+        print(f"Near-miss score: {score(data)}/{max_score()} {score_components(data)}")
         
         return data
 
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Named traversals of the 36-dot triangle as precomputed gather indices
+
+Every ordering (row-major, column-major, diagonals, anti-diagonals, zigzag,
+boustrophedon, spiral, the diagonal and edge paths, and the reversal of
+each) is built once from the triangle coordinates.  Positions beyond the
+32-byte data width are dropped, so a full traversal is a permutation of
+0..31 and can be applied to a flat buffer of N candidates with one
+itemgetter call per block instead of a Python loop per byte.
+"""
+from operator import itemgetter
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+KNOWN_POS = {7: 9, 22: 22, 25: 7}
+TRIANGLE = [
+    [0],
+    [1,2],
+    [3,4,5],
+    [6,7,8,9],
+    [10,11,12,13,14],
+    [15,16,17,18,19,20],
+    [21,22,23,24,25,26,27],
+    [28,29,30,31,32,33,34,35]
+]
+ROWS = len(TRIANGLE)
+WIDTH = 32
+BLOCK_ROWS = 256
+
+
+def dot(r, c):
+    return TRIANGLE[r][c]
+
+
+def row_major():
+    return [p for row in TRIANGLE for p in row]
+
+
+def column_major():
+    return [dot(r, c) for c in range(ROWS) for r in range(c, ROWS)]
+
+
+def diagonals():
+    """Lines parallel to the hypotenuse (r - c constant), hypotenuse first"""
+    return [dot(c + d, c) for d in range(ROWS) for c in range(ROWS - d)]
+
+
+def anti_diagonals():
+    """Lines r + c constant, top first, each walked from the left edge"""
+    return [dot(s - c, c) for s in range(2 * ROWS - 1)
+            for c in range(s // 2 + 1) if s - c < ROWS]
+
+
+def zigzag():
+    """Rows left to right, odd rows reversed (as in solve_triangle2.py)"""
+    order = []
+    for i, row in enumerate(TRIANGLE):
+        order.extend(row if i % 2 == 0 else reversed(row))
+    return order
+
+
+def boustrophedon():
+    """Columns top to bottom, odd columns walked bottom to top"""
+    order = []
+    for c in range(ROWS):
+        col = [dot(r, c) for r in range(c, ROWS)]
+        order.extend(col if c % 2 == 0 else reversed(col))
+    return order
+
+
+def spiral():
+    """Clockwise from the apex: left edge down, bottom row, hypotenuse up, then inward"""
+    order = []
+    top, left, size = 0, 0, ROWS
+    while size > 0:
+        # Sub-triangle with apex (top, left) and `size` rows
+        if size == 1:
+            order.append(dot(top, left))
+            break
+        order.extend(dot(top + k, left) for k in range(size))
+        order.extend(dot(top + size - 1, left + k) for k in range(1, size))
+        order.extend(dot(top + k, left + k) for k in range(size - 2, 0, -1))
+        top, left, size = top + 2, left + 1, size - 3
+    return order
+
+
+def diagonal_path():
+    """Hypotenuse dots 0, 2, 5, 9, ... (DIAGONAL_VALUES positions)"""
+    return [row[-1] for row in TRIANGLE]
+
+
+def edge_path():
+    """Left edge dots 0, 1, 3, 6, ... (row starts)"""
+    return [row[0] for row in TRIANGLE]
+
+
+BUILDERS = {
+    'row_major': row_major,
+    'column_major': column_major,
+    'diagonals': diagonals,
+    'anti_diagonals': anti_diagonals,
+    'zigzag': zigzag,
+    'boustrophedon': boustrophedon,
+    'spiral': spiral,
+    'diagonal': diagonal_path,
+    'edge': edge_path,
+}
+
+
+class Traversal:
+    """Precomputed gather for one ordering of the data positions"""
+
+    def __init__(self, name, order, width=WIDTH):
+        self.name = name
+        self.order = tuple(order)
+        self.indices = tuple(p for p in self.order if p < width)
+        self.width = width
+        self.full = sorted(self.indices) == list(range(width))
+        self._getter = itemgetter(*self.indices)
+        self._block_getters = {}
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __call__(self, data):
+        return bytes(self._getter(data))
+
+    def _block_getter(self, rows):
+        getter = self._block_getters.get(rows)
+        if getter is None:
+            w = self.width
+            getter = itemgetter(*(r * w + p for r in range(rows) for p in self.indices))
+            self._block_getters[rows] = getter
+        return getter
+
+    def gather(self, batch, block_rows=BLOCK_ROWS):
+        """Apply to a flat buffer of N * width bytes; returns N * len(self) bytes"""
+        w = self.width
+        n = len(batch) // w
+        if n * w != len(batch):
+            raise ValueError(f"Batch length {len(batch)} is not a multiple of {w}")
+        view = memoryview(batch)
+        out = bytearray()
+        step = block_rows * w
+        for start in range(0, n * w, step):
+            block = view[start:start + step]
+            out += bytes(self._block_getter(len(block) // w)(block))
+        return bytes(out)
+
+    def inverse(self):
+        """Scatter that undoes a full traversal"""
+        if not self.full:
+            raise ValueError(f"{self.name} does not visit every position")
+        inv = [0] * self.width
+        for i, p in enumerate(self.indices):
+            inv[p] = i
+        return Traversal(f"{self.name}^-1", inv, self.width)
+
+
+def build_traversals(width=WIDTH, reversals=True):
+    traversals = {}
+    for name, builder in BUILDERS.items():
+        order = builder()
+        traversals[name] = Traversal(name, order, width)
+        if reversals:
+            traversals[name + '_rev'] = Traversal(name + '_rev', order[::-1], width)
+    return traversals
+
+
+TRAVERSALS = build_traversals()
+
+
+def gather_all(batch, traversals=None, full_only=True):
+    """Every traversal of every candidate in a flat batch: {name: gathered bytes}"""
+    traversals = TRAVERSALS if traversals is None else traversals
+    return {name: t.gather(batch) for name, t in traversals.items() if t.full or not full_only}
+
+
+def main():
+    import os
+    import time
+
+    tx_bytes = bytes.fromhex(TX_ID)
+
+    print("=== Triangle Traversals ===")
+    for name, t in TRAVERSALS.items():
+        if name.endswith('_rev'):
+            continue
+        kind = 'full' if t.full else 'path'
+        print(f"{name:<15}{kind:<6}{list(t.order)}")
+        assert sorted(t.order) == list(range(36)) or not t.full
+
+    print("\nTX id under each full traversal (known positions after reordering):")
+    for name, t in TRAVERSALS.items():
+        if not t.full:
+            continue
+        out = t(tx_bytes)
+        assert t.inverse()(out) == tx_bytes
+        hits = sum(out[p] == v for p, v in KNOWN_POS.items())
+        print(f"  {name:<20}{out.hex()}  known {hits}/3")
+
+    n = 20000
+    batch = os.urandom(n * WIDTH)
+    start = time.perf_counter()
+    gathered = gather_all(batch)
+    elapsed = time.perf_counter() - start
+    total = n * len(gathered)
+    print(f"\nGathered {len(gathered)} traversals x {n} candidates in {elapsed:.3f}s "
+          f"({total / elapsed:,.0f} candidates/sec)")
+    t = TRAVERSALS['spiral']
+    assert gathered['spiral'][WIDTH:2 * WIDTH] == t(batch[WIDTH:2 * WIDTH])
+
+
+if __name__ == "__main__":
+    main()
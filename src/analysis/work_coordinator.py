@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+HTTP work coordinator for spreading a search over several machines
+
+The coordinator declares a search space cut into numbered work units and
+serves two JSON endpoints over the stdlib http.server:
+
+    POST /lease     {"worker": id}                  -> {"unit", "lease", "space", "params"}
+                                                       or {"wait": s} / {"done": true}
+    POST /complete  {"unit", "lease", "hits", "top"} -> {"accepted": bool}
+    GET  /status                                     -> progress counters
+
+A lease that is not completed within lease_timeout seconds is handed out
+again, so a crashed or slow node never loses a unit.  A unit is counted
+only by its first completion under a lease issued for it (current or
+expired); late duplicates, unknown units and foreign lease ids are
+rejected.  Workers run the
+job for a unit headless and post back exact hits plus their near-miss TopK
+heap, which the coordinator merges.  A worker retries a failed request with
+exponential backoff before giving up, so a coordinator restart or a dropped
+connection does not end it.
+
+The endpoints are unauthenticated: serve mode listens on 127.0.0.1 unless
+--host is given, e.g. --host 0.0.0.0 on a trusted cluster network.
+
+Usage:
+    work_coordinator.py                               localhost demo with worker subprocesses
+    work_coordinator.py serve SPACE [--port N] [--host ADDR]
+                                                      coordinator for a real cluster
+    work_coordinator.py worker URL [--id NAME]        worker node
+"""
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+
+from chain_dedupe import spec_family
+from chain_dsl import DEFAULT_CONTEXT, compile_chain
+from key_verifier import KeyVerifier, pubkey_to_address
+from near_miss import KNOWN_POS, TopK, scan_xor_add_family, score, score_components
+from secp256k1 import privkey_to_pubkey
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+TARGET_ADDR = "1KfZGvwZxsv5memoCmEV75uqcNzYBHjkHZ"
+DEFAULT_PORT = 8658
+LEASE_TIMEOUT = 60.0
+# Worker requests: attempts before giving up, first delay in seconds (doubled each retry)
+RETRIES = 6
+BACKOFF = 0.5
+
+
+# Jobs: (params, unit) -> (hits, TopK or None); hits are JSON-ready lists
+
+def job_xor_add(params, unit):
+    """Near-miss scan of x -> (x ^ a) + b for the a values of one unit"""
+    per_unit = params['per_unit']
+    top = scan_xor_add_family((unit * per_unit, (unit + 1) * per_unit, params['k']))
+    hits = [[list(label), data.hex()] for _, label, data in top.results()
+            if score_components(data)['exact'] == len(KNOWN_POS)]
+    return hits, top
+
+
+_verifiers = {}
+
+
+def job_key_range(params, unit):
+    """Verify the integer keys start + unit * per_unit ... against the targets"""
+    targets = tuple(params['targets'])
+    verifier = _verifiers.get(targets)
+    if verifier is None:
+        verifier = _verifiers[targets] = KeyVerifier(targets)
+    first = params['start'] + unit * params['per_unit']
+    hits = []
+    for key in range(first, first + params['per_unit']):
+        for address, _, compressed in verifier.verify(key):
+            hits.append([hex(key), address, compressed])
+    return hits, None
+
+
+def job_chain_family(params, unit):
+    """Run one slice of chain_dedupe.spec_family on the TX id: near-miss heap plus verified hits"""
+    per_unit = params['per_unit']
+    targets = tuple(params.get('targets', [TARGET_ADDR]))
+    verifier = _verifiers.get(targets)
+    if verifier is None:
+        verifier = _verifiers[targets] = KeyVerifier(targets)
+    tx = DEFAULT_CONTEXT.tx_bytes
+    top = TopK(params.get('k', 50))
+    hits = []
+    for spec in spec_family()[unit * per_unit:(unit + 1) * per_unit]:
+        data = compile_chain(spec)(tx)
+        top.push(score(data), (spec,), data)
+        if score_components(data)['exact'] == len(KNOWN_POS):
+            for address, _, compressed in verifier.verify(data):
+                hits.append([spec, data.hex(), address, compressed])
+    return hits, top
+
+
+JOBS = {
+    'xor_add': job_xor_add,
+    'key_range': job_key_range,
+    'chain_family': job_chain_family,
+}
+
+
+def top_to_json(top):
+    if top is None:
+        return None
+    return {'k': top.k, 'seen': top.seen,
+            'entries': [[s, list(label), data.hex()] for s, label, data in top.results()]}
+
+
+def top_from_json(data):
+    top = TopK(data['k'])
+    for s, label, data_hex in data['entries']:
+        top.push(s, tuple(label), bytes.fromhex(data_hex))
+    top.seen = data['seen']
+    return top
+
+
+class WorkSpace:
+    """A search space of numbered units handled by one job"""
+
+    def __init__(self, job, units, params):
+        if job not in JOBS:
+            raise ValueError(f"Unknown job {job!r}")
+        self.job = job
+        self.units = units
+        self.params = params
+
+
+class Coordinator:
+    """Lease bookkeeping; all methods are thread safe"""
+
+    def __init__(self, space, lease_timeout=LEASE_TIMEOUT, top_k=100):
+        self.space = space
+        self.lease_timeout = lease_timeout
+        self.pending = deque(range(space.units))
+        self.leases = {}      # unit -> (lease id, worker, deadline)
+        self.completed = {}   # unit -> worker
+        self.issued = {}      # unit -> every lease id handed out for it
+        self.hits = []
+        self.top = TopK(top_k)
+        self.reissued = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.started = time.time()
+        self.finished = None
+        self._ids = count(1)
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return len(self.completed) == self.space.units
+
+    def lease(self, worker):
+        with self._lock:
+            now = time.time()
+            if self.done:
+                return {'done': True}
+            unit = None
+            if self.pending:
+                unit = self.pending.popleft()
+            else:
+                # Re-issue the oldest expired lease
+                expired = [(deadline, u) for u, (_, _, deadline) in self.leases.items() if deadline <= now]
+                if expired:
+                    unit = min(expired)[1]
+                    self.reissued += 1
+            if unit is None:
+                soonest = min((deadline for _, _, deadline in self.leases.values()), default=now + 1.0)
+                return {'wait': max(0.05, min(1.0, soonest - now))}
+            lease = next(self._ids)
+            self.leases[unit] = (lease, worker, now + self.lease_timeout)
+            self.issued.setdefault(unit, set()).add(lease)
+            return {'unit': unit, 'lease': lease, 'space': self.space.job, 'params': self.space.params}
+
+    def complete(self, worker, unit, lease, hits, top):
+        """Record a unit's results; raises ValueError/TypeError/KeyError for a malformed top heap"""
+        # Parse before touching any state so a bad payload changes nothing
+        top = top_from_json(top) if top is not None else None
+        with self._lock:
+            if not (isinstance(unit, int) and 0 <= unit < self.space.units
+                    and isinstance(lease, int) and lease in self.issued.get(unit, ())):
+                self.rejected += 1
+                return {'accepted': False, 'error': 'unknown unit or lease'}
+            if unit in self.completed:
+                self.duplicates += 1
+                return {'accepted': False}
+            self.completed[unit] = worker
+            self.leases.pop(unit, None)
+            for hit in hits:
+                self.hits.append({'unit': unit, 'worker': worker, 'hit': hit})
+            if top is not None:
+                self.top.merge(top)
+            if self.done:
+                self.finished = time.time()
+            return {'accepted': True}
+
+    def status(self):
+        with self._lock:
+            return {'units': self.space.units, 'completed': len(self.completed),
+                    'leased': len(self.leases), 'pending': len(self.pending),
+                    'reissued': self.reissued, 'duplicates': self.duplicates,
+                    'rejected': self.rejected,
+                    'hits': len(self.hits), 'done': self.done}
+
+
+def make_handler(coordinator):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, payload, code=200):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/status':
+                self._reply(coordinator.status())
+            else:
+                self._reply({'error': 'not found'}, 404)
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._reply({'error': 'bad Content-Length'}, 400)
+                return
+            try:
+                request = json.loads(self.rfile.read(length) or b'{}')
+            except json.JSONDecodeError:
+                self._reply({'error': 'bad json'}, 400)
+                return
+            if not isinstance(request, dict):
+                self._reply({'error': 'expected a JSON object'}, 400)
+                return
+            if self.path == '/lease':
+                self._reply(coordinator.lease(request.get('worker', '?')))
+            elif self.path == '/complete':
+                if 'unit' not in request or 'lease' not in request:
+                    self._reply({'error': 'unit and lease are required'}, 400)
+                    return
+                try:
+                    reply = coordinator.complete(request.get('worker', '?'), request['unit'],
+                                                 request['lease'], list(request.get('hits', [])),
+                                                 request.get('top'))
+                except (KeyError, TypeError, ValueError):
+                    self._reply({'error': 'malformed completion'}, 400)
+                    return
+                self._reply(reply)
+            else:
+                self._reply({'error': 'not found'}, 404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(coordinator, host='127.0.0.1', port=DEFAULT_PORT):
+    """Start the coordinator in a background thread; returns the server"""
+    server = ThreadingHTTPServer((host, port), make_handler(coordinator))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _post(url, payload, timeout=30):
+    request = urllib.request.Request(url, json.dumps(payload).encode(),
+                                     {'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def _post_retry(url, payload, retries=RETRIES, backoff=BACKOFF):
+    """_post, retrying connection errors and 5xx replies with exponential backoff"""
+    for attempt in range(retries):
+        try:
+            return _post(url, payload)
+        except urllib.error.HTTPError as e:
+            if e.code < 500 or attempt == retries - 1:
+                raise
+        except OSError:
+            if attempt == retries - 1:
+                raise
+        time.sleep(backoff * 2 ** attempt)
+
+
+def run_worker(url, worker, die_after=None):
+    """Lease, run and complete units until the coordinator reports done"""
+    units = 0
+    while True:
+        reply = _post_retry(f"{url}/lease", {'worker': worker})
+        if reply.get('done'):
+            return units
+        if 'wait' in reply:
+            time.sleep(reply['wait'])
+            continue
+        if die_after is not None and units >= die_after:
+            # Simulated crash: walk away holding a lease
+            return units
+        hits, top = JOBS[reply['space']](reply['params'], reply['unit'])
+        _post_retry(f"{url}/complete", {'worker': worker, 'unit': reply['unit'],
+                                        'lease': reply['lease'], 'hits': hits,
+                                        'top': top_to_json(top)})
+        units += 1
+
+
+def spawn_workers(url, n, extra=()):
+    return [subprocess.Popen([sys.executable, __file__, 'worker', url, '--id', f"node{i}", *extra])
+            for i in range(n)]
+
+
+def run_local(space, workers, lease_timeout=LEASE_TIMEOUT, crashing=0):
+    """Coordinator plus worker subprocesses on localhost; returns (coordinator, elapsed)"""
+    coordinator = Coordinator(space, lease_timeout)
+    server = serve(coordinator, port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    start = time.time()
+    procs = spawn_workers(url, workers)
+    procs += [subprocess.Popen([sys.executable, __file__, 'worker', url, '--id', f"crash{i}",
+                                '--die-after', '0']) for i in range(crashing)]
+    for proc in procs:
+        proc.wait()
+    elapsed = (coordinator.finished or time.time()) - start
+    server.shutdown()
+    return coordinator, elapsed
+
+
+def demo_space(units=24, per_unit=20):
+    """Key range after the TX id with a planted key so the cluster has something to find"""
+    start = int(TX_ID, 16)
+    planted = start + units * per_unit // 2 + 7
+    address = pubkey_to_address(privkey_to_pubkey(planted))
+    return WorkSpace('key_range', units, {'start': start, 'per_unit': per_unit,
+                                          'targets': [TARGET_ADDR, address]})
+
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] == 'worker':
+        worker = args[args.index('--id') + 1] if '--id' in args else 'worker'
+        die_after = int(args[args.index('--die-after') + 1]) if '--die-after' in args else None
+        run_worker(args[1].rstrip('/'), worker, die_after)
+        return
+    if args and args[0] == 'serve':
+        spaces = {'xor_add': WorkSpace('xor_add', 32, {'per_unit': 8, 'k': 50}),
+                  'key_range': demo_space(),
+                  'chain_family': WorkSpace('chain_family', 25, {'per_unit': 49, 'k': 50})}
+        port = int(args[args.index('--port') + 1]) if '--port' in args else DEFAULT_PORT
+        host = args[args.index('--host') + 1] if '--host' in args else '127.0.0.1'
+        space = args[1] if len(args) > 1 and not args[1].startswith('--') else 'xor_add'
+        coordinator = Coordinator(spaces[space])
+        server = serve(coordinator, host=host, port=port)
+        print(f"Coordinator on {host}:{port}: {coordinator.space.units} units of "
+              f"{coordinator.space.job}")
+        while not coordinator.done:
+            time.sleep(2)
+            print(coordinator.status())
+        server.shutdown()
+        return
+
+    print("=== Work Coordinator (localhost) ===")
+    print(f"{os.cpu_count()} CPU(s) on this host; node throughput only scales with real cores")
+    space = demo_space()
+    for n in (1, 2, 3):
+        coordinator, elapsed = run_local(space, n)
+        status = coordinator.status()
+        per_worker = {}
+        for worker in coordinator.completed.values():
+            per_worker[worker] = per_worker.get(worker, 0) + 1
+        print(f"{n} worker(s): {status['completed']}/{status['units']} units in {elapsed:.2f}s "
+              f"({status['completed'] / elapsed:.1f} units/s), duplicates {status['duplicates']}, "
+              f"split {per_worker}")
+        for hit in coordinator.hits:
+            print(f"    hit in unit {hit['unit']} by {hit['worker']}: {hit['hit']}")
+
+    coordinator = Coordinator(WorkSpace('key_range', 2, space.params))
+    server = serve(coordinator, port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    first = coordinator.lease('a')
+    forged = [coordinator.complete('x', 5, first['lease'], [], None),
+              coordinator.complete('x', first['unit'], 999, [], None)]
+    codes = []
+    for payload in ({'worker': 'x'}, {'unit': 0, 'lease': 1, 'top': {'k': 1}}, [1, 2]):
+        try:
+            _post(f"{url}/complete", payload)
+        except urllib.error.HTTPError as e:
+            codes.append(e.code)
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    connection.putrequest('POST', '/complete')
+    connection.putheader('Content-Length', 'many')
+    connection.endheaders()
+    codes.append(connection.getresponse().status)
+    connection.close()
+    server.shutdown()
+    print(f"\nOut-of-range unit / foreign lease accepted: {[r['accepted'] for r in forged]}, "
+          f"malformed POSTs answered {codes}, done={coordinator.done}")
+
+    print("\nNear-miss scan with one crashing node and a 1s lease timeout:")
+    space = WorkSpace('xor_add', 16, {'per_unit': 16, 'k': 20})
+    coordinator, elapsed = run_local(space, 2, lease_timeout=1.0, crashing=1)
+    status = coordinator.status()
+    print(f"{status['completed']}/{status['units']} units in {elapsed:.2f}s, "
+          f"{status['reissued']} lease(s) re-issued, {status['duplicates']} duplicate completions")
+    print(f"Merged near-miss heap ({coordinator.top.seen} candidates seen), best:")
+    for s, label, data in coordinator.top.results()[:3]:
+        print(f"  score {s} (a, b) = {label}: {data.hex()}")
+
+    space = WorkSpace('chain_family', 25, {'per_unit': 49, 'k': 20})
+    coordinator, elapsed = run_local(space, 2)
+    s, label, data = coordinator.top.results()[0]
+    print(f"\nchain_dedupe.spec_family ({len(spec_family())} chains) over 2 nodes: "
+          f"{len(coordinator.completed)} units in {elapsed:.2f}s, best score {s} from {label[0]}")
+
+
+if __name__ == "__main__":
+    main()
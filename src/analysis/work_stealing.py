@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Work-stealing scheduler for search shards of uneven cost
+
+Every worker process owns a contiguous range [lo, hi) of item indices in a
+shared array.  It takes grain-sized chunks from the front of its own range;
+when that runs dry it picks the worker with the most items left and steals
+the back half of its range.  All range updates happen under one lock and
+are a few integer writes, so contention is negligible next to the chunks.
+A static split (no stealing) is available for comparison: the per-worker
+idle time at the end of a run shows the tail that stealing removes.
+"""
+import hashlib
+import multiprocessing as mp
+import time
+
+# Constants
+TX_ID = "fcee21d44ee94c09869947c74b61669bf928358e9c2d1699fb075bb6ebf5d043"
+
+
+class WorkerStats:
+    def __init__(self, worker, items, chunks, steals, busy, finished, result):
+        self.worker = worker
+        self.items = items
+        self.chunks = chunks
+        self.steals = steals
+        self.busy = busy
+        self.finished = finished
+        self.result = result
+        self.idle = 0.0
+
+
+def _take(ranges, lock, worker, grain, steal):
+    """Next chunk (lo, hi) for a worker, stealing if its own range is empty"""
+    with lock:
+        lo, hi = ranges[2 * worker], ranges[2 * worker + 1]
+        stolen = False
+        if lo >= hi and steal:
+            victim, left = None, 1
+            for w in range(len(ranges) // 2):
+                remaining = ranges[2 * w + 1] - ranges[2 * w]
+                if remaining > left:
+                    victim, left = w, remaining
+            if victim is not None:
+                # Thief takes the back half; the victim keeps the front it is working through
+                v_lo, v_hi = ranges[2 * victim], ranges[2 * victim + 1]
+                mid = v_lo + (v_hi - v_lo) // 2
+                ranges[2 * victim + 1] = mid
+                lo, hi = mid, v_hi
+                stolen = True
+        if lo >= hi:
+            return None, False
+        end = min(hi, lo + grain)
+        ranges[2 * worker], ranges[2 * worker + 1] = end, hi
+        return (lo, end), stolen
+
+
+def _worker(func, ranges, lock, worker, grain, steal, results):
+    items = chunks = steals = 0
+    busy = 0.0
+    output = []
+    while True:
+        chunk, stolen = _take(ranges, lock, worker, grain, steal)
+        if chunk is None:
+            break
+        steals += stolen
+        start = time.perf_counter()
+        output.append(func(*chunk))
+        busy += time.perf_counter() - start
+        items += chunk[1] - chunk[0]
+        chunks += 1
+    results.put(WorkerStats(worker, items, chunks, steals, busy, time.time(), output))
+
+
+class WorkStealingScheduler:
+    """Runs func(lo, hi) over [0, n_items) on `workers` processes"""
+
+    def __init__(self, func, n_items, workers=None, grain=1, steal=True):
+        self.func = func
+        self.n_items = n_items
+        self.workers = workers or mp.cpu_count()
+        self.grain = grain
+        self.steal = steal
+        self.stats = []
+        self.elapsed = 0.0
+
+    def run(self):
+        """Results of every chunk, in no particular order"""
+        n, w = self.n_items, self.workers
+        ranges = mp.Array('q', 2 * w, lock=False)
+        for i in range(w):
+            ranges[2 * i] = i * n // w
+            ranges[2 * i + 1] = (i + 1) * n // w
+        lock = mp.Lock()
+        results = mp.Queue()
+        start = time.time()
+        procs = [mp.Process(target=_worker,
+                            args=(self.func, ranges, lock, i, self.grain, self.steal, results))
+                 for i in range(w)]
+        for p in procs:
+            p.start()
+        self.stats = sorted((results.get() for _ in procs), key=lambda s: s.worker)
+        for p in procs:
+            p.join()
+        end = max(s.finished for s in self.stats)
+        self.elapsed = end - start
+        for s in self.stats:
+            s.idle = end - s.finished
+        return [r for s in self.stats for r in s.result]
+
+    def report(self):
+        print(f"{'worker':>8}{'items':>8}{'chunks':>8}{'steals':>8}{'busy s':>9}{'idle s':>9}")
+        for s in self.stats:
+            print(f"{s.worker:>8}{s.items:>8}{s.chunks:>8}{s.steals:>8}{s.busy:>9.2f}{s.idle:>9.2f}")
+        idle = sum(s.idle for s in self.stats)
+        print(f"makespan {self.elapsed:.2f}s, total idle {idle:.2f}s "
+              f"({idle / (self.elapsed * len(self.stats)):.0%} of worker time)")
+
+
+def uneven_shard(lo, hi):
+    """Demo shard: hash chains whose length grows sharply towards the end of the range"""
+    seed = bytes.fromhex(TX_ID)
+    hits = 0
+    for i in range(lo, hi):
+        rounds = 1000 if i < 3 * 256 // 4 else 20000
+        h = seed + i.to_bytes(4, 'big')
+        for _ in range(rounds):
+            h = hashlib.sha256(h).digest()
+        hits += h[7] == 9
+    return hits
+
+
+def main():
+    n = 256
+    workers = 4
+    print("=== Work-Stealing Scheduler ===")
+    print(f"{n} items, last quarter 20x as expensive, {workers} workers on {mp.cpu_count()} CPU(s)")
+    totals = {}
+    for title, steal in [("Static split", False), ("Work stealing", True)]:
+        scheduler = WorkStealingScheduler(uneven_shard, n, workers, grain=2, steal=steal)
+        totals[title] = sum(scheduler.run())
+        print(f"\n{title}:")
+        scheduler.report()
+    assert len(set(totals.values())) == 1
+    print(f"\nBoth runs agree: {totals['Static split']} items with byte 7 == 9")
+    if mp.cpu_count() < workers:
+        print("Fewer cores than workers: busy times include time-sharing and the makespan "
+              "cannot shrink, but the idle column still shows the tail")
+
+
+if __name__ == "__main__":
+    main()